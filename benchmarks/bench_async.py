@@ -0,0 +1,72 @@
+"""
+Concurrent callback throughput of one event loop (one worker) for the sync and asyncio provider paths.
+
+Every callback does the token exchange and the profile fetch against a local server answering with a fixed
+latency, the way ``OmniAuthifyFastAPI.get_user_info`` does inside an async route handler.
+
+    python -m benchmarks.bench_async
+"""
+import asyncio
+import time
+
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+CALLBACKS = 100
+CONCURRENCY = 20
+LATENCY = 0.05
+
+
+def make_provider(server, transport, async_transport):
+    provider = GitHub(
+        "client_id", "client_secret", "https://example.com/callback", "user",
+        transport=transport, async_transport=async_transport,
+    )
+    provider.TOKEN_URL = f"{server.url}/login/oauth/access_token"
+    provider.PROFILE_URL = f"{server.url}/user"
+    return provider
+
+
+async def sync_callback(provider):
+    # ==== Previous behaviour: blocking calls straight from the coroutine ====
+    access_token = provider.get_access_token("code")
+    return provider.get_user_profile(access_token)
+
+
+async def async_callback(provider):
+    access_token = await provider.aget_access_token("code")
+    return await provider.aget_user_profile(access_token)
+
+
+async def run(callback, provider):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def bounded():
+        async with semaphore:
+            await callback(provider)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(CALLBACKS)))
+    return time.perf_counter() - started
+
+
+async def main():
+    with MockServer(latency=LATENCY) as server:
+        server.route("POST", "/login/oauth/access_token", {"access_token": "token", "token_type": "bearer"})
+        server.route("GET", "/user", {"id": 1, "login": "octocat"})
+
+        async_transport = AsyncHTTPTransport(max_keepalive_connections=CONCURRENCY)
+        provider = make_provider(server, HTTPTransport(pool_maxsize=CONCURRENCY), async_transport)
+
+        for label, callback in (("sync provider calls", sync_callback), ("asyncio provider calls", async_callback)):
+            await callback(provider)  # warm up
+            elapsed = await run(callback, provider)
+            print(f"{label:<32} {CALLBACKS / elapsed:8.1f} callbacks/s  ({CALLBACKS} callbacks, "
+                  f"concurrency {CONCURRENCY}, {LATENCY * 1000:.0f}ms provider latency)")
+
+        await async_transport.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+Throughput of ``get_authorization_url`` for every provider, against encoding the whole query on each call.
+
+    python -m benchmarks.bench_authorization_url
+"""
+import secrets
+import timeit
+from urllib.parse import urlencode
+
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers import Facebook, GitHub, Google, LinkedIn
+from omni_authify.providers.instagram import Instagram
+
+CALLS = 200_000
+REDIRECT_URI = "https://example.com/accounts/oauth/callback/"
+
+
+def build_providers():
+    transport = HTTPTransport()
+    return (
+        Facebook("client_id", "client_secret", REDIRECT_URI, ["id", "name"], "email,public_profile", transport),
+        Instagram("client_id", "client_secret", REDIRECT_URI, ["id", "name"], "user_profile", transport),
+        GitHub("client_id", "client_secret", REDIRECT_URI, "read:user user:email", transport),
+        Google("client_id", "client_secret", REDIRECT_URI, "openid email profile", transport),
+        LinkedIn("client_id", "client_secret", REDIRECT_URI, "openid profile email", transport),
+    )
+
+
+def encode_every_call(provider, state):
+    # ==== Previous behaviour: the static parameters were encoded again for every redirect ====
+    params = provider._authorization_params(provider.scope)
+    params["state"] = state
+    return f"{provider.AUTHORIZE_URL}?{urlencode(params)}"
+
+
+def main():
+    state = secrets.token_urlsafe(32)
+    for provider in build_providers():
+        assert encode_every_call(provider, state) == provider.get_authorization_url(state=state)
+        name = type(provider).__name__
+        for label, func in (
+            ("encode every call", lambda: encode_every_call(provider, state)),
+            ("cached prefix", lambda: provider.get_authorization_url(state=state)),
+        ):
+            seconds = timeit.timeit(func, number=CALLS)
+            print(f"{name:<10} {label:<18} {CALLS / seconds:12,.0f} urls/s  {seconds / CALLS * 1e6:6.2f}us/url")
+
+
+if __name__ == "__main__":
+    main()
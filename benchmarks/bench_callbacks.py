@@ -0,0 +1,275 @@
+"""
+End-to-end callback latency and throughput for every provider and every framework wrapper, offline.
+
+Each provider runs against its own ``MockOAuthServer``, so a callback does the real token exchange, the profile
+fetch (or the id_token verification in OIDC mode) and, for the wrappers, the state check, over local HTTP.
+
+    python -m benchmarks.bench_callbacks
+    python -m benchmarks.bench_callbacks --json results.json
+    python -m benchmarks.bench_callbacks --compare results.json --tolerance 0.25
+
+``--compare`` exits with status 1 when a case got slower than its baseline by more than the tolerance.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from benchmarks.utils import measure, percentile
+from omni_authify.core.registry import provider_registry
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from tests.mock_oauth import PROVIDER_CLASSES, MockOAuthServer
+
+ITERATIONS = 300
+CONCURRENCY = 16
+REDIRECT_URI = "https://example.com/callback"
+
+PROVIDER_SETTINGS = {
+    "github": {"scope": "read:user user:email"},
+    "google": {"scope": "openid email profile"},
+    "facebook": {"scope": "email,public_profile", "fields": "id,name,email,picture"},
+    "linkedin": {"scope": "openid profile email"},
+}
+
+# ======== Direct provider cases: (label, provider name, provider options) ========
+PROVIDER_CASES = (
+    ("github", "github", {}),
+    ("google", "google", {}),
+    ("google-oidc", "google", {"oidc": True}),
+    ("facebook", "facebook", {}),
+    ("linkedin", "linkedin", {}),
+    ("linkedin-oidc", "linkedin", {"oidc": True}),
+)
+
+FRAMEWORKS = ("django", "drf", "fastapi")
+
+# ==== Empty URLconf for django.shortcuts.redirect ====
+urlpatterns = []
+
+
+def settings_for(name):
+    return {
+        "client_id": "client_id",
+        "client_secret": "client_secret",
+        "redirect_uri": REDIRECT_URI,
+        **PROVIDER_SETTINGS[name],
+    }
+
+
+def make_provider(name, server, **options):
+    args = ["client_id", "client_secret", REDIRECT_URI]
+    if name == "facebook":
+        args.append(PROVIDER_SETTINGS[name]["fields"])
+    provider = PROVIDER_CLASSES[name](
+        *args, PROVIDER_SETTINGS[name]["scope"], transport=HTTPTransport(pool_maxsize=CONCURRENCY), **options
+    )
+    return server.attach(provider)
+
+
+def summarize(samples, elapsed, calls):
+    return {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "callbacks_per_s": calls / elapsed,
+    }
+
+
+def run_sync(callback, iterations):
+    callback()  # warm up connections and key caches
+    samples = measure(callback, iterations)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        list(executor.map(lambda _: callback(), range(iterations)))
+    return summarize(samples, time.perf_counter() - started, iterations)
+
+
+def run_async(callback_factory, iterations):
+    """
+    ``callback_factory`` is awaited on the benchmark's event loop and returns ``(callback, async_transport)``.
+    """
+    async def main():
+        callback, transport = await callback_factory()
+        try:
+            await callback()
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await callback()
+                samples.append(time.perf_counter() - started)
+
+            semaphore = asyncio.Semaphore(CONCURRENCY)
+
+            async def bounded():
+                async with semaphore:
+                    await callback()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(bounded() for _ in range(iterations)))
+            return summarize(samples, time.perf_counter() - started, iterations)
+        finally:
+            await transport.aclose()
+
+    return asyncio.run(main())
+
+
+def provider_cases(latency, iterations):
+    for label, name, options in PROVIDER_CASES:
+        with MockOAuthServer(name, latency=latency) as server:
+            provider = make_provider(name, server, **options)
+            yield f"provider/{label}", lambda: run_sync(lambda: provider.get_user_info("code"), iterations)
+
+            async def factory():
+                transport = provider._async_transport = AsyncHTTPTransport(max_keepalive_connections=CONCURRENCY)
+                return (lambda: provider.aget_user_info("code")), transport
+
+            yield f"provider/{label}/async", lambda: run_async(factory, iterations)
+
+
+def configure_django():
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(
+            SECRET_KEY="benchmark-secret",
+            INSTALLED_APPS=["django.contrib.auth", "django.contrib.contenttypes"],
+            ROOT_URLCONF=__name__,
+            OMNI_AUTHIFY={"PROVIDERS": {name: settings_for(name) for name in PROVIDER_CLASSES}},
+        )
+        django.setup()
+
+
+def framework_callback(framework, name):
+    """
+    Build the wrapper for ``name`` and return ``(wrapper, callback(state))``, where callback runs the wrapper's
+    callback handler for a request carrying ``code`` and ``state``.
+    """
+    if framework in ("django", "drf"):
+        configure_django()
+        from django.test import RequestFactory
+
+        factory = RequestFactory()
+
+        def request(state):
+            request = factory.get("/callback", {"code": "code", "state": state})
+            request.COOKIES[wrapper.states.cookie_name(name)] = wrapper.states.cookie_value(state)
+            return request
+
+        if framework == "django":
+            from omni_authify.frameworks.django import OmniAuthifyDjango
+
+            wrapper = OmniAuthifyDjango(name)
+            return wrapper, lambda state: wrapper.callback(request(state))
+
+        from omni_authify.frameworks.drf import OmniAuthifyDRF
+
+        wrapper = OmniAuthifyDRF(name)
+        return wrapper, lambda state: wrapper.get_user_info(request(state), "code")
+
+    from omni_authify.core.utils import get_settings
+    from omni_authify.frameworks.fastapi import OmniAuthifyFastAPI
+
+    get_settings().update({
+        "SECRET_KEY": "benchmark-secret",
+        "PROVIDERS": {provider: settings_for(provider) for provider in PROVIDER_CLASSES},
+    })
+    wrapper = OmniAuthifyFastAPI(name)
+    return wrapper, lambda state: wrapper.get_user_info(
+        SimpleNamespace(
+            query_params={"code": "code", "state": state},
+            cookies={wrapper.states.cookie_name(name): wrapper.states.cookie_value(state)},
+        ),
+        "code",
+    )
+
+
+def check(result):
+    if isinstance(result, dict) and result.get("error"):
+        raise RuntimeError(result["message"])
+    return result
+
+
+def framework_cases(latency, iterations):
+    for framework in FRAMEWORKS:
+        for name in PROVIDER_CLASSES:
+            try:
+                wrapper, callback = framework_callback(framework, name)
+            except ImportError as e:
+                print(f"skipping {framework}: {e}", file=sys.stderr)
+                break
+
+            with MockOAuthServer(name, latency=latency) as server:
+                server.attach(wrapper.provider)
+                # ==== States are single use: sign them up front so the loop times the callback only ====
+                states = iter([wrapper.states.issue(name) for _ in range(2 * iterations + 2)])
+
+                if framework == "fastapi":
+                    async def factory():
+                        transport = wrapper.provider._async_transport = AsyncHTTPTransport(
+                            max_keepalive_connections=CONCURRENCY
+                        )
+
+                        async def run_callback():
+                            return check(await callback(next(states)))
+                        return run_callback, transport
+
+                    yield f"{framework}/{name}", lambda: run_async(factory, iterations)
+                else:
+                    yield f"{framework}/{name}", lambda: run_sync(lambda: check(callback(next(states))), iterations)
+            provider_registry.invalidate(name)
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for case, result in results.items():
+        previous = baseline.get(case)
+        if previous is None:
+            continue
+        if result["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{case}: p50 {previous['p50_ms']:.3f}ms -> {result['p50_ms']:.3f}ms")
+        if result["callbacks_per_s"] < previous["callbacks_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{case}: throughput {previous['callbacks_per_s']:.0f}/s -> {result['callbacks_per_s']:.0f}/s"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock provider latency per request, in seconds.")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--only", help="Run only the cases whose name contains this text.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--compare", help="Baseline results file written by --json.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for cases in (provider_cases, framework_cases):
+        # ==== Cases are yielded as (name, run) and run before the next one is built, while its server is up ====
+        for case, run in cases(args.latency, args.iterations):
+            if args.only and args.only not in case:
+                continue
+            result = results[case] = run()
+            print(f"{case:<28} p50={result['p50_ms']:8.3f}ms  p99={result['p99_ms']:8.3f}ms  "
+                  f"{result['callbacks_per_s']:8.0f} callbacks/s (concurrency {CONCURRENCY})")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Cost of OpenID Connect discovery on the login path, against a mock provider serving its discovery document.
+
+Compares ``get_authorization_url`` and the callback with the built-in endpoints, with discovery from a warm cache,
+and with a naive discovery that fetches the document on every login.
+
+    python -m benchmarks.bench_discovery
+"""
+import tempfile
+
+from benchmarks.utils import measure, report
+from omni_authify.core.discovery import OIDCDiscovery
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.linkedin import LinkedIn
+from tests.mock_oauth import MockOAuthServer
+
+ITERATIONS = 500
+
+
+def main():
+    transport = HTTPTransport()
+    with MockOAuthServer("linkedin") as server, tempfile.TemporaryDirectory() as cache_dir:
+        def make_provider():
+            provider = LinkedIn("client_id", "client_secret", "https://example.com/callback", "openid profile",
+                                transport=transport)
+            return server.attach(provider)
+
+        builtin = make_provider()
+        cached = make_provider()
+        cached.discovery = OIDCDiscovery(server.url_for("discovery"), transport=transport, cache_dir=cache_dir)
+        cached.discovery.refresh()
+
+        def naive_login():
+            # ==== Fetch the document on every login, as a cache-less implementation would ====
+            transport.get(server.url_for("discovery")).json()
+            login(builtin)
+
+        def login(provider):
+            provider.get_authorization_url(state="state")
+            provider.get_user_info("code")
+
+        report("built-in endpoints", measure(lambda: login(builtin), ITERATIONS))
+        report("cached discovery", measure(lambda: login(cached), ITERATIONS))
+        report("discovery on every login", measure(naive_login, ITERATIONS))
+        print(f"{'':<32} discovery requests (cached): {cached.discovery.stats()['refreshes']}")
+    transport.close()
+
+
+if __name__ == "__main__":
+    main()
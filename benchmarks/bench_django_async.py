@@ -0,0 +1,196 @@
+"""
+Concurrent callbacks handled by one Django ASGI worker: the async ``acallback`` against the sync ``callback``.
+
+Requests go through Django's ``ASGIHandler`` on a single event loop, as in one uvicorn/daphne worker. The sync view
+is run by Django through ``sync_to_async``, one thread hop per request on a thread-sensitive executor, while the async
+view awaits the token exchange and profile fetch on the loop. Django itself still sends ``request_started`` and
+``request_finished`` to sync receivers through a thread, so the ``direct`` mode also awaits ``acallback`` without the
+handler, to show the threads the callback needs on its own. The GitHub mock runs in its own process, so it does not
+compete with the worker for the GIL, and adds ``--latency`` per provider call.
+
+    python -m benchmarks.bench_django_async
+    python -m benchmarks.bench_django_async --latency 0.1 --concurrency 10 100 500
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.utils import percentile
+from omni_authify.core.transport import AsyncHTTPTransport
+from tests.mock_oauth import MockOAuthServer
+
+PROVIDERS = {
+    "github": {"client_id": "client_id", "client_secret": "client_secret",
+               "redirect_uri": "https://example.com/callback", "scope": "read:user"},
+}
+
+auth = None
+
+
+def sync_callback(request):
+    from django.http import JsonResponse
+
+    result = auth.callback(request)
+    return JsonResponse(result[0] if isinstance(result, tuple) else result, status=200)
+
+
+async def async_callback(request):
+    from django.http import JsonResponse
+
+    result = await auth.acallback(request)
+    return JsonResponse(result[0] if isinstance(result, tuple) else result, status=200)
+
+
+def serve(latency, connection):
+    with MockOAuthServer("github", latency=latency) as server:
+        connection.send({endpoint: server.url_for(endpoint) for endpoint in server.paths})
+        connection.recv()
+
+
+def start_server(latency):
+    """
+    Run the mock in a child process and return ``(server, stop)``; ``server`` only offers ``attach``.
+    """
+    parent, child = multiprocessing.get_context("fork").Pipe()
+    process = multiprocessing.get_context("fork").Process(target=serve, args=(latency, child), daemon=True)
+    process.start()
+    urls = parent.recv()
+    server = SimpleNamespace(paths=urls, url_for=urls.__getitem__)
+    server.attach = lambda provider: MockOAuthServer.attach(server, provider)
+
+    def stop():
+        parent.send(None)
+        process.join()
+
+    return server, stop
+
+
+def setup():
+    import django
+    from django.conf import settings
+    from django.urls import path
+
+    settings.configure(
+        SECRET_KEY="benchmark-secret",
+        ALLOWED_HOSTS=["testserver"],
+        INSTALLED_APPS=["django.contrib.auth", "django.contrib.contenttypes"],
+        ROOT_URLCONF=__name__,
+        OMNI_AUTHIFY={"PROVIDERS": PROVIDERS},
+    )
+    django.setup()
+
+    global urlpatterns
+    urlpatterns = [path("sync/callback", sync_callback), path("async/callback", async_callback)]
+
+
+async def get(app, path, query, cookie=""):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())], "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+    body_sent = False
+    statuses = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # ==== Nothing more to read: wait for Django to cancel its disconnect listener ====
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await app(scope, receive, send)
+    if statuses != [200]:
+        raise RuntimeError(f"{path} answered {statuses}")
+
+
+async def run(app, mode, concurrency, requests):
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    states = [auth.states.issue("github") for _ in range(requests)]
+    baseline = threading.active_count()
+    peak_threads = baseline
+    samples = []
+
+    async def one(state):
+        nonlocal peak_threads
+        started = time.perf_counter()
+        cookie = auth.states.cookie_value(state)
+        if mode == "direct":
+            request = factory.get("/callback", {"code": "code", "state": state})
+            request.COOKIES[auth.states.cookie_name("github")] = cookie
+            result = await auth.acallback(request)
+            if not isinstance(result, tuple):
+                raise RuntimeError(result)
+        else:
+            await get(app, f"/{mode}/callback", f"code=code&state={state}",
+                      f"{auth.states.cookie_name('github')}={cookie}")
+        samples.append(time.perf_counter() - started)
+        peak_threads = max(peak_threads, threading.active_count())
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(state):
+        async with semaphore:
+            await one(state)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(state) for state in states))
+    elapsed = time.perf_counter() - started
+    return {"p50_ms": percentile(samples, 50) * 1000, "p99_ms": percentile(samples, 99) * 1000,
+            "callbacks_per_s": requests / elapsed, "threads": peak_threads - baseline}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.25, help="Mock provider latency per request, in seconds.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--requests", type=int, default=200, help="Callbacks per mode and concurrency level.")
+    parser.add_argument("--max-connections", type=int, default=100, help="Async transport connection limit.")
+    args = parser.parse_args(argv)
+
+    setup()
+    from django.core.handlers.asgi import ASGIHandler
+    from omni_authify.frameworks.django import OmniAuthifyDjango
+
+    global auth
+    auth = OmniAuthifyDjango("github")
+    app = ASGIHandler()
+
+    server, stop = start_server(args.latency)
+    server.attach(auth.provider)
+
+    async def main_loop():
+        auth.provider._async_transport = AsyncHTTPTransport(
+            max_connections=args.max_connections, max_keepalive_connections=args.max_connections
+        )
+        try:
+            for concurrency in args.concurrency:
+                for mode in ("direct", "async", "sync"):
+                    result = await run(app, mode, concurrency, args.requests)
+                    print(f"{mode:<6} concurrency={concurrency:<4} p50={result['p50_ms']:8.1f}ms  "
+                          f"p99={result['p99_ms']:8.1f}ms  {result['callbacks_per_s']:7.1f} callbacks/s  "
+                          f"+{result['threads']} threads")
+        finally:
+            await auth.provider._async_transport.aclose()
+
+    try:
+        asyncio.run(main_loop())
+    finally:
+        stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
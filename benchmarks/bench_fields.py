@@ -0,0 +1,66 @@
+"""
+Cost of the Facebook ``fields`` handling: parsing a spec, the cached lookup on every request, and the per-field-set
+accounting, plus the response size and latency of a few projections against a local Graph API mock.
+
+    python -m benchmarks.bench_fields
+"""
+import json
+from urllib.parse import parse_qs
+
+from benchmarks.utils import measure, report
+from omni_authify.core.fields import FieldCostTracker, FieldSpec, _parse_cached
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers import Facebook
+from tests.mock_server import MockServer
+
+ITERATIONS = 20_000
+REQUESTS = 200
+SPECS = (
+    "id,name,email,picture",
+    "id,name,email,picture.width(1000).height(1000){url,width,height}",
+    "id,name,email,friends.limit(100){id,name,picture{url}}",
+)
+
+
+def graph_me(request):
+    # ==== Rough stand-in for the Graph API: heavier projections return bigger bodies ====
+    fields = parse_qs(request.path.partition("?")[2])["fields"][0]
+    profile = {"id": "10223344556677889", "name": "Jane Doe", "email": "jane@example.com"}
+    if "picture" in fields:
+        profile["picture"] = {"data": {"url": "https://scontent.example.com/" + "p" * 180, "width": 1000,
+                                       "height": 1000}}
+    if "friends" in fields:
+        profile["friends"] = {"data": [
+            {"id": f"{index:017d}", "name": f"Friend {index}", "picture": {"data": {"url": "https://cdn/" + "f" * 80}}}
+            for index in range(100)
+        ], "summary": {"total_count": 100}}
+    return 200, {}, profile
+
+
+def main():
+    for spec in SPECS:
+        report(f"parse (uncached) {spec[:14]}", measure(lambda: (_parse_cached.cache_clear(), FieldSpec.parse(spec)),
+                                                      ITERATIONS))
+        report(f"parse (cached)   {spec[:14]}", measure(lambda: FieldSpec.parse(spec), ITERATIONS))
+
+    tracker, spec = FieldCostTracker("bench"), FieldSpec.parse(SPECS[0])
+    payload = {"id": "1", "name": "Jane", "email": "jane@example.com", "picture": {"data": {"url": "x" * 100}}}
+    report("record", measure(lambda: tracker.record(spec, 512, 0.05, payload), ITERATIONS))
+
+    with MockServer(routes={("GET", "/me"): graph_me}) as server:
+        transport = HTTPTransport()
+        provider = Facebook("client_id", "client_secret", "https://example.com/callback", SPECS[0], "email",
+                            transport=transport)
+        provider.PROFILE_URL = f"{server.url}/me"
+        provider.field_costs.reset()
+        try:
+            for spec in SPECS:
+                report(f"profile {spec[:23]}", measure(lambda: provider.get_user_profile("token", spec), REQUESTS))
+        finally:
+            transport.close()
+
+    print(json.dumps(provider.field_costs.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
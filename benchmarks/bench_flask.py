@@ -0,0 +1,102 @@
+"""
+Login and callback throughput of ``OmniAuthifyFlask`` through Flask's test client, against a local GitHub mock.
+
+Every iteration requests ``/github/login``, approves the consent screen on the mock and requests ``/github/callback``,
+which verifies the state, exchanges the code and fetches the profile over the app's pooled session.
+
+    python -m benchmarks.bench_flask
+    python -m benchmarks.bench_flask --latency 0.05 --gevent   # cooperative callbacks, needs gevent
+"""
+import sys
+
+if "--gevent" in sys.argv:
+    # ==== Patched before anything imports socket, ssl or threading ====
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import measure, percentile
+from tests.mock_oauth import MockOAuthServer
+
+ITERATIONS = 300
+CONCURRENCY = 16
+
+
+def make_app():
+    from flask import Flask
+    from omni_authify.frameworks.flask import OmniAuthifyFlask
+
+    app = Flask(__name__)
+    app.config["OMNI_AUTHIFY"] = {
+        "SECRET_KEY": "benchmark-secret",
+        "PROVIDERS": {"github": {"client_id": "client_id", "client_secret": "client_secret",
+                                 "redirect_uri": "https://example.com/callback", "scope": "read:user"}},
+        "TRANSPORT": {"pool_maxsize": CONCURRENCY},
+    }
+    auth = OmniAuthifyFlask(app)
+
+    @app.get("/<provider_name>/login")
+    def login(provider_name):
+        return auth.login(provider_name)
+
+    @app.get("/<provider_name>/callback")
+    def callback(provider_name):
+        return auth.callback(provider_name)
+
+    return app, auth
+
+
+def run(concurrency, iterations, latency):
+    app, auth = make_app()
+    with MockOAuthServer("github", latency=latency) as server:
+        with app.app_context():
+            server.attach(auth.provider("github"))
+
+        def login_and_callback():
+            client = app.test_client()
+            query = server.consent(client.get("/github/login").headers["Location"])
+            response = client.get("/github/callback", query_string=query)
+            if response.status_code != 200:
+                raise RuntimeError(response.get_json())
+
+        login_and_callback()
+        samples = measure(login_and_callback, iterations)
+
+        if "--gevent" in sys.argv:
+            from gevent.pool import Pool
+
+            pool = Pool(concurrency)
+            started = time.perf_counter()
+            pool.map(lambda _: login_and_callback(), range(iterations))
+        else:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as executor:
+                list(executor.map(lambda _: login_and_callback(), range(iterations)))
+        elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        auth.provider("github").transport.close()
+    return samples, iterations / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock provider latency per request, in seconds.")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--gevent", action="store_true", help="Run the concurrent phase on a gevent pool.")
+    args = parser.parse_args(argv)
+
+    samples, throughput = run(args.concurrency, args.iterations, args.latency)
+    mode = "greenlets" if args.gevent else "threads"
+    print(f"flask login+callback  p50={percentile(samples, 50) * 1000:8.3f}ms  "
+          f"p99={percentile(samples, 99) * 1000:8.3f}ms  {throughput:8.0f} flows/s ({args.concurrency} {mode})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Latency of building a GitHub identity serially (profile, scope HEAD, emails) against ``GitHub.fetch_identity``.
+
+    python -m benchmarks.bench_github_identity
+"""
+from benchmarks.utils import measure, report
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+ITERATIONS = 100
+LATENCY = 0.03
+
+
+def serial_identity(provider, access_token):
+    # ==== Previous behaviour: three round trips, one after another ====
+    profile = provider.get_user_profile(access_token)
+    scopes = provider.check_token_scopes(access_token)
+    emails = provider.transport.get(provider.EMAILS_URL, headers={"Authorization": f"Bearer {access_token}"})
+    return {**profile, **scopes, "emails": emails.json()}
+
+
+def main():
+    with MockServer(latency=LATENCY) as server:
+        server.route("GET", "/user", {"id": 1, "login": "octocat"}, headers={"X-OAuth-Scopes": "read:user, user:email"})
+        server.route("GET", "/user/emails", [{"email": "octocat@github.com", "primary": True, "verified": True}])
+
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "read:user",
+                          transport=HTTPTransport())
+        provider.PROFILE_URL = f"{server.url}/user"
+        provider.EMAILS_URL = f"{server.url}/user/emails"
+
+        print(f"provider latency {LATENCY * 1000:.0f}ms per request")
+        for label, fetch in (("serial profile+HEAD+emails", serial_identity), ("fetch_identity", GitHub.fetch_identity)):
+            fetch(provider, "token")  # warm up
+            report(label, measure(lambda: fetch(provider, "token"), ITERATIONS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cold import time of ``omni_authify`` and of a single provider, measured with ``python -X importtime`` in fresh
+interpreters.
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --budget-ms 60    # exit 1 when a median exceeds the budget
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+RUNS = 15
+TARGETS = (
+    ("import omni_authify", "omni_authify"),
+    ("import omni_authify.providers.github", "omni_authify.providers.github"),
+    ("import omni_authify.providers.google", "omni_authify.providers.google"),
+)
+HEAVY_MODULES = ("requests", "dotenv", "httpx", "jwt", "asyncio", "orjson", "msgspec")
+
+
+def cumulative_import_us(module):
+    """
+    Import ``module`` in a new interpreter and return its cumulative import time in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    total = 0
+    for line in result.stderr.splitlines():
+        # ==== "import time: self [us] | cumulative | imported package", top-level entries are not indented ====
+        _, _, fields = line.partition("import time:")
+        parts = fields.split("|")
+        if len(parts) == 3 and parts[2].startswith(" omni_authify") and not parts[2].startswith("  "):
+            total += int(parts[1])
+    return total
+
+
+def heavy_imports(module):
+    """
+    Return the third-party or asyncio modules that ``import module`` pulls in.
+    """
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, help="fail when a median import time exceeds this many ms")
+    args = parser.parse_args()
+
+    over_budget = False
+    for label, module in TARGETS:
+        samples = [cumulative_import_us(module) / 1000 for _ in range(RUNS)]
+        median = statistics.median(samples)
+        heavy = ", ".join(heavy_imports(module)) or "-"
+        print(f"{label:<40} n={RUNS:<3} median={median:7.2f}ms  min={min(samples):7.2f}ms  heavy={heavy}")
+        if args.budget_ms is not None and median > args.budget_ms:
+            over_budget = True
+
+    if over_budget:
+        print(f"import time budget of {args.budget_ms}ms exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Overhead of the instrumentation hooks: unwrapped methods, the no-op default, and a registered instrumentation.
+
+    python -m benchmarks.bench_instrumentation
+"""
+import timeit
+
+from benchmarks.utils import measure, report
+from omni_authify.core.instrumentation import Instrumentation, add_instrumentation, remove_instrumentation
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+CALLS = 200_000
+ITERATIONS = 500
+
+
+def main():
+    with MockServer() as server:
+        server.route("POST", "/token", {"access_token": "token", "token_type": "bearer"})
+        server.route("GET", "/user", {"id": 1, "login": "octocat"})
+
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "read:user",
+                          transport=HTTPTransport())
+        provider.TOKEN_URL = f"{server.url}/token"
+        provider.PROFILE_URL = f"{server.url}/user"
+        unwrapped = GitHub.get_authorization_url.__wrapped__
+
+        instrumentation = Instrumentation()
+        for label, hooks in (("no-op default", None), ("instrumentation registered", instrumentation)):
+            if hooks is not None:
+                add_instrumentation(hooks)
+            for name, func in (
+                ("unwrapped", lambda: unwrapped(provider, state="state")),
+                ("get_authorization_url", lambda: provider.get_authorization_url(state="state")),
+            ):
+                seconds = timeit.timeit(func, number=CALLS)
+                print(f"{label:<28} {name:<22} {seconds / CALLS * 1e6:6.2f}us/call")
+
+            provider.get_user_info("code")  # warm up
+            report(f"{label} login", measure(lambda: provider.get_user_info("code"), ITERATIONS))
+        remove_instrumentation(instrumentation)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Decode throughput of each provider's typical responses with every installed JSON backend.
+
+    python -m benchmarks.bench_json
+"""
+import importlib.util
+import json
+import timeit
+
+from omni_authify.core import codec
+from omni_authify.core.profile import UserProfile
+from omni_authify.providers import Facebook, GitHub, Google, LinkedIn
+from tests.mock_oauth import PROFILES
+
+CALLS = 20_000
+
+# ==== A Facebook profile requested with many fields, as done by the resync jobs ====
+FACEBOOK_FULL = {
+    **PROFILES["facebook"],
+    "first_name": "Test", "last_name": "User", "birthday": "01/31/1990", "gender": "female", "locale": "en_US",
+    "hometown": {"id": "108424279189115", "name": "New York, New York"},
+    "location": {"id": "108424279189115", "name": "New York, New York"},
+    "friends": {"data": [], "summary": {"total_count": 512}},
+    "likes": {"data": [{"id": str(index), "name": f"Page {index}", "created_time": "2020-01-01T00:00:00+0000"}
+                       for index in range(25)]},
+}
+FACEBOOK_BATCH = [{"code": 200, "body": json.dumps(FACEBOOK_FULL)} for _ in range(50)]
+
+GITHUB_FULL = {
+    **PROFILES["github"], "node_id": "MDQ6VXNlcjE=", "avatar_url": "https://avatars.githubusercontent.com/u/1?v=4",
+    "url": "https://api.github.com/users/octocat", "html_url": "https://github.com/octocat", "type": "User",
+    "site_admin": False, "company": "@github", "blog": "https://github.blog", "location": "San Francisco",
+    "bio": None, "public_repos": 8, "followers": 9999, "following": 9, "created_at": "2011-01-25T18:44:36Z",
+}
+
+PAYLOADS = (
+    ("token response", "github", {"access_token": "gho_" + "x" * 36, "token_type": "bearer", "scope": "read:user"}),
+    ("profile", "github", GITHUB_FULL),
+    ("profile", "google", PROFILES["google"]),
+    ("profile", "linkedin", PROFILES["linkedin"]),
+    ("profile, many fields", "facebook", FACEBOOK_FULL),
+    ("batch of 50", "facebook", FACEBOOK_BATCH),
+)
+MAPPINGS = {"github": GitHub, "google": Google, "facebook": Facebook, "linkedin": LinkedIn}
+
+
+def main():
+    backends = [name for name in codec.JSON_BACKENDS if name == "json" or importlib.util.find_spec(name)]
+    for label, provider, payload in PAYLOADS:
+        body = json.dumps(payload).encode()
+        for backend in backends:
+            codec.set_json_backend(backend)
+            seconds = timeit.timeit(lambda: codec.json_loads(body), number=CALLS)
+            line = f"{provider:<9} {label:<22} {len(body):7,d}B  {backend:<8} {seconds / CALLS * 1e6:8.2f}us/decode"
+            if label.startswith("profile"):
+                mapping = MAPPINGS[provider].PROFILE_MAPPING
+                seconds = timeit.timeit(
+                    lambda: UserProfile.from_payload(provider, codec.json_loads(body), mapping), number=CALLS
+                )
+                line += f"  {seconds / CALLS * 1e6:8.2f}us/UserProfile"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Callback latency on a cold connection pool, with and without ``prewarm`` when the authorization URL is issued.
+
+Every login gets a fresh transport, as after the pool's idle connections were dropped, and the user spends
+``--consent`` seconds at the provider between the redirect and the callback. The mock server charges ``--handshake``
+seconds on every new connection in place of the DNS lookup and TLS handshake to the real provider hosts, so the
+prewarmed callback only pays for the token exchange and profile fetch.
+
+    python -m benchmarks.bench_prewarm --handshake 0.03
+"""
+import argparse
+import time
+
+from benchmarks.utils import report
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+
+def make_provider(server, transport, prewarm):
+    provider = GitHub("client_id", "client_secret", "https://example.com/callback", "user", transport=transport)
+    provider.TOKEN_URL = f"{server.url}/login/oauth/access_token"
+    provider.PROFILE_URL = f"{server.url}/user"
+    provider.prewarm = prewarm
+    return provider
+
+
+def login(server, prewarm, consent):
+    transport = HTTPTransport()
+    provider = make_provider(server, transport, prewarm)
+    try:
+        provider.get_authorization_url(state="state")
+        time.sleep(consent)
+
+        started = time.perf_counter()
+        access_token = provider.get_access_token("code")
+        provider.get_user_profile(access_token)
+        return time.perf_counter() - started, transport.stats()["warm"]
+    finally:
+        transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--handshake", type=float, default=0.03, help="seconds charged per new connection")
+    parser.add_argument("--consent", type=float, default=0.1, help="seconds between the redirect and the callback")
+    args = parser.parse_args()
+
+    with MockServer(handshake=args.handshake) as server:
+        server.route("POST", "/login/oauth/access_token", {"access_token": "token", "token_type": "bearer"})
+        server.route("GET", "/user", {"id": 1, "login": "octocat"})
+
+        for label, prewarm in (("cold callback", False), ("prewarmed callback", True)):
+            samples, hits, used = [], 0, 0
+            for _ in range(args.iterations):
+                elapsed, warm = login(server, prewarm, args.consent)
+                samples.append(elapsed)
+                hits += warm["hits"]
+                used += warm["hits"] + warm["expired"]
+            report(label, samples)
+            if used:
+                print(f"{'':<32} warm-hit ratio: {hits / used:.2f}")
+
+
+if __name__ == "__main__":
+    main()
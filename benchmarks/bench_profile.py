@@ -0,0 +1,62 @@
+"""
+Memory and throughput of holding many profiles as raw provider dicts against ``UserProfile``.
+
+    python -m benchmarks.bench_profile
+"""
+import gc
+import json
+import time
+import tracemalloc
+
+from omni_authify.core.profile import UserProfile
+from omni_authify.providers import Facebook, GitHub, Google, LinkedIn
+from tests.mock_oauth import PROFILES
+
+COUNT = 100_000
+PROVIDERS = {"github": GitHub, "google": Google, "facebook": Facebook, "linkedin": LinkedIn}
+
+
+def payload(name, index):
+    # ==== Distinct values per user, as in a real cache, so nothing is shared between profiles ====
+    data = json.loads(json.dumps(PROFILES[name]))
+    key = "sub" if "sub" in data else "id"
+    data[key] = f"{index:012d}" if isinstance(data[key], str) else index
+    data["email"] = f"user{index}@example.com"
+    data["name"] = f"User {index}"
+    return data
+
+
+def held_bytes(build, bodies):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    profiles = [build(body) for body in bodies]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del profiles
+    return (after - before) / len(bodies)
+
+
+def per_second(build, bodies):
+    started = time.perf_counter()
+    for body in bodies:
+        build(body)
+    return len(bodies) / (time.perf_counter() - started)
+
+
+def main():
+    for name, provider_class in PROVIDERS.items():
+        mapping = provider_class.PROFILE_MAPPING
+        bodies = [json.dumps(payload(name, index)).encode() for index in range(COUNT)]
+        for label, build in (
+            ("raw dict", json.loads),
+            # ==== from_payload re-encodes the payload, so the raw bytes are counted as held by the profile ====
+            ("UserProfile + raw bytes", lambda body: UserProfile.from_payload(name, json.loads(body), mapping)),
+            ("UserProfile, no raw", lambda body: UserProfile.from_payload(name, json.loads(body), mapping, False)),
+        ):
+            print(f"{name:<9} {label:<24} {held_bytes(build, bodies):8.0f} bytes/profile  "
+                  f"{per_second(build, bodies):10,.0f} profiles/s")
+
+
+if __name__ == "__main__":
+    main()
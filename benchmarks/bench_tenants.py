@@ -0,0 +1,100 @@
+"""
+Resolution cost and memory of ``TenantConfigStore`` at 10k tenants, against fingerprinting settings through the
+process-wide ``provider_registry``.
+
+    python -m benchmarks.bench_tenants
+"""
+import gc
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.utils import measure, report
+from omni_authify.core.registry import ProviderRegistry
+from omni_authify.core.tenants import JSONLinesTenantSource, TenantConfigStore
+
+TENANTS = 10_000
+LOOKUPS = 50_000
+
+
+def tenant_settings(tenant_id):
+    return {
+        name: {
+            "client_id": f"{tenant_id}-{name}-client",
+            "client_secret": f"{tenant_id}-{name}-secret-0123456789abcdef",
+            "redirect_uri": f"https://{tenant_id}.example.com/oauth/{name}/callback",
+            "scope": "openid email profile" if name == "google" else "user",
+        }
+        for name in ("github", "google")
+    }
+
+
+def held_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def main():
+    tenants = {f"tenant-{index:05d}": tenant_settings(f"tenant-{index:05d}") for index in range(TENANTS)}
+    ids = list(tenants)
+    order = [random.choice(ids) for _ in range(LOOKUPS)]
+    lookups = itertools.cycle(order)
+
+    store = TenantConfigStore(tenants, max_tenants=TENANTS, max_providers=TENANTS)
+    report("settings, cold", measure(lambda: store.get_settings(next(lookups), "github"), LOOKUPS))
+    for tenant_id in ids:
+        store.get_settings(tenant_id, "github")
+    report("settings, warm", measure(lambda: store.get_settings(next(lookups), "github"), LOOKUPS))
+
+    provider_store = TenantConfigStore(tenants, max_tenants=TENANTS, max_providers=TENANTS)
+    builds = iter(ids)
+    report("provider, build", measure(lambda: provider_store.get_provider(next(builds), "github"), TENANTS))
+    report("provider, warm", measure(lambda: provider_store.get_provider(next(lookups), "github"), LOOKUPS))
+
+    registry = ProviderRegistry()
+    for tenant_id in ids:
+        registry.get("github", tenants[tenant_id]["github"])
+    report("provider_registry.get (fingerprint)",
+           measure(lambda: registry.get("github", tenants[next(lookups)]["github"]), LOOKUPS))
+
+    # ======== Memory: a tenant's settings come from the source, so measure what the caches add ========
+    def fill_providers():
+        fresh = TenantConfigStore(tenants, max_tenants=TENANTS, max_providers=TENANTS)
+        for tenant_id in ids:
+            fresh.get_provider(tenant_id, "github")
+        return fresh
+
+    _, size = held_bytes(fill_providers)
+    print(f"memory per tenant with a cached provider: {size / TENANTS:8.0f} bytes")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tenants.jsonl")
+        with open(path, "w") as file:
+            for tenant_id, providers in tenants.items():
+                file.write(json.dumps({"tenant": tenant_id, "providers": providers}) + "\n")
+
+        started = time.perf_counter()
+        JSONLinesTenantSource(path)(ids[0])
+        print(f"jsonl index of {TENANTS} tenants: {(time.perf_counter() - started) * 1000:8.1f}ms")
+
+        source = JSONLinesTenantSource(path)
+        _, size = held_bytes(lambda: source(ids[0]))
+        print(f"jsonl index memory: {size / TENANTS:6.0f} bytes per idle tenant")
+
+        file_store = TenantConfigStore(source, max_tenants=1_000)
+        report("jsonl settings, mostly cold (1k LRU)",
+               measure(lambda: file_store.get_settings(next(lookups), "google"), LOOKUPS // 5))
+        print(f"jsonl store: {file_store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Callback latency of the pooled provider transport against bare per-call ``requests`` usage.
+
+Runs the GitHub callback (token exchange + profile fetch) against a local keep-alive server. Plain HTTP on
+loopback only saves the TCP handshake, so the gap measured here is a lower bound of what TLS connections to the
+real provider hosts gain.
+
+    python -m benchmarks.bench_transport
+"""
+import requests
+
+from benchmarks.utils import measure, report
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+ITERATIONS = 500
+
+
+class PerCallTransport:
+    """
+    Previous behaviour: module-level ``requests`` calls, one new connection per request.
+    """
+
+    def request(self, method, url, **kwargs):
+        return requests.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return requests.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return requests.post(url, **kwargs)
+
+
+def make_provider(server, transport):
+    provider = GitHub("client_id", "client_secret", "https://example.com/callback", "user", transport=transport)
+    provider.TOKEN_URL = f"{server.url}/login/oauth/access_token"
+    provider.PROFILE_URL = f"{server.url}/user"
+    return provider
+
+
+def callback(provider):
+    access_token = provider.get_access_token("code")
+    provider.get_user_profile(access_token)
+
+
+def main():
+    with MockServer() as server:
+        server.route("POST", "/login/oauth/access_token", {"access_token": "token", "token_type": "bearer"})
+        server.route("GET", "/user", {"id": 1, "login": "octocat"})
+
+        for label, transport in (("per-call requests", PerCallTransport()), ("pooled HTTPTransport", HTTPTransport())):
+            provider = make_provider(server, transport)
+            callback(provider)  # warm up
+            connections = server.connections
+            report(label, measure(lambda: callback(provider), ITERATIONS))
+            print(f"{'':<32} connections opened: {server.connections - connections}")
+
+
+if __name__ == "__main__":
+    main()
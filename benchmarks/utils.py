@@ -0,0 +1,31 @@
+import time
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of ``samples`` (``pct`` between 0 and 100).
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(func, iterations):
+    """
+    Call ``func`` ``iterations`` times and return the per-call latencies in seconds.
+    """
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label, samples):
+    """
+    Print a one-line p50/p99 summary in milliseconds.
+    """
+    p50 = percentile(samples, 50) * 1000
+    p99 = percentile(samples, 99) * 1000
+    print(f"{label:<32} n={len(samples):<6} p50={p50:8.3f}ms  p99={p99:8.3f}ms")
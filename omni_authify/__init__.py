@@ -1,11 +1,16 @@
-from .providers.facebook import Facebook
-from .providers.instagram import Instagram
-from .providers.github import GitHub
-from .providers.google import Google
+import importlib
 
-# Commented out providers not yet implemented
-# from .providers.linkedin import LinkedIn
-# from .providers.twitter import Twitter
+# ==== Provider classes are imported on first attribute access, keeping `import omni_authify` cheap ====
+_PROVIDERS = {
+    "Facebook": ".providers.facebook",
+    "Instagram": ".providers.instagram",
+    "GitHub": ".providers.github",
+    "Google": ".providers.google",
+    "Twitter": ".providers.twitter",
+
+    # Commented out providers not yet implemented
+    # "LinkedIn": ".providers.linkedin",
+}
 
 
 __all__ = [
@@ -13,12 +18,24 @@ __all__ = [
     "Instagram",
     "GitHub",
     "Google",
+    "Twitter",
 
     # Other providers will be added once implemented
     # "LinkedIn",
     # "Telegram",
-    # "Twitter",
 ]
 
 __version__ = "1.1.7"
 
+
+def __getattr__(name):
+    module = _PROVIDERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
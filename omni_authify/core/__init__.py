@@ -1,3 +1,27 @@
+from .batch import *
+from .cache import *
+from .codec import *
+from .discovery import *
 from .exceptions import *
+from .fields import *
+from .instrumentation import *
+from .jwks import *
 from .oauth import *
+from .oidc import *
+from .profile import *
+from .ratelimit import *
+from .registry import *
+from .resilience import *
+from .spec import *
+from .state import *
+from .tenants import *
+from .tokens import *
+from .transport import *
 from .utils import *
+
+
+def __getattr__(name):
+    # ==== OMNI_AUTHIFY is built from the environment on first access ====
+    if name == "OMNI_AUTHIFY":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
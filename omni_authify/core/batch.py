@@ -0,0 +1,45 @@
+from collections import deque, namedtuple
+from itertools import islice
+
+__all__ = ["ProfileResult", "bounded_map", "chunked"]
+
+ProfileResult = namedtuple("ProfileResult", ["access_token", "profile", "error"])
+ProfileResult.__doc__ = """
+One item of a batch profile lookup: ``profile`` on success, otherwise the ``error`` raised for ``access_token``.
+"""
+
+
+def chunked(iterable, size):
+    """
+    Yield lists of at most ``size`` items without materializing ``iterable``.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def bounded_map(func, items, max_workers=8):
+    """
+    Apply ``func`` to ``items`` on a thread pool and yield ``(item, result, error)`` in input order.
+
+    At most ``2 * max_workers`` items are in flight, so memory stays flat however long ``items`` is, and an
+    exception raised for one item is yielded as its ``error`` instead of stopping the iteration.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    window = max_workers * 2
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="omni-authify-batch") as executor:
+        pending = deque()
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= window:
+                yield _resolve(*pending.popleft())
+        while pending:
+            yield _resolve(*pending.popleft())
+
+
+def _resolve(item, future):
+    try:
+        return item, future.result(), None
+    except Exception as e:
+        return item, None, e
@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .codec import json_dumps, json_loads
+
+__all__ = ["MemoryCacheBackend", "RedisCacheBackend", "ProfileCache", "cached_profile"]
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry TTL, bounded to ``max_entries``.
+
+    Values are kept encoded as JSON, as in ``RedisCacheBackend``, so every hit returns a fresh copy its caller may
+    change without affecting the cached entry or other callers.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return json_loads(value)
+
+    def set(self, key, value, ttl):
+        value = json_dumps(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Backend for a shared Redis-like store.
+
+    ``client`` needs ``get(key)``, ``set(key, value, ex=seconds)`` and ``delete(key)`` as in redis-py. Values are
+    stored as JSON; size bounds and LRU eviction are left to the server (``maxmemory-policy allkeys-lru``).
+    """
+
+    def __init__(self, client, prefix="omni_authify:profile:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class ProfileCache:
+    """
+    Opt-in cache of ``get_user_profile`` results, keyed by a SHA-256 digest of the provider, access token and
+    requested fields so raw tokens are never stored as keys.
+    """
+
+    def __init__(self, backend=None, ttl=300, max_entries=1024):
+        """
+        Args:
+            backend: ``MemoryCacheBackend`` (default), ``RedisCacheBackend`` or an object with the same methods.
+            ttl (int): Seconds a profile stays cached.
+            max_entries (int): Size of the default in-process backend.
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend(max_entries=max_entries)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(provider_name, access_token, fields=None):
+        fields = json.dumps(fields, sort_keys=True, default=repr)
+        return hashlib.sha256(f"{provider_name}\0{access_token}\0{fields}".encode()).hexdigest()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value, self.ttl)
+
+    def invalidate(self, provider_name, access_token, fields=None):
+        self.backend.delete(self.key(provider_name, access_token, fields))
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": getattr(self.backend, "evictions", None),
+        }
+
+
+def cached_profile(method):
+    """
+    Serve ``get_user_profile``/``aget_user_profile`` from the provider's ``profile_cache`` when one is set.
+
+    The cache key covers every argument after ``access_token`` with defaults applied, so ``fields`` passed
+    positionally, by keyword or left to its default all map to the same entry.
+    """
+    signature = inspect.signature(method)
+
+    def cache_key(cache, self, access_token, args, kwargs):
+        bound = signature.bind(self, access_token, *args, **kwargs)
+        bound.apply_defaults()
+        fields = dict(list(bound.arguments.items())[2:])
+        return cache.key(type(self).__name__, access_token, fields)
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(self, access_token, *args, **kwargs):
+            cache = self.profile_cache
+            if cache is None:
+                return await method(self, access_token, *args, **kwargs)
+
+            key = cache_key(cache, self, access_token, args, kwargs)
+            profile = cache.get(key)
+            if profile is None:
+                profile = await method(self, access_token, *args, **kwargs)
+                cache.set(key, profile)
+            return profile
+        return wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, access_token, *args, **kwargs):
+        cache = self.profile_cache
+        if cache is None:
+            return method(self, access_token, *args, **kwargs)
+
+        key = cache_key(cache, self, access_token, args, kwargs)
+        profile = cache.get(key)
+        if profile is None:
+            profile = method(self, access_token, *args, **kwargs)
+            cache.set(key, profile)
+        return profile
+    return wrapper
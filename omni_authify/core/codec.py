@@ -0,0 +1,112 @@
+import threading
+
+from .exceptions import InvalidResponseError
+
+__all__ = ["JSON_BACKENDS", "get_json_backend", "set_json_backend", "json_loads", "json_dumps", "response_json"]
+
+# ======== Tried in this order by the "auto" backend ========
+JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class _Backend:
+    __slots__ = ("name", "loads", "dumps", "errors")
+
+    def __init__(self, name, loads, dumps, errors):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        # ==== What loads raises on malformed input ====
+        self.errors = errors
+
+
+def _load(name):
+    if name == "orjson":
+        import orjson
+
+        return _Backend(name, orjson.loads, orjson.dumps, orjson.JSONDecodeError)
+    if name == "msgspec":
+        import msgspec
+
+        decoder, encoder = msgspec.json.Decoder(), msgspec.json.Encoder()
+        return _Backend(name, decoder.decode, encoder.encode, msgspec.DecodeError)
+    if name == "json":
+        import json
+
+        def dumps(value):
+            return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+        return _Backend(name, json.loads, dumps, ValueError)
+    raise ValueError(f"Unknown JSON backend '{name}', expected one of: auto, {', '.join(JSON_BACKENDS)}.")
+
+
+def set_json_backend(name="auto"):
+    """
+    Select the JSON library used to decode provider responses.
+
+    Args:
+        name (str): ``orjson``, ``msgspec``, ``json`` (the standard library) or ``auto`` for the first one installed.
+
+    Returns:
+        str: The name of the selected backend.
+    """
+    global _backend
+    if name == "auto":
+        for candidate in JSON_BACKENDS:
+            try:
+                backend = _load(candidate)
+            except ImportError:
+                continue
+            break
+    else:
+        try:
+            backend = _load(name)
+        except ImportError as e:
+            raise ImportError(f"{name} is not installed. Install it using 'pip install {name}'") from e
+
+    with _backend_lock:
+        _backend = backend
+    return backend.name
+
+
+def _get_backend():
+    # ==== Resolved on first use, so importing omni_authify does not import a JSON library ====
+    backend = _backend
+    if backend is None:
+        set_json_backend("auto")
+        backend = _backend
+    return backend
+
+
+def get_json_backend():
+    return _get_backend().name
+
+
+def json_loads(data):
+    """
+    Decode JSON ``bytes`` or ``str`` with the selected backend.
+    """
+    return _get_backend().loads(data)
+
+
+def json_dumps(value):
+    """
+    Encode ``value`` as compact UTF-8 JSON ``bytes`` with the selected backend.
+    """
+    return _get_backend().dumps(value)
+
+
+def response_json(response):
+    """
+    Decode the body of a provider response (requests or httpx) with the selected backend.
+
+    Raises:
+        InvalidResponseError: The body is not valid JSON.
+    """
+    backend = _get_backend()
+    try:
+        return backend.loads(response.content)
+    except backend.errors as e:
+        raise InvalidResponseError(f"Invalid JSON in the provider response: {e}") from e
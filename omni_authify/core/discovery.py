@@ -0,0 +1,212 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+from .codec import json_dumps, json_loads, response_json
+from .exceptions import ProviderError
+from .transport import get_default_transport
+
+__all__ = ["OIDCDiscovery", "get_discovery"]
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+_WELL_KNOWN = "/.well-known/openid-configuration"
+_REQUIRED = ("issuer", "authorization_endpoint", "token_endpoint", "jwks_uri")
+
+
+def _default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "omni-authify", "discovery")
+
+
+class OIDCDiscovery:
+    """
+    Metadata of one OpenID Connect provider, read from its ``.well-known/openid-configuration`` document.
+
+    ``metadata`` never waits on the network: it returns the document held in memory, or ``None`` while none is known,
+    in which case providers keep their built-in endpoints. The document is read from the disk cache on first use and
+    fetched by a background thread when missing or about to expire, so it is requested once per ``ttl`` and process
+    rather than per login. A failed fetch keeps the current document (or the built-in endpoints) and is retried after
+    ``retry_interval``.
+    """
+
+    def __init__(self, url, transport=None, ttl=86400, cache_dir=None, refresh_ahead=3600, retry_interval=300):
+        """
+        Args:
+            url (str): The discovery document URL, ending in ``/.well-known/openid-configuration``.
+            transport (HTTPTransport, optional): Transport used to fetch the document.
+            ttl (int): Seconds to keep the document when the response has no ``max-age``.
+            cache_dir (str, optional): Directory of the disk cache, ``~/.cache/omni-authify/discovery`` by default.
+                ``False`` keeps the document in memory only.
+            refresh_ahead (int): Seconds before expiry at which a background refresh starts.
+            retry_interval (int): Seconds to wait after a failed fetch before trying again.
+        """
+        self.url = url
+        self.transport = transport or get_default_transport()
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.retry_interval = retry_interval
+        if cache_dir is None:
+            cache_dir = _default_cache_dir()
+        self.path = None
+        if cache_dir is not False:
+            self.path = os.path.join(cache_dir, f"{hashlib.sha256(url.encode()).hexdigest()[:24]}.json")
+
+        # ======== (generation, document), replaced as a whole so readers never see a torn pair ========
+        self._state = (0, None)
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._source = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._background_refresh = None
+
+        # ======== Counters ========
+        self.refreshes = 0
+        self.errors = 0
+
+    @property
+    def generation(self):
+        """
+        Incremented every time a different document is loaded; 0 while none is known.
+        """
+        return self._state[0]
+
+    def current(self):
+        """
+        Return ``(generation, document)`` without blocking, starting a background refresh when one is due.
+        """
+        if not self._loaded:
+            self._load_disk()
+        if time.time() >= self._refresh_at:
+            self._start_background_refresh()
+        return self._state
+
+    def metadata(self):
+        """
+        Return the discovery document, or ``None`` while none was loaded yet. Never waits on the network.
+        """
+        return self.current()[1]
+
+    def refresh(self):
+        """
+        Fetch the document now, e.g. at application start-up.
+
+        Raises:
+            ProviderError: The document is invalid or does not belong to its issuer.
+        """
+        with self._fetch_lock:
+            self._fetch()
+        return self._state[1]
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "source": self._source,
+            "generation": self.generation,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "expires_in": max(0.0, self._expires_at - time.time()),
+        }
+
+    # ======== Loading ========
+    def _validate(self, document):
+        if not isinstance(document, dict) or any(not isinstance(document.get(key), str) for key in _REQUIRED):
+            raise ProviderError(f"Invalid OpenID Connect discovery document at {self.url}")
+        # ==== OpenID Connect Discovery 1.0, section 4.3: the issuer must be the URL the document was read from ====
+        if document["issuer"].rstrip("/") + _WELL_KNOWN != self.url:
+            raise ProviderError(f"Discovery document at {self.url} is for issuer {document['issuer']}")
+        return document
+
+    def _store(self, document, expires_at, source):
+        generation, current = self._state
+        if document != current:
+            self._state = (generation + 1, document)
+        self._expires_at = expires_at
+        # ==== Short-lived documents are refreshed halfway through instead of as soon as they arrive ====
+        lifetime = max(0.0, expires_at - time.time())
+        self._refresh_at = expires_at - min(self.refresh_ahead, lifetime / 2)
+        self._source = source
+
+    def _load_disk(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                if self.path is not None and os.path.exists(self.path):
+                    with open(self.path, "rb") as file:
+                        entry = json_loads(file.read())
+                    if entry.get("url") == self.url:
+                        # ==== An expired entry is still served, until the refresh it triggers replaces it ====
+                        self._store(self._validate(entry["metadata"]), entry["expires_at"], "disk")
+            except Exception:
+                # ==== A corrupt or foreign cache file is ignored and overwritten by the next fetch ====
+                pass
+            self._loaded = True
+
+    def _fetch(self):
+        try:
+            response = self.transport.get(self.url)
+            response.raise_for_status()
+            document = self._validate(response_json(response))
+        except Exception:
+            self.errors += 1
+            self._refresh_at = time.time() + self.retry_interval
+            raise
+
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        expires_at = time.time() + (int(match.group(1)) if match else self.ttl)
+        self._store(document, expires_at, "network")
+        self._loaded = True
+        self.refreshes += 1
+        self._write_disk(document, expires_at)
+
+    def _write_disk(self, document, expires_at):
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as file:
+                file.write(json_dumps({"url": self.url, "expires_at": expires_at, "metadata": document}))
+            # ==== Atomic, so a concurrent reader sees the old or the new file, never a partial one ====
+            os.replace(temporary, self.path)
+        except OSError:
+            # ==== The disk cache is an optimization; a read-only home still gets the in-memory document ====
+            pass
+
+    def _start_background_refresh(self):
+        if self._background_refresh is not None and self._background_refresh.is_alive():
+            return
+        self._background_refresh = threading.Thread(target=self._refresh_quietly, daemon=True)
+        self._background_refresh.start()
+
+    def _refresh_quietly(self):
+        if not self._fetch_lock.acquire(blocking=False):
+            return
+        try:
+            self._fetch()
+        except Exception:
+            # ==== The current document, or the provider's built-in endpoints, stay in use ====
+            pass
+        finally:
+            self._fetch_lock.release()
+
+
+_discoveries = {}
+_discoveries_lock = threading.Lock()
+
+
+def get_discovery(url, transport=None, **options):
+    """
+    Return the process-wide ``OIDCDiscovery`` of the document at ``url``; ``options`` apply when it is created.
+    """
+    discovery = _discoveries.get(url)
+    if discovery is None:
+        with _discoveries_lock:
+            discovery = _discoveries.get(url)
+            if discovery is None:
+                discovery = _discoveries[url] = OIDCDiscovery(url, transport=transport, **options)
+    return discovery
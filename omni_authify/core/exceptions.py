@@ -8,3 +8,25 @@ class ProviderError(AuthifyException):
 
 class IntegrationError(AuthifyException):
     """Exception raised for integration errors."""
+
+class TenantNotFoundError(IntegrationError):
+    """Exception raised when a tenant, or one of its providers, has no configuration."""
+
+class InvalidStateError(AuthifyException):
+    """Exception raised when an OAuth state token is forged, expired or replayed."""
+
+class InvalidResponseError(ProviderError, ValueError):
+    """Exception raised when a provider response body is not valid JSON, whichever JSON backend decoded it."""
+
+class RateLimitExceeded(ProviderError):
+    """Exception raised when a provider's rate limit budget is exhausted."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(ProviderError):
+    """Exception raised when calls to a provider host are suspended after repeated failures."""
+
+class DeadlineExceeded(ProviderError):
+    """Exception raised when a provider call runs out of its time budget."""
@@ -0,0 +1,260 @@
+import functools
+import re
+import threading
+from collections import OrderedDict
+
+from .codec import json_dumps
+
+__all__ = ["FieldSpec", "FieldCostTracker", "get_field_cost_tracker", "field_cost_stats"]
+
+_NAME = re.compile(r"[A-Za-z0-9_]+")
+
+
+class FieldSpec:
+    """
+    Parsed Graph API ``fields`` parameter, e.g. ``id,name,picture.width(200){url},friends.limit(5){name}``.
+
+    Fields are deduplicated (repeated projections of one field are merged) and sorted, so equivalent specs share one
+    canonical ``encoded`` string, which is what goes on the wire and keys the cost statistics. ``parse`` caches the
+    specs it builds, so a provider encodes its fields once rather than on every request.
+    """
+
+    __slots__ = ("fields", "encoded")
+
+    def __init__(self, fields):
+        """
+        Args:
+            fields (dict): ``{name: (modifiers, subfields)}`` where ``modifiers`` is a tuple of ``"width(200)"``
+                strings and ``subfields`` a ``FieldSpec`` or ``None``.
+        """
+        self.fields = dict(sorted(fields.items()))
+        self.encoded = ",".join(_encode_field(name, *projection) for name, projection in self.fields.items())
+
+    @classmethod
+    def parse(cls, fields):
+        """
+        Build the spec of ``fields``, given as a comma-separated string or an iterable of strings.
+
+        Raises:
+            ValueError: The spec is malformed, or projects one field in two different ways.
+        """
+        if isinstance(fields, FieldSpec):
+            return fields
+        if not isinstance(fields, str):
+            fields = ",".join(fields)
+        return _parse_cached(fields)
+
+    @property
+    def names(self):
+        return tuple(self.fields)
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def __str__(self):
+        return self.encoded
+
+    def __repr__(self):
+        return f"FieldSpec({self.encoded!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, FieldSpec) and self.encoded == other.encoded
+
+    def __hash__(self):
+        return hash(self.encoded)
+
+
+def _encode_field(name, modifiers, subfields):
+    encoded = name + "".join(f".{modifier}" for modifier in modifiers)
+    return f"{encoded}{{{subfields.encoded}}}" if subfields is not None else encoded
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(text):
+    parser = _Parser(text)
+    spec = parser.fields()
+    if parser.position != len(text):
+        parser.error("unexpected '" + text[parser.position] + "'")
+    return spec
+
+
+class _Parser:
+    """
+    Recursive descent over ``field (',' field)*`` with ``field = name ('.' name '(' args ')')* ('{' fields '}')?``.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.position = 0
+
+    def error(self, message):
+        raise ValueError(f"Invalid fields '{self.text}' at position {self.position}: {message}")
+
+    def skip_spaces(self):
+        while self.position < len(self.text) and self.text[self.position].isspace():
+            self.position += 1
+
+    def peek(self):
+        self.skip_spaces()
+        return self.text[self.position] if self.position < len(self.text) else ""
+
+    def name(self):
+        self.skip_spaces()
+        match = _NAME.match(self.text, self.position)
+        if not match:
+            self.error("expected a field name")
+        self.position = match.end()
+        return match.group()
+
+    def fields(self):
+        fields = {}
+        while True:
+            if self.peek() in (",", "}", ""):
+                # ==== Tolerate empty items such as "id,,name" or a trailing comma ====
+                if self.peek() == ",":
+                    self.position += 1
+                    continue
+                break
+            name, modifiers, subfields = self.field()
+            previous = fields.get(name)
+            if previous is not None:
+                if previous[0] != modifiers:
+                    self.error(f"'{name}' is projected twice with different modifiers")
+                subfields = _merge(previous[1], subfields)
+            fields[name] = (modifiers, subfields)
+        if not fields:
+            self.error("expected at least one field")
+        return FieldSpec(fields)
+
+    def field(self):
+        name = self.name()
+        modifiers = []
+        while self.peek() == ".":
+            self.position += 1
+            modifier = self.name()
+            if self.peek() != "(":
+                self.error(f"expected '(' after modifier '{modifier}'")
+            end = self.text.find(")", self.position)
+            if end == -1:
+                self.error("unclosed '('")
+            arguments = self.text[self.position + 1:end].strip()
+            self.position = end + 1
+            modifiers.append(f"{modifier}({arguments})")
+
+        subfields = None
+        if self.peek() == "{":
+            self.position += 1
+            subfields = self.fields()
+            if self.peek() != "}":
+                self.error("expected '}'")
+            self.position += 1
+        return name, tuple(sorted(modifiers)), subfields
+
+
+def _merge(first, second):
+    if first is None or second is None:
+        return first or second
+    fields = dict(first.fields)
+    for name, (modifiers, subfields) in second.fields.items():
+        if name in fields:
+            if fields[name][0] != modifiers:
+                raise ValueError(f"'{name}' is projected twice with different modifiers")
+            subfields = _merge(fields[name][1], subfields)
+        fields[name] = (modifiers, subfields)
+    return FieldSpec(fields)
+
+
+class FieldCostTracker:
+    """
+    Response size and latency of every field set requested from one provider, to find the expensive projections.
+
+    Every response counts towards its field set. One response in ``sample_every`` (and the first of each field set)
+    is also measured per top-level field, by encoding each value of the decoded body, so the stats can show how many
+    bytes ``friends`` or ``picture`` add on their own. Only the ``max_field_sets`` most recently requested field sets
+    are kept, so callers building field lists per request cannot grow it without bound.
+    """
+
+    def __init__(self, name, sample_every=16, max_field_sets=256):
+        self.name = name
+        self.sample_every = sample_every
+        self.max_field_sets = max_field_sets
+        self.evictions = 0
+        self._sets = OrderedDict()
+        self._fields = {}
+        self._lock = threading.Lock()
+
+    def record(self, spec, size, seconds, payload=None, count=1):
+        """
+        Record ``count`` profiles fetched with ``spec`` in one response of ``size`` bytes that took ``seconds``.
+
+        Args:
+            payload (dict): The decoded profile, measured per top-level field when this response is sampled.
+        """
+        with self._lock:
+            entry = self._sets.get(spec.encoded)
+            if entry is None:
+                entry = self._sets[spec.encoded] = {"requests": 0, "profiles": 0, "bytes": 0, "seconds": 0.0,
+                                                    "max_seconds": 0.0}
+                while len(self._sets) > self.max_field_sets:
+                    self._sets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._sets.move_to_end(spec.encoded)
+            entry["requests"] += 1
+            entry["profiles"] += count
+            entry["bytes"] += size
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            sampled = (entry["requests"] - 1) % self.sample_every == 0
+
+        if sampled and isinstance(payload, dict):
+            sizes = {name: len(json_dumps(payload[name])) for name in spec.names if name in payload}
+            with self._lock:
+                for name, field_size in sizes.items():
+                    total, samples = self._fields.get(name, (0, 0))
+                    self._fields[name] = (total + field_size, samples + 1)
+
+    def stats(self):
+        """
+        Returns:
+            dict: ``field_sets`` maps each encoded field set to its request count, average bytes per profile and
+            average/max latency in milliseconds; ``fields`` maps each top-level field to its average encoded bytes.
+        """
+        with self._lock:
+            field_sets = {
+                encoded: {
+                    "requests": entry["requests"],
+                    "avg_bytes": entry["bytes"] / entry["profiles"],
+                    "avg_latency_ms": entry["seconds"] / entry["requests"] * 1000,
+                    "max_latency_ms": entry["max_seconds"] * 1000,
+                }
+                for encoded, entry in self._sets.items()
+            }
+            fields = {name: total / samples for name, (total, samples) in self._fields.items()}
+        return {"field_sets": field_sets, "fields": dict(sorted(fields.items(), key=lambda item: -item[1]))}
+
+    def reset(self):
+        with self._lock:
+            self._sets.clear()
+            self._fields.clear()
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_field_cost_tracker(provider_name):
+    """
+    Return the process-wide ``FieldCostTracker`` of ``provider_name``.
+    """
+    tracker = _trackers.get(provider_name)
+    if tracker is None:
+        with _trackers_lock:
+            tracker = _trackers.get(provider_name)
+            if tracker is None:
+                tracker = _trackers[provider_name] = FieldCostTracker(provider_name)
+    return tracker
+
+
+def field_cost_stats():
+    return {name: tracker.stats() for name, tracker in list(_trackers.items())}
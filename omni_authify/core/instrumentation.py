@@ -0,0 +1,282 @@
+import contextvars
+import functools
+import inspect
+import threading
+import time
+
+__all__ = [
+    "InstrumentationEvent", "Instrumentation", "PrometheusInstrumentation", "OpenTelemetryInstrumentation",
+    "add_instrumentation", "remove_instrumentation", "get_instrumentations", "track", "track_retry", "instrumented",
+    "record_response",
+]
+
+# ======== Registered instrumentations; an empty tuple keeps every hook a single truthiness check ========
+_instrumentations = ()
+_instrumentations_lock = threading.Lock()
+
+# ======== Innermost open event of the current thread or asyncio task ========
+_current_event = contextvars.ContextVar("omni_authify_event", default=None)
+
+
+class InstrumentationEvent:
+    """
+    Timing of one phase of a login: ``authorization_url``, ``token_exchange``, ``token_refresh``, ``profile_fetch``,
+    ``identity_fetch``, ``scope_check``, ``id_token_verify``, ``retry`` or a framework ``callback``.
+
+    ``status`` and ``bytes`` describe the last HTTP response received during the phase, ``retries`` counts the
+    retried attempts, ``error`` is the exception that ended the phase, if any, and ``duration`` is in seconds.
+    """
+
+    __slots__ = ("phase", "provider", "status", "bytes", "retries", "duration", "error", "attributes", "parent",
+                 "started")
+
+    def __init__(self, phase, provider, attributes=None, parent=None):
+        self.phase = phase
+        self.provider = provider
+        self.status = None
+        self.bytes = 0
+        self.retries = 0
+        self.duration = None
+        self.error = None
+        self.attributes = attributes or {}
+        self.parent = parent
+        self.started = None
+
+    def __repr__(self):
+        return (f"InstrumentationEvent(phase={self.phase!r}, provider={self.provider!r}, status={self.status!r}, "
+                f"bytes={self.bytes!r}, duration={self.duration!r})")
+
+
+class Instrumentation:
+    """
+    No-op base of the instrumentation hooks; subclasses override ``start`` and/or ``finish``.
+    """
+
+    def start(self, event):
+        """
+        Called when a phase begins. The returned value is handed back to ``finish``.
+        """
+        return None
+
+    def finish(self, event, token):
+        """
+        Called when a phase ends, with ``duration``, ``status``, ``bytes`` and ``error`` filled in.
+        """
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Observes phase durations, and response sizes when ``size_histogram`` is set, in Prometheus-style histograms.
+
+    Histograms need the ``phase``, ``provider`` and ``status`` labels; the status label is the HTTP status of the
+    phase, ``error`` when it failed without a response and ``ok`` otherwise. Without a histogram one is registered
+    with ``prometheus_client``.
+    """
+
+    DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, histogram=None, size_histogram=None):
+        if histogram is None:
+            try:
+                from prometheus_client import Histogram
+            except ImportError as e:
+                raise ImportError("prometheus_client is not installed. Install it using "
+                                  "'pip install prometheus-client'") from e
+
+            histogram = Histogram(
+                "omni_authify_phase_duration_seconds", "Duration of OAuth provider phases.",
+                ("phase", "provider", "status"), buckets=self.DURATION_BUCKETS,
+            )
+        self.histogram = histogram
+        self.size_histogram = size_histogram
+
+    def finish(self, event, token):
+        if event.status is not None:
+            status = str(event.status)
+        else:
+            status = "error" if event.error is not None else "ok"
+        labels = {"phase": event.phase, "provider": event.provider, "status": status}
+        self.histogram.labels(**labels).observe(event.duration)
+        if self.size_histogram is not None and event.bytes:
+            self.size_histogram.labels(**labels).observe(event.bytes)
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Opens an OpenTelemetry span per phase, nested like the phases themselves (a ``callback`` span holds the
+    ``token_exchange`` and ``profile_fetch`` spans, which hold their ``retry`` spans).
+
+    ``tracer`` needs ``start_as_current_span(name, attributes=...)`` as in ``opentelemetry.trace.Tracer``; without
+    one the global tracer provider's ``omni_authify`` tracer is used.
+    """
+
+    def __init__(self, tracer=None):
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError as e:
+                raise ImportError("opentelemetry-api is not installed. Install it using "
+                                  "'pip install opentelemetry-api'") from e
+
+            tracer = trace.get_tracer("omni_authify")
+        self.tracer = tracer
+
+    def start(self, event):
+        attributes = {"omni_authify.provider": event.provider, "omni_authify.phase": event.phase}
+        attributes.update(("omni_authify." + key, value) for key, value in event.attributes.items())
+        context = self.tracer.start_as_current_span(f"omni_authify.{event.phase}", attributes=attributes)
+        return context, context.__enter__()
+
+    def finish(self, event, token):
+        context, span = token
+        if event.status is not None:
+            span.set_attribute("http.response.status_code", event.status)
+        if event.bytes:
+            span.set_attribute("http.response.body.size", event.bytes)
+        if event.retries:
+            span.set_attribute("omni_authify.retries", event.retries)
+
+        error = event.error
+        if error is None:
+            context.__exit__(None, None, None)
+        else:
+            # ==== Exiting with the exception records it on the span and marks the span as failed ====
+            context.__exit__(type(error), error, error.__traceback__)
+
+
+def add_instrumentation(instrumentation):
+    """
+    Register an ``Instrumentation`` for every provider and framework integration of this process.
+    """
+    global _instrumentations
+    with _instrumentations_lock:
+        if instrumentation not in _instrumentations:
+            _instrumentations = _instrumentations + (instrumentation,)
+    return instrumentation
+
+
+def remove_instrumentation(instrumentation):
+    global _instrumentations
+    with _instrumentations_lock:
+        _instrumentations = tuple(item for item in _instrumentations if item is not instrumentation)
+
+
+def get_instrumentations():
+    return _instrumentations
+
+
+class _Span:
+    __slots__ = ("event", "instrumentations", "_tokens", "_reset")
+
+    def __init__(self, event, instrumentations):
+        self.event = event
+        self.instrumentations = instrumentations
+
+    def __enter__(self):
+        event = self.event
+        self._reset = _current_event.set(event)
+        self._tokens = [instrumentation.start(event) for instrumentation in self.instrumentations]
+        event.started = time.perf_counter()
+        return event
+
+    def __exit__(self, exc_type, exc, traceback):
+        event = self.event
+        event.duration = time.perf_counter() - event.started
+        if exc is not None:
+            event.error = exc
+        _current_event.reset(self._reset)
+        # ==== Finish in reverse order, so span-based instrumentations close their context LIFO ====
+        for instrumentation, token in zip(reversed(self.instrumentations), reversed(self._tokens)):
+            instrumentation.finish(event, token)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def track(phase, provider=None, **attributes):
+    """
+    Context manager timing ``phase`` and reporting it to the registered instrumentations.
+
+    It yields the ``InstrumentationEvent``, or ``None`` when nothing is registered or the phase is already open
+    for the same provider (``get_access_token`` delegating to ``get_token_response``). ``provider`` defaults to
+    the provider of the enclosing phase, then to the ``host`` attribute.
+    """
+    instrumentations = _instrumentations
+    if not instrumentations:
+        return _NULL_SPAN
+
+    parent = _current_event.get()
+    if parent is not None:
+        provider = provider or parent.provider
+        if parent.phase == phase and parent.provider == provider:
+            return _NULL_SPAN
+    provider = provider or attributes.get("host")
+    return _Span(InstrumentationEvent(phase, provider, attributes, parent), instrumentations)
+
+
+def track_retry(host, attempt, outcome):
+    """
+    Context manager around the backoff before retry number ``attempt``; ``outcome`` is the failed attempt's
+    response or exception. Also counts the retry on the enclosing phase.
+    """
+    span = track("retry", host=host, attempt=attempt)
+    if span is not _NULL_SPAN:
+        event = span.event
+        if isinstance(outcome, BaseException):
+            event.attributes["error"] = type(outcome).__name__
+        else:
+            event.status = outcome.status_code
+        if event.parent is not None:
+            event.parent.retries += 1
+    return span
+
+
+def record_response(response):
+    """
+    Record the status and body size of a response on the innermost open phase; called by the transports.
+    """
+    if not _instrumentations:
+        return
+    event = _current_event.get()
+    if event is not None:
+        event.status = response.status_code
+        event.bytes += len(response.content)
+
+
+def instrumented(phase):
+    """
+    Time every call of a provider method as ``phase``, attributed to the provider's lowercase class name.
+    """
+    def decorator(method):
+        if getattr(method, "_instrumented_phase", None) is not None:
+            return method
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapper(self, *args, **kwargs):
+                if not _instrumentations:
+                    return await method(self, *args, **kwargs)
+                with track(phase, type(self).__name__.lower()):
+                    return await method(self, *args, **kwargs)
+        else:
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                if not _instrumentations:
+                    return method(self, *args, **kwargs)
+                with track(phase, type(self).__name__.lower()):
+                    return method(self, *args, **kwargs)
+
+        wrapper._instrumented_phase = phase
+        return wrapper
+    return decorator
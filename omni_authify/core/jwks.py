@@ -0,0 +1,162 @@
+import re
+import threading
+import time
+
+from .codec import response_json
+from .exceptions import ProviderError
+from .oidc import load_signing_keys
+from .transport import get_default_transport
+
+__all__ = ["JWKSCache", "get_jwks_cache"]
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class JWKSCache:
+    """
+    Signing keys of one JWKS endpoint, indexed by ``kid``.
+
+    Keys are kept for the ``Cache-Control: max-age`` the endpoint sends and refreshed by a background thread shortly
+    before they expire, so logins never wait on the JWKS request. A token signed with an unknown ``kid`` (a key
+    rotation) triggers one refetch shared by every concurrent caller, at most once per ``min_refetch_interval``.
+    """
+
+    def __init__(self, url, transport=None, default_max_age=3600, refresh_ahead=300, min_refetch_interval=10):
+        """
+        Args:
+            url (str): The JWKS endpoint.
+            transport (HTTPTransport, optional): Transport used to fetch the keys.
+            default_max_age (int): Seconds to keep keys when the response has no ``max-age``.
+            refresh_ahead (int): Seconds before expiry at which a background refresh starts.
+            min_refetch_interval (int): Minimum seconds between refetches caused by unknown ``kid`` values.
+        """
+        self.url = url
+        self.transport = transport or get_default_transport()
+        self.default_max_age = default_max_age
+        self.refresh_ahead = refresh_ahead
+        self.min_refetch_interval = min_refetch_interval
+
+        self._keys = {}
+        self._expires_at = 0.0
+        self._fetched_at = None
+        self._generation = 0
+        self._fetch_lock = threading.Lock()
+        self._background_refresh = None
+
+        # ======== Counters ========
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def get_key(self, kid):
+        """
+        Return the public key for ``kid``, fetching the JWKS only when it is unknown or expired.
+        """
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None and now < self._expires_at:
+            self.hits += 1
+            if now >= self._expires_at - self.refresh_ahead:
+                self._start_background_refresh()
+            return key
+
+        self.misses += 1
+        generation = self._generation
+        fetched_recently = self._fetched_at is not None and now - self._fetched_at < self.min_refetch_interval
+        if key is None and fetched_recently and now < self._expires_at:
+            raise ProviderError(f"No signing key '{kid}' found at {self.url}")
+
+        self._refresh(generation)
+        key = self._keys.get(kid)
+        if key is None:
+            raise ProviderError(f"No signing key '{kid}' found at {self.url}")
+        return key
+
+    async def aget_key(self, kid):
+        """
+        Asyncio variant of ``get_key``; cache hits never leave the event loop.
+        """
+        key = self._keys.get(kid)
+        if key is not None and time.monotonic() < self._expires_at - self.refresh_ahead:
+            self.hits += 1
+            return key
+        import asyncio
+
+        return await asyncio.to_thread(self.get_key, kid)
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "keys": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "expires_in": max(0.0, self._expires_at - time.monotonic()),
+        }
+
+    def _refresh(self, generation):
+        with self._fetch_lock:
+            # ==== Another caller refreshed while we were waiting for the lock ====
+            if self._generation != generation:
+                return
+            self._fetch()
+
+    def _fetch(self):
+        try:
+            response = self.transport.get(self.url)
+            response.raise_for_status()
+            keys = load_signing_keys(response_json(response))
+        except Exception:
+            self.errors += 1
+            raise
+
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else self.default_max_age
+
+        now = time.monotonic()
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + max_age
+        self._generation += 1
+        self.refreshes += 1
+
+    def _start_background_refresh(self):
+        if self._background_refresh is not None and self._background_refresh.is_alive():
+            return
+        self._background_refresh = threading.Thread(target=self._refresh_quietly, daemon=True)
+        self._background_refresh.start()
+
+    def _refresh_quietly(self):
+        if not self._fetch_lock.acquire(blocking=False):
+            return
+        try:
+            self._fetch()
+        except Exception:
+            # ==== The current keys stay in use; the next request past expiry refetches synchronously ====
+            pass
+        finally:
+            self._fetch_lock.release()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_jwks_cache(url, transport=None):
+    """
+    Return the process-wide cache for the JWKS endpoint at ``url`` fetched through ``transport`` (the default
+    transport when omitted). Each transport gets its own cache, so keys are always fetched through the transport the
+    caller configured.
+    """
+    transport = transport or get_default_transport()
+    # ==== A cached JWKSCache holds its transport, so the id cannot be reused while the entry exists ====
+    key = (url, id(transport))
+    cache = _caches.get(key)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = _caches[key] = JWKSCache(url, transport=transport)
+    return cache
@@ -1,11 +1,15 @@
-from omni_authify import Facebook, GitHub, Google
-from omni_authify.providers.linkedin import LinkedIn
+from .cache import ProfileCache
+from .discovery import get_discovery
+from .exceptions import IntegrationError
 
 
 def get_provider(provider_name, provider_settings):
+    # ==== Imported here because the providers themselves depend on omni_authify.core ====
+    from omni_authify.providers import Facebook, GitHub, Google, LinkedIn, Twitter
+
     match provider_name:
         case 'facebook':
-            return Facebook(
+            provider = Facebook(
                 client_id=provider_settings.get('client_id'),
                 client_secret=provider_settings.get('client_secret'),
                 redirect_uri=provider_settings.get('redirect_uri'),
@@ -13,31 +17,54 @@ def get_provider(provider_name, provider_settings):
                 fields=provider_settings.get('fields'),
             )
         case 'github':
-            return GitHub(
+            provider = GitHub(
                 client_id=provider_settings.get('client_id'),
                 client_secret=provider_settings.get('client_secret'),
                 redirect_uri=provider_settings.get('redirect_uri'),
                 scope=provider_settings.get('scope'),
             )
         case 'google':
-                return Google(
+                provider = Google(
                     client_id=provider_settings.get('client_id'),
                     client_secret=provider_settings.get('client_secret'),
                     redirect_uri=provider_settings.get('redirect_uri'),
-                    scope=provider_settings.get('scopes'),
+                    scope=provider_settings.get('scope', provider_settings.get('scopes')),
+                    oidc=provider_settings.get('oidc', False),
                 )
         case 'linkedin':
-            return LinkedIn(
+            provider = LinkedIn(
+                client_id=provider_settings.get('client_id'),
+                client_secret=provider_settings.get('client_secret'),
+                redirect_uri=provider_settings.get('redirect_uri'),
+                scope=provider_settings.get('scope'),
+                oidc=provider_settings.get('oidc', False),
+            )
+        case 'twitter':
+            provider = Twitter(
                 client_id=provider_settings.get('client_id'),
                 client_secret=provider_settings.get('client_secret'),
                 redirect_uri=provider_settings.get('redirect_uri'),
                 scope=provider_settings.get('scope'),
             )
-
-        #     )
-        # case 'twitter':
-        #     return twitter(
-        #     )
 
         case _:
             raise NotImplementedError(f"Provider '{provider_name}' is not implemented.")
+
+    profile_cache = provider_settings.get('profile_cache')
+    if isinstance(profile_cache, dict):
+        profile_cache = ProfileCache(**profile_cache)
+    provider.profile_cache = profile_cache
+
+    provider.prewarm = bool(provider_settings.get('prewarm', False))
+
+    discovery = provider_settings.get('discovery')
+    if discovery:
+        if not hasattr(provider, 'DISCOVERY_URL'):
+            raise IntegrationError(f"Provider '{provider_name}' does not support OpenID Connect discovery.")
+        options = discovery if isinstance(discovery, dict) else {}
+        provider.discovery = get_discovery(provider.DISCOVERY_URL, **options)
+
+    if provider_settings.get('rate_limit'):
+        provider.rate_limit_options = provider_settings['rate_limit']
+
+    return provider
@@ -0,0 +1,70 @@
+from .exceptions import ProviderError
+
+__all__ = ["get_key_id", "load_signing_keys", "decode_id_token"]
+
+
+def _jwt():
+    try:
+        import jwt
+    except ImportError as e:
+        raise ImportError("PyJWT is not installed. Install it using 'pip install omni-authify[oidc]'") from e
+    return jwt
+
+
+def get_key_id(id_token):
+    """
+    Return the ``kid`` header of an id_token without verifying it.
+    """
+    jwt = _jwt()
+    try:
+        return jwt.get_unverified_header(id_token).get("kid")
+    except jwt.PyJWTError as e:
+        raise ProviderError(f"Malformed id_token: {e}") from e
+
+
+def load_signing_keys(jwks):
+    """
+    Parse a JWKS document into a ``{kid: public_key}`` mapping, skipping keys that are not used for signatures.
+    """
+    jwt = _jwt()
+    keys = {}
+    for jwk in jwks.get("keys", []):
+        if jwk.get("use", "sig") != "sig" or "kid" not in jwk:
+            continue
+        try:
+            keys[jwk["kid"]] = jwt.PyJWK(jwk).key
+        except jwt.PyJWTError:
+            continue
+    return keys
+
+
+def decode_id_token(id_token, key, audience, issuers, leeway=60):
+    """
+    Verify an id_token signature and its standard claims, returning the claims.
+
+    Args:
+        id_token (str): The encoded id_token returned by the token endpoint.
+        key: Public key matching the token's ``kid``.
+        audience (str): Expected ``aud``, the client ID of the application.
+        issuers (tuple): Accepted ``iss`` values.
+        leeway (int): Allowed clock skew in seconds for ``exp`` and ``iat``.
+
+    Returns:
+        dict: The verified claims.
+    """
+    jwt = _jwt()
+    try:
+        claims = jwt.decode(
+            id_token,
+            key=key,
+            algorithms=["RS256"],
+            audience=audience,
+            leeway=leeway,
+            options={"require": ["exp", "iat", "iss", "aud", "sub"]},
+        )
+    except jwt.PyJWTError as e:
+        raise ProviderError(f"Invalid id_token: {e}") from e
+
+    if claims["iss"] not in issuers:
+        raise ProviderError(f"Invalid id_token: unexpected issuer '{claims['iss']}'")
+    return claims
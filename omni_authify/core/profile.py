@@ -0,0 +1,124 @@
+from .codec import json_dumps, json_loads
+
+__all__ = ["ProfileMapping", "UserProfile"]
+
+_TRUE = frozenset({"true", "1", "yes"})
+
+
+class ProfileMapping:
+    """
+    Where each ``UserProfile`` field lives in one provider's profile payload.
+
+    Every keyword names a ``UserProfile`` field and gives a dotted path into the payload (``"picture.data.url"``),
+    or a tuple of paths tried in order, the first value that is not ``None`` wins (``("id", "sub")`` reads both the
+    userinfo and the id_token claims). Paths are split once, when the mapping is declared.
+    """
+
+    __slots__ = ("paths",)
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(UserProfile.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown UserProfile fields: {', '.join(sorted(unknown))}")
+        self.paths = tuple(
+            (field, tuple(tuple(path.split(".")) for path in ((paths,) if isinstance(paths, str) else paths)))
+            for field, paths in fields.items()
+        )
+
+    def extract(self, payload):
+        """
+        Return ``{field: value}`` for the fields found in ``payload``.
+        """
+        values = {}
+        for field, candidates in self.paths:
+            for path in candidates:
+                value = payload
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                    if value is None:
+                        break
+                if value is not None:
+                    values[field] = value
+                    break
+        return values
+
+
+class UserProfile:
+    """
+    Provider-independent user profile.
+
+    ``id`` is always a string and ``email_verified`` a bool (``None`` when the provider does not say). The provider
+    payload is kept as compact JSON bytes and decoded again on every ``raw`` access, so a cached profile costs its
+    slots plus one bytes object instead of a tree of dicts and strings.
+    """
+
+    __slots__ = ("provider", "id", "username", "name", "first_name", "last_name", "email", "email_verified",
+                 "picture", "_raw")
+
+    FIELDS = ("id", "username", "name", "first_name", "last_name", "email", "email_verified", "picture")
+
+    def __init__(self, provider: str, id: str, username: str = None, name: str = None, first_name: str = None,
+                 last_name: str = None, email: str = None, email_verified: bool = None, picture: str = None,
+                 raw: bytes = None):
+        self.provider = provider
+        self.id = id
+        self.username = username
+        self.name = name
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.email_verified = email_verified
+        self.picture = picture
+        self._raw = raw
+
+    @classmethod
+    def from_payload(cls, provider, payload, mapping, keep_raw=True):
+        """
+        Normalize a decoded profile payload.
+
+        Args:
+            provider (str): Lowercase provider name, e.g. ``"github"``.
+            payload (dict): The profile JSON, or id_token claims, returned by the provider.
+            mapping (ProfileMapping): The provider's field mapping.
+            keep_raw (bool): Keep the payload for ``raw``; without it the profile holds the normalized fields only.
+
+        Returns:
+            UserProfile: The normalized profile.
+        """
+        raw = json_dumps(payload) if keep_raw else None
+        return cls._build(provider, payload, mapping, raw)
+
+    @classmethod
+    def _build(cls, provider, payload, mapping, raw):
+        values = mapping.extract(payload)
+        if "id" not in values:
+            raise ValueError(f"The {provider} profile has no user id.")
+        values["id"] = str(values["id"])
+
+        verified = values.get("email_verified")
+        if isinstance(verified, str):
+            values["email_verified"] = verified.lower() in _TRUE
+        return cls(provider, raw=raw, **values)
+
+    @property
+    def raw(self):
+        """
+        The provider payload as returned, decoded on every access; ``None`` when it was not kept.
+        """
+        return None if self._raw is None else json_loads(self._raw)
+
+    def to_dict(self):
+        return {"provider": self.provider, **{field: getattr(self, field) for field in self.FIELDS}}
+
+    def __eq__(self, other):
+        if not isinstance(other, UserProfile):
+            return NotImplemented
+        return self.provider == other.provider and all(
+            getattr(self, field) == getattr(other, field) for field in self.FIELDS
+        )
+
+    def __hash__(self):
+        return hash((self.provider, self.id))
+
+    def __repr__(self):
+        return f"UserProfile(provider={self.provider!r}, id={self.id!r}, email={self.email!r}, name={self.name!r})"
@@ -0,0 +1,314 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from .exceptions import RateLimitExceeded
+
+__all__ = [
+    "RateLimitTracker", "TokenRateLimits", "discard_rate_limits", "get_rate_limit_tracker", "get_token_rate_limits",
+    "rate_limit_stats",
+]
+
+
+class RateLimitTracker:
+    """
+    Client-side view of one provider app's rate limit budget.
+
+    ``observe`` reads the budget the provider reports on every response (GitHub ``X-RateLimit-*``, Facebook
+    ``X-App-Usage``, ``Retry-After`` on 429 and on GitHub's secondary rate limit 403) and ``acquire`` is called before each request. While the budget lasts
+    ``acquire`` returns at once, counting requests in flight against the reported ``remaining`` so concurrent callers
+    do not overshoot it. Once it is exhausted, calls are delayed until the budget resets when that is at most
+    ``max_delay`` seconds away, and rejected with ``RateLimitExceeded`` otherwise, without reaching the provider.
+
+    An optional local token bucket (``rate`` requests per second, bursts of ``burst``) caps the request rate of this
+    process on top of the provider's budget.
+    """
+
+    DELAY = "delay"
+    REJECT = "reject"
+
+    def __init__(self, name, policy=DELAY, max_delay=1.0, rate=None, burst=None, usage_threshold=95, cooldown=60):
+        """
+        Args:
+            name (str): Label used in errors and metrics, e.g. ``"github:<client_id>"``.
+            policy (str): ``"delay"`` to wait up to ``max_delay`` seconds for budget, ``"reject"`` to fail at once.
+            max_delay (float): Longest wait under the ``"delay"`` policy.
+            rate (float, optional): Local token bucket refill rate in requests per second.
+            burst (int, optional): Local token bucket capacity, defaults to ``rate``.
+            usage_threshold (float): Facebook ``X-App-Usage`` percentage at which calls stop.
+            cooldown (float): Seconds to hold calls once the Facebook usage threshold is reached.
+        """
+        if policy not in (self.DELAY, self.REJECT):
+            raise ValueError(f"Unknown rate limit policy '{policy}'")
+
+        self.name = name
+        self.policy = policy
+        self.max_delay = max_delay
+        self.usage_threshold = usage_threshold
+        self.cooldown = cooldown
+
+        self.rate = rate
+        self.burst = burst or (max(1, int(rate)) if rate else None)
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+
+        # ======== Budget reported by the provider ========
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.usage = None
+        self._blocked_until = 0.0
+
+        self._lock = threading.Lock()
+
+        # ======== Counters ========
+        self.delayed = 0
+        self.rejected = 0
+        self.total_delay = 0.0
+
+    # ======== Reading provider headers ========
+    def observe(self, response):
+        """
+        Update the budget from a provider response.
+
+        Raises:
+            RateLimitExceeded: The response itself is a rate limit rejection (403/429 with an exhausted budget).
+        """
+        headers = response.headers
+        now = time.monotonic()
+        with self._lock:
+            remaining = _to_int(headers.get("X-RateLimit-Remaining"))
+            if remaining is not None:
+                self.remaining = remaining
+                self.limit = _to_int(headers.get("X-RateLimit-Limit")) or self.limit
+                reset = _to_int(headers.get("X-RateLimit-Reset"))
+                if reset is not None:
+                    self.reset_at = reset
+                if remaining <= 0:
+                    self._block(now, (self.reset_at or 0) - time.time())
+
+            app_usage = headers.get("X-App-Usage")
+            if app_usage:
+                self.usage = _max_usage(app_usage)
+                if self.usage is not None and self.usage >= self.usage_threshold:
+                    self._block(now, self.cooldown)
+
+            # ==== 429, or 403 for GitHub's secondary rate limits, which leave the primary budget untouched ====
+            retry_after = _to_int(headers.get("Retry-After"))
+            if response.status_code in (403, 429) and retry_after is not None:
+                self._block(now, retry_after)
+
+            wait = self._blocked_until - now
+        if response.status_code in (403, 429) and wait > 0:
+            raise RateLimitExceeded(f"{self.name} rate limit exceeded", retry_after=wait)
+
+    def _block(self, now, seconds):
+        self._blocked_until = max(self._blocked_until, now + max(0.0, seconds))
+
+    # ======== Admission ========
+    def acquire(self, cost=1):
+        """
+        Take ``cost`` requests from the budget, sleeping under the ``"delay"`` policy when it is exhausted.
+
+        Raises:
+            RateLimitExceeded: No budget is available within ``max_delay`` seconds.
+        """
+        wait = self._reserve(cost)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, cost=1):
+        """
+        Asyncio variant of ``acquire``; waiting never blocks the event loop.
+        """
+        wait = self._reserve(cost)
+        if wait:
+            import asyncio
+
+            await asyncio.sleep(wait)
+
+    def _reserve(self, cost):
+        with self._lock:
+            now = time.monotonic()
+            if self._blocked_until and now >= self._blocked_until:
+                # ==== The provider window has reset: forget the exhausted count until the next response ====
+                self._blocked_until = 0.0
+                if self.remaining is not None and self.remaining <= 0:
+                    self.remaining = None
+
+            wait = max(0.0, self._blocked_until - now)
+            if self.remaining is not None and self.remaining < cost and not wait:
+                wait = max(0.0, (self.reset_at or 0) - time.time())
+            wait = max(wait, self._bucket_wait(now, cost))
+
+            if wait and (self.policy == self.REJECT or wait > self.max_delay):
+                self.rejected += 1
+                raise RateLimitExceeded(f"{self.name} rate limit exceeded", retry_after=wait)
+
+            # ==== Reserve the budget now so concurrent callers see it taken ====
+            if self.remaining is not None:
+                self.remaining -= cost
+            if self.rate:
+                self._tokens -= cost
+            if wait:
+                self.delayed += 1
+                self.total_delay += wait
+            return wait
+
+    def _bucket_wait(self, now, cost):
+        if not self.rate:
+            return 0.0
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        return max(0.0, (cost - self._tokens) / self.rate)
+
+    # ======== Metrics ========
+    def stats(self):
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "remaining": max(0, self.remaining) if self.remaining is not None else None,
+            "reset_in": max(0.0, self.reset_at - time.time()) if self.reset_at else None,
+            "usage": self.usage,
+            "blocked_for": max(0.0, self._blocked_until - now),
+            "bucket_tokens": self._tokens,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "total_delay": self.total_delay,
+        }
+
+
+def _to_int(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _max_usage(app_usage):
+    """
+    Highest percentage of ``X-App-Usage`` (``{"call_count": 28, "total_time": 25, "total_cputime": 25}``).
+    """
+    try:
+        values = json.loads(app_usage).values()
+        return max(float(value) for value in values)
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class TokenRateLimits:
+    """
+    Rate limit budgets of one provider app, counted per user access token.
+
+    GitHub reports ``X-RateLimit-*`` for the token a request was made with, not for the app, so each token gets its own
+    ``RateLimitTracker`` and an exhausted token only holds back the requests made with it. Tokens are keyed by a hash,
+    never kept in memory, and only the ``max_tokens`` most recently used budgets are remembered.
+    """
+
+    def __init__(self, name, max_tokens=10_000, **options):
+        """
+        Args:
+            name (str): Label prefixed to the per-token tracker names, e.g. ``"github:<client_id>"``.
+            max_tokens (int): Budgets kept before the least recently used are forgotten.
+            options: ``RateLimitTracker`` options, applied to every token's tracker.
+        """
+        self.name = name
+        self.max_tokens = max_tokens
+        self.options = options
+        self.evictions = 0
+        self._trackers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, access_token):
+        """
+        Return the tracker of ``access_token``, creating it on first use.
+        """
+        key = hashlib.sha256(access_token.encode()).hexdigest()[:32]
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is not None:
+                self._trackers.move_to_end(key)
+                return tracker
+            tracker = self._trackers[key] = RateLimitTracker(f"{self.name}:{key[:8]}", **self.options)
+            while len(self._trackers) > self.max_tokens:
+                self._trackers.popitem(last=False)
+                self.evictions += 1
+            return tracker
+
+    def stats(self):
+        trackers = list(self._trackers.values())
+        return {
+            "name": self.name,
+            "tokens": len(trackers),
+            "evictions": self.evictions,
+            "blocked": sum(1 for tracker in trackers if tracker.stats()["blocked_for"] > 0),
+            "delayed": sum(tracker.delayed for tracker in trackers),
+            "rejected": sum(tracker.rejected for tracker in trackers),
+        }
+
+    def __len__(self):
+        return len(self._trackers)
+
+
+# ======== Apps whose budgets are remembered, least recently used first out ========
+MAX_TRACKED_APPS = 10_000
+
+_trackers = OrderedDict()
+_token_limits = OrderedDict()
+_trackers_lock = threading.Lock()
+
+
+def _registered(registry, key, factory):
+    with _trackers_lock:
+        value = registry.get(key)
+        if value is not None:
+            registry.move_to_end(key)
+            return value
+        value = registry[key] = factory()
+        while len(registry) > MAX_TRACKED_APPS:
+            registry.popitem(last=False)
+        return value
+
+
+def get_rate_limit_tracker(provider_name, client_id, **options):
+    """
+    Return the process-wide tracker of one provider app, so every provider instance of the app shares its budget.
+
+    ``options`` are passed to ``RateLimitTracker`` when the tracker is created. The budgets of the
+    ``MAX_TRACKED_APPS`` most recently used apps are kept.
+    """
+    key = f"{provider_name}:{client_id}"
+    return _registered(_trackers, key, lambda: RateLimitTracker(key, **options))
+
+
+def get_token_rate_limits(provider_name, client_id, **options):
+    """
+    Return the process-wide per-token budgets of one provider app, for providers that rate limit each access token.
+
+    ``options`` are passed to ``TokenRateLimits`` when it is created.
+    """
+    key = f"{provider_name}:{client_id}"
+    return _registered(_token_limits, key, lambda: TokenRateLimits(key, **options))
+
+
+def discard_rate_limits(provider_name, client_id):
+    """
+    Forget the budgets of one provider app, e.g. once the tenant owning it was evicted.
+    """
+    key = f"{provider_name}:{client_id}"
+    with _trackers_lock:
+        _trackers.pop(key, None)
+        _token_limits.pop(key, None)
+
+
+def rate_limit_stats():
+    """
+    Current budget of every tracked provider app, keyed by tracker name. Apps limited per token report a summary of
+    their token budgets under ``"<name>:tokens"``.
+    """
+    stats = {name: tracker.stats() for name, tracker in list(_trackers.items())}
+    stats.update({f"{name}:tokens": limits.stats() for name, limits in list(_token_limits.items())})
+    return stats
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import threading
+
+from .oauth import get_provider
+
+__all__ = ["ProviderRegistry", "provider_registry"]
+
+
+class ProviderRegistry:
+    """
+    Process-wide cache of provider instances.
+
+    One provider is kept per provider name, with a fingerprint of the settings it was built from, so framework
+    wrappers built per request share one validated provider (and its pooled transport) instead of constructing a new
+    one each time. Settings with a new fingerprint replace the provider built from the previous ones, so reloaded
+    settings do not leave stale instances behind; ``invalidate`` drops providers explicitly.
+    """
+
+    def __init__(self):
+        # ======== provider name -> (settings fingerprint, provider) ========
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(provider_settings):
+        """
+        Stable digest of a provider settings dict.
+        """
+        encoded = json.dumps(provider_settings, sort_keys=True, default=repr).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, provider_name, provider_settings):
+        """
+        Return the provider for ``provider_name`` built from ``provider_settings``, constructing it on first use.
+        """
+        fingerprint = self.fingerprint(provider_settings)
+        entry = self._providers.get(provider_name)
+        if entry is None or entry[0] != fingerprint:
+            with self._lock:
+                entry = self._providers.get(provider_name)
+                if entry is None or entry[0] != fingerprint:
+                    entry = self._providers[provider_name] = (
+                        fingerprint, get_provider(provider_name, provider_settings)
+                    )
+        return entry[1]
+
+    def invalidate(self, provider_name=None):
+        """
+        Drop cached providers, either all of them or only those registered under ``provider_name``.
+        """
+        with self._lock:
+            if provider_name is None:
+                self._providers.clear()
+            else:
+                self._providers.pop(provider_name, None)
+
+    def __len__(self):
+        return len(self._providers)
+
+
+provider_registry = ProviderRegistry()
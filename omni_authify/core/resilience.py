@@ -0,0 +1,161 @@
+import random
+import threading
+import time
+
+from .exceptions import CircuitOpenError
+
+__all__ = ["RetryPolicy", "CircuitBreaker", "CircuitBreakerRegistry"]
+
+
+class RetryPolicy:
+    """
+    Decides which failed provider calls are retried, and how long to wait before the next attempt.
+
+    A request that never reached the provider (connection refused, connect timeout) is always safe to send again.
+    A request that may have been processed (read timeout, dropped connection, 5xx response) is retried only for
+    idempotent methods: replaying a token exchange POST would spend the single-use authorization code twice.
+    """
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(self, retries=2, backoff_factor=0.2, max_backoff=2.0, status_forcelist=(502, 503, 504)):
+        """
+        Args:
+            retries (int): Maximum number of attempts after the first one.
+            backoff_factor (float): Upper bound of the first backoff in seconds, doubled on every attempt.
+            max_backoff (float): Cap of a single backoff in seconds.
+            status_forcelist (tuple): Response statuses treated as transient.
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_forcelist = frozenset(status_forcelist)
+
+    def retry_error(self, method, attempt, sent):
+        """
+        Whether to retry after attempt number ``attempt`` (0-based) raised; ``sent`` tells whether it reached the
+        provider.
+        """
+        return attempt < self.retries and (not sent or method.upper() in self.IDEMPOTENT_METHODS)
+
+    def retry_status(self, method, attempt, status_code):
+        return (
+            attempt < self.retries
+            and status_code in self.status_forcelist
+            and method.upper() in self.IDEMPOTENT_METHODS
+        )
+
+    def backoff(self, attempt):
+        """
+        "Full jitter" exponential backoff, so workers that failed together do not retry in lockstep.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Fails calls to one host fast while it is down.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and calls raise ``CircuitOpenError`` without
+    touching the network. After ``recovery_timeout`` seconds one probe call is let through (half-open): its success
+    closes the breaker, its failure opens it again. A probe that ends without an outcome, e.g. cancelled, gives its
+    slot back through ``release``; one that never reports back loses it after another ``recovery_timeout``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, host, failure_threshold=5, recovery_timeout=30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raises:
+            CircuitOpenError: The host is considered down.
+        """
+        if self.state == self.CLOSED:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and self._probing and now - self._probe_started >= self.recovery_timeout:
+                # ==== The probe never reported back: let another call try ====
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                self._probe_started = now
+                return
+            if self.state == self.CLOSED:
+                return
+            self.rejected += 1
+            retry_after = max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+        raise CircuitOpenError(f"{self.host} is failing, calls are suspended for {retry_after:.1f}s")
+
+    def record_success(self):
+        if self.state == self.CLOSED and not self.failures:
+            return
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self._probing = False
+
+    def release(self):
+        """
+        Give back the half-open probe slot of a call that ended without an outcome, e.g. cancelled.
+        """
+        if self._probing:
+            with self._lock:
+                self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self):
+        return {"state": self.state, "failures": self.failures, "opened": self.opened, "rejected": self.rejected}
+
+
+class CircuitBreakerRegistry:
+    """
+    One ``CircuitBreaker`` per provider host, created on first use.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(host)
+                if breaker is None:
+                    breaker = self._breakers[host] = CircuitBreaker(
+                        host, failure_threshold=self.failure_threshold, recovery_timeout=self.recovery_timeout
+                    )
+        return breaker
+
+    def stats(self):
+        return {host: breaker.stats() for host, breaker in list(self._breakers.items())}
@@ -0,0 +1,91 @@
+from .profile import ProfileMapping
+
+__all__ = ["ProviderSpec"]
+
+_TOKEN_METHODS = ("GET", "POST")
+_TOKEN_AUTH = ("body", "basic")
+_PROFILE_AUTH = ("bearer", "query")
+_RATE_LIMITED = (None, "app", "token")
+
+
+class ProviderSpec:
+    """
+    Declarative description of an OAuth2 provider, interpreted by ``OAuth2Provider``.
+
+    A spec holds what tells providers apart: their endpoints, how the token request is sent and authenticated, how
+    the access token reaches the profile endpoint and where the profile fields live. Values are checked once, when the
+    provider class is declared, so a request only reads attributes.
+    """
+
+    __slots__ = (
+        "authorize_url", "token_url", "profile_url", "authorization_params", "token_method", "token_auth",
+        "token_headers", "grant_type", "token_errors_in_body", "profile_auth", "profile_params", "profile_root",
+        "profile_mapping", "refresh", "pkce", "rate_limited",
+    )
+
+    def __init__(self, authorize_url, token_url, profile_url, authorization_params=None, token_method="POST",
+                 token_auth="body", token_headers=None, grant_type=True, token_errors_in_body=False,
+                 profile_auth="bearer", profile_params=None, profile_root=None, profile_mapping=None, refresh=False,
+                 pkce=False, rate_limited=None):
+        """
+        Args:
+            authorize_url (str): The authorization endpoint the user is redirected to.
+            token_url (str): The endpoint exchanging the code, and refresh tokens, for an access token.
+            profile_url (str): The userinfo endpoint.
+            authorization_params (tuple, optional): Names of the authorization URL parameters among ``client_id``,
+                ``redirect_uri``, ``response_type`` and ``scope``, in the order the provider documents them.
+            token_method (str): ``"POST"`` sends the token request as a form, ``"GET"`` as a query string.
+            token_auth (str): ``"body"`` sends the client secret with the request, ``"basic"`` in an HTTP Basic
+                ``Authorization`` header.
+            token_headers (dict, optional): Headers sent with every token request.
+            grant_type (bool): Send ``grant_type=authorization_code`` with the code exchange.
+            token_errors_in_body (bool): The token endpoint reports errors as HTTP 200 with an ``error`` body.
+            profile_auth (str): ``"bearer"`` sends the access token in an ``Authorization`` header, ``"query"`` as
+                the ``access_token`` parameter.
+            profile_params (dict, optional): Query parameters sent with every profile request.
+            profile_root (str, optional): Key the profile is nested under in the userinfo response, e.g. ``"data"``.
+            profile_mapping (ProfileMapping, optional): Where the ``UserProfile`` fields live in the profile.
+            refresh (bool): The token endpoint accepts ``grant_type=refresh_token``.
+            pkce (bool): Send a PKCE ``code_challenge`` with the authorization and its verifier with the exchange,
+                for providers that require PKCE. The verifier is an HMAC of the login's ``state`` under the client
+                secret, so it differs for every login without being stored; the state must therefore be passed to
+                both ``get_authorization_url`` and the code exchange (``get_user_info(code, fields, state)``).
+            rate_limited (str, optional): Profile requests go through a ``RateLimitTracker``: ``"app"`` for
+                providers counting one budget per app (Facebook ``X-App-Usage``), ``"token"`` for providers counting
+                a budget per access token (GitHub ``X-RateLimit-*``).
+
+        Raises:
+            ValueError: A value is not one of the supported styles.
+        """
+        if token_method not in _TOKEN_METHODS:
+            raise ValueError(f"token_method must be one of {', '.join(_TOKEN_METHODS)}, not {token_method!r}")
+        if token_auth not in _TOKEN_AUTH:
+            raise ValueError(f"token_auth must be one of {', '.join(_TOKEN_AUTH)}, not {token_auth!r}")
+        if profile_auth not in _PROFILE_AUTH:
+            raise ValueError(f"profile_auth must be one of {', '.join(_PROFILE_AUTH)}, not {profile_auth!r}")
+        if rate_limited not in _RATE_LIMITED:
+            raise ValueError(f"rate_limited must be None, 'app' or 'token', not {rate_limited!r}")
+        if profile_mapping is not None and not isinstance(profile_mapping, ProfileMapping):
+            raise ValueError("profile_mapping must be a ProfileMapping")
+
+        self.authorize_url = authorize_url
+        self.token_url = token_url
+        self.profile_url = profile_url
+        self.authorization_params = tuple(
+            authorization_params or ("client_id", "redirect_uri", "response_type", "scope")
+        )
+        self.token_method = token_method
+        self.token_auth = token_auth
+        self.token_headers = dict(token_headers or {})
+        self.grant_type = grant_type
+        self.token_errors_in_body = token_errors_in_body
+        self.profile_auth = profile_auth
+        self.profile_params = dict(profile_params or {})
+        self.profile_root = profile_root
+        self.profile_mapping = profile_mapping
+        self.refresh = refresh
+        self.pkce = pkce
+        self.rate_limited = rate_limited
+
+    def __repr__(self):
+        return f"ProviderSpec({self.authorize_url!r}, {self.token_url!r}, {self.profile_url!r})"
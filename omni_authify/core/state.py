@@ -0,0 +1,222 @@
+import base64
+import hashlib
+import hmac
+import inspect
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from .exceptions import InvalidStateError
+
+__all__ = ["MemoryReplayCache", "RedisReplayCache", "StateSigner", "default_replay_cache"]
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class MemoryReplayCache:
+    """
+    In-process set of consumed state nonces, each kept until its token could no longer be accepted anyway.
+
+    Every entry lives for the same ``ttl``, so entries expire in insertion order and pruning only looks at the
+    oldest ones. Past ``max_entries`` the oldest nonces are forgotten first.
+    """
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key, ttl):
+        """
+        Record ``key`` for ``ttl`` seconds, returning ``False`` when it was already recorded.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            if key in self._entries:
+                return False
+            self._entries[key] = now + ttl
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    async def aadd(self, key, ttl):
+        """
+        Asyncio variant of ``add``; the cache is in memory, so it never waits.
+        """
+        return self.add(key, ttl)
+
+    def _prune(self, now):
+        entries = self._entries
+        while entries:
+            key, expires_at = next(iter(entries.items()))
+            if expires_at > now:
+                break
+            del entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisReplayCache:
+    """
+    Replay cache shared by every worker through a Redis-like store.
+
+    ``client`` needs ``set(key, value, nx=True, ex=seconds)`` as in redis-py, which records a nonce and tells whether
+    it was new in one round trip. With a ``redis.asyncio`` client, ``aadd`` awaits that round trip, so async callbacks
+    verify states without blocking the event loop.
+    """
+
+    def __init__(self, client, prefix="omni_authify:state:"):
+        self.client = client
+        self.prefix = prefix
+
+    def add(self, key, ttl):
+        return bool(self.client.set(self.prefix + key, 1, nx=True, ex=max(1, int(ttl))))
+
+    async def aadd(self, key, ttl):
+        result = self.client.set(self.prefix + key, 1, nx=True, ex=max(1, int(ttl)))
+        if inspect.isawaitable(result):
+            result = await result
+        return bool(result)
+
+
+# ==== Shared by default so a state issued by one wrapper instance is consumed by any other ====
+default_replay_cache = MemoryReplayCache()
+
+
+class StateSigner:
+    """
+    Issues and verifies stateless OAuth ``state`` tokens.
+
+    A token is ``<issued_at>.<nonce>.<signature>``, an HMAC-SHA256 over the provider name, issue time and a random
+    nonce. Verifying it needs no session or database read: the signature proves it was issued here, the issue time
+    bounds its lifetime, and the replay cache rejects a nonce that was already used.
+
+    The token is also bound to the browser that started the login: ``bind`` sets an HMAC of its nonce in a
+    short-lived HttpOnly, SameSite=Lax cookie on the login response, and ``verify`` requires that cookie back. A state
+    taken from someone else's login redirect is then rejected, so a callback link carrying an attacker's code and
+    state cannot log the victim into the attacker's account (login CSRF).
+    """
+
+    COOKIE_PREFIX = "omni_authify_state_"
+
+    def __init__(self, secret_key, max_age=600, replay_cache=None):
+        """
+        Args:
+            secret_key (str | bytes): Server-side secret, e.g. Django's ``SECRET_KEY``.
+            max_age (int): Seconds a state token stays valid, the lifetime of an authorization code round trip.
+            replay_cache: ``MemoryReplayCache`` shared by the process (default), ``RedisReplayCache`` or an object
+                with the same ``add`` method.
+        """
+        if not secret_key:
+            raise ValueError("A secret key is required to sign OAuth state tokens.")
+        if isinstance(secret_key, str):
+            secret_key = secret_key.encode()
+
+        # ==== Derive a dedicated key so the application secret is never used directly for state tokens ====
+        self._key = hashlib.sha256(b"omni_authify.state:" + secret_key).digest()
+        self.max_age = max_age
+        self.replay_cache = replay_cache if replay_cache is not None else default_replay_cache
+
+    @classmethod
+    def from_settings(cls, omni_authify_settings, secret_key=None):
+        """
+        Build the signer described by the OMNI_AUTHIFY settings: ``SECRET_KEY`` (falling back to ``secret_key``),
+        ``STATE_MAX_AGE`` and ``STATE_REPLAY_CACHE``.
+        """
+        return cls(
+            omni_authify_settings.get('SECRET_KEY') or secret_key,
+            max_age=omni_authify_settings.get('STATE_MAX_AGE') or 600,
+            replay_cache=omni_authify_settings.get('STATE_REPLAY_CACHE'),
+        )
+
+    def issue(self, provider_name=""):
+        """
+        Return a new state token bound to ``provider_name``.
+        """
+        payload = f"{int(time.time()):x}.{secrets.token_urlsafe(12)}"
+        return f"{payload}.{self._sign(provider_name, payload)}"
+
+    def cookie_name(self, provider_name=""):
+        """
+        Name of the cookie binding ``provider_name`` logins to the browser, so parallel logins with different
+        providers do not overwrite each other.
+        """
+        return f"{self.COOKIE_PREFIX}{provider_name or 'default'}"
+
+    def cookie_value(self, token):
+        """
+        The cookie value binding ``token`` to a browser: an HMAC of its nonce, which only this server can compute.
+        """
+        nonce = token.split(".")[1] if token.count(".") == 2 else ""
+        return self._sign("\0cookie", nonce)
+
+    def bind(self, response, token, provider_name="", secure=True):
+        """
+        Set the cookie binding ``token`` to the browser on the login ``response``.
+
+        ``response`` is any framework response with a Django/Flask/Starlette style ``set_cookie``. The cookie lives
+        as long as the token, is HttpOnly, and SameSite=Lax so the browser sends it back with the provider's
+        top-level redirect to the callback. Pass ``secure=False`` only for a plain-http ``redirect_uri``.
+        """
+        response.set_cookie(
+            self.cookie_name(provider_name), self.cookie_value(token), max_age=self.max_age, path="/",
+            secure=secure, httponly=True, samesite="Lax",
+        )
+        return response
+
+    def verify(self, token, provider_name="", cookie=None):
+        """
+        Check that ``token`` was issued for ``provider_name`` to this browser, is not older than ``max_age`` and is
+        used only once.
+
+        Args:
+            token (str): The ``state`` query parameter of the callback.
+            provider_name (str): The provider the token was issued for.
+            cookie (str): The callback request's ``cookie_name(provider_name)`` cookie, set by ``bind``.
+
+        Raises:
+            InvalidStateError: The token is missing, forged, expired, issued to another browser or replayed.
+        """
+        nonce = self._check(token, provider_name, cookie)
+        if not self.replay_cache.add(nonce, self.max_age):
+            raise InvalidStateError("OAuth state has already been used")
+
+    async def averify(self, token, provider_name="", cookie=None):
+        """
+        Asyncio variant of ``verify``, awaiting the replay cache's ``aadd`` when it has one.
+        """
+        nonce = self._check(token, provider_name, cookie)
+        aadd = getattr(self.replay_cache, "aadd", None)
+        added = await aadd(nonce, self.max_age) if aadd is not None else self.replay_cache.add(nonce, self.max_age)
+        if not added:
+            raise InvalidStateError("OAuth state has already been used")
+
+    def _check(self, token, provider_name, cookie):
+        if not token:
+            raise InvalidStateError("Missing OAuth state")
+
+        payload, _, signature = token.rpartition(".")
+        if not hmac.compare_digest(self._sign(provider_name, payload), signature):
+            raise InvalidStateError("Invalid OAuth state signature")
+
+        issued_at, _, nonce = payload.partition(".")
+        age = time.time() - int(issued_at, 16)
+        # ==== A minute of leeway for clock skew between the workers that issue and verify ====
+        if not -60 <= age <= self.max_age:
+            raise InvalidStateError("Expired OAuth state")
+
+        # ==== Checked before the replay cache, so a state from another browser does not burn its nonce ====
+        if not cookie or not hmac.compare_digest(self._sign("\0cookie", nonce), cookie):
+            raise InvalidStateError("OAuth state was not issued to this browser")
+        return nonce
+
+    def _sign(self, provider_name, payload):
+        message = f"{provider_name}\0{payload}".encode()
+        return _b64encode(hmac.new(self._key, message, hashlib.sha256).digest()[:16])
@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .codec import json_loads
+from .exceptions import TenantNotFoundError
+from .oauth import get_provider
+from .ratelimit import discard_rate_limits
+
+__all__ = ["TenantConfigStore", "JSONLinesTenantSource"]
+
+# ==== Cached in place of the settings of a tenant the source does not know ====
+_MISSING = object()
+
+
+class JSONLinesTenantSource:
+    """
+    Tenant source backed by a JSON Lines file, one ``{"tenant": "<id>", "providers": {...}}`` object per line.
+
+    The file is indexed on first lookup, keeping only each tenant's byte offset in memory, and a tenant's line is read
+    and decoded when the store asks for it. ``reload`` re-indexes the file after it was rewritten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._offsets = None
+        self._lock = threading.Lock()
+
+    def _index(self):
+        offsets = {}
+        with open(self.path, "rb") as file:
+            offset = 0
+            for line in file:
+                if line.strip():
+                    offsets[str(json_loads(line)["tenant"])] = offset
+                offset += len(line)
+        return offsets
+
+    def __call__(self, tenant_id):
+        offsets = self._offsets
+        if offsets is None:
+            with self._lock:
+                if self._offsets is None:
+                    self._offsets = self._index()
+                offsets = self._offsets
+
+        offset = offsets.get(tenant_id)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            return json_loads(file.readline())["providers"]
+
+    def reload(self):
+        with self._lock:
+            self._offsets = None
+
+    def __len__(self):
+        return len(self._offsets or ())
+
+
+class TenantConfigStore:
+    """
+    Provider settings and provider instances for many tenants, each with its own OAuth apps.
+
+    ``source`` maps a tenant id to ``{provider_name: provider_settings}``: a dict, a ``JSONLinesTenantSource``, or any
+    callable such as a database lookup, returning ``None`` for unknown tenants. It is only consulted on a cache miss,
+    so resolving a tenant is a dict lookup once it is warm. At most ``max_tenants`` tenants' settings and
+    ``max_providers`` providers are kept, least recently used first out, so an idle tenant costs nothing once evicted:
+    the rate limit budgets of an evicted provider's app are dropped with it.
+    Providers share the default pooled transports, so a tenant's provider adds no connections of its own.
+    """
+
+    def __init__(self, source, max_tenants=10_000, max_providers=1_000, ttl=None, defaults=None):
+        """
+        Args:
+            source (Mapping | Callable): Tenant id to ``{provider_name: provider_settings}``.
+            max_tenants (int): Tenants whose settings are kept in memory.
+            max_providers (int): Provider instances kept in memory, across all tenants.
+            ttl (float, optional): Seconds before a tenant's settings are read from ``source`` again, e.g. to pick up
+                rotated secrets. Kept until ``invalidate`` by default.
+            defaults (dict, optional): ``{provider_name: settings}`` shared by every tenant, which tenant settings
+                override, e.g. the ``scope`` or ``profile_cache``.
+        """
+        self.source = source.get if hasattr(source, "get") and not callable(source) else source
+        self.max_tenants = max_tenants
+        self.max_providers = max_providers
+        self.ttl = ttl
+        self.defaults = defaults or {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._tenants = OrderedDict()
+        self._providers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tenant(self, tenant_id):
+        with self._lock:
+            entry = self._tenants.get(tenant_id)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                self._tenants.move_to_end(tenant_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # ==== Loaded outside the lock so a slow source does not hold up other tenants ====
+        providers = self.source(tenant_id)
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._tenants[tenant_id] = (expires_at, _MISSING if providers is None else providers)
+            self._tenants.move_to_end(tenant_id)
+            while len(self._tenants) > self.max_tenants:
+                self._tenants.popitem(last=False)
+                self.evictions += 1
+        return _MISSING if providers is None else providers
+
+    def get_settings(self, tenant_id, provider_name):
+        """
+        Return the settings of ``provider_name`` for ``tenant_id``, merged over the shared ``defaults``.
+
+        Raises:
+            TenantNotFoundError: The tenant is unknown, or has no settings for this provider.
+        """
+        return self._settings(tenant_id, self._tenant(tenant_id), provider_name)
+
+    def _settings(self, tenant_id, providers, provider_name):
+        if providers is _MISSING:
+            raise TenantNotFoundError(f"Tenant '{tenant_id}' is not configured.")
+        provider_settings = providers.get(provider_name)
+        if provider_settings is None:
+            raise TenantNotFoundError(f"Tenant '{tenant_id}' has no settings for provider '{provider_name}'.")
+        defaults = self.defaults.get(provider_name)
+        return {**defaults, **provider_settings} if defaults else provider_settings
+
+    def get_provider(self, tenant_id, provider_name):
+        """
+        Return the provider instance of ``tenant_id`` for ``provider_name``, building it on first use.
+
+        A provider is rebuilt when the tenant's settings were reloaded from the source.
+        """
+        providers = self._tenant(tenant_id)
+        key = (tenant_id, provider_name)
+        with self._lock:
+            entry = self._providers.get(key)
+            if entry is not None and entry[0] is providers:
+                self._providers.move_to_end(key)
+                return entry[1]
+
+        provider = get_provider(provider_name, self._settings(tenant_id, providers, provider_name))
+        with self._lock:
+            self._providers[key] = (providers, provider)
+            self._providers.move_to_end(key)
+            evicted = []
+            while len(self._providers) > self.max_providers:
+                evicted.append(self._providers.popitem(last=False)[1][1])
+            if evicted:
+                self._discard_rate_limits(evicted)
+        return provider
+
+    def _discard_rate_limits(self, evicted):
+        # ==== Forget the rate limit budgets of apps no cached tenant uses any more ====
+        apps = {(type(cached), cached.client_id) for _, cached in self._providers.values()}
+        for provider in evicted:
+            if (type(provider), provider.client_id) not in apps:
+                discard_rate_limits(type(provider).__name__.lower(), provider.client_id)
+
+    def invalidate(self, tenant_id=None):
+        """
+        Drop the cached settings and providers of ``tenant_id``, or of every tenant.
+        """
+        with self._lock:
+            if tenant_id is None:
+                self._tenants.clear()
+                self._providers.clear()
+                return
+            self._tenants.pop(tenant_id, None)
+            for key in [key for key in self._providers if key[0] == tenant_id]:
+                del self._providers[key]
+
+    def stats(self):
+        """
+        Returns:
+            dict: Cached ``tenants`` and ``providers``, settings cache ``hits``, ``misses`` and ``evictions``.
+        """
+        return {
+            "tenants": len(self._tenants),
+            "providers": len(self._providers),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """
+        Build a store over a JSON Lines tenant file, see ``JSONLinesTenantSource``.
+        """
+        return cls(JSONLinesTenantSource(os.fspath(path)), **options)
+
+    def __len__(self):
+        return len(self._tenants)
@@ -0,0 +1,260 @@
+import threading
+import time
+from collections import deque
+
+from .exceptions import DeadlineExceeded, ProviderError
+
+__all__ = ["TokenSet", "TokenManager"]
+
+
+class TokenSet:
+    """
+    A token response kept whole: the access token plus its ``refresh_token``, expiry and raw ``response``.
+    """
+
+    __slots__ = ("access_token", "refresh_token", "expires_at", "response")
+
+    def __init__(self, access_token, refresh_token=None, expires_at=None, response=None):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = expires_at
+        self.response = response or {}
+
+    @classmethod
+    def from_response(cls, response, previous=None, now=None):
+        """
+        Build a TokenSet from a token endpoint response.
+
+        Refresh responses that omit ``refresh_token`` (Google, LinkedIn) keep the one from ``previous``.
+        """
+        if not response.get("access_token"):
+            raise ProviderError("The token response has no access_token")
+        expires_in = response.get("expires_in")
+        expires_at = (now or time.time()) + int(expires_in) if expires_in else None
+        refresh_token = response.get("refresh_token") or (previous.refresh_token if previous else None)
+        return cls(response["access_token"], refresh_token, expires_at, response)
+
+    def expires_within(self, seconds, now=None):
+        return self.expires_at is not None and self.expires_at - (now or time.time()) <= seconds
+
+    def __repr__(self):
+        return f"TokenSet(expires_at={self.expires_at!r}, refreshable={self.refresh_token is not None})"
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TokenManager:
+    """
+    Keeps the token sets of many grants and renews them before they expire.
+
+    ``get_access_token(key)`` returns a token that stays valid for at least ``refresh_ahead`` seconds whenever the
+    grant can be refreshed. Concurrent refreshes of one grant, from threads or from asyncio tasks, collapse into a
+    single token request: callers holding a still-valid token keep using it, and callers whose token already
+    expired wait for the in-flight refresh instead of sending their own.
+    """
+
+    def __init__(self, provider, refresh_ahead=60, latency_samples=1000, wait_timeout=30.0):
+        """
+        Args:
+            provider (BaseOAuth2Provider): Provider whose ``refresh_access_token`` renews the tokens.
+            refresh_ahead (int): Seconds before expiry at which a token is refreshed.
+            latency_samples (int): Number of recent refresh latencies kept for ``stats``.
+            wait_timeout (float): Longest wait for a refresh running in another thread or event loop, past which
+                ``DeadlineExceeded`` is raised.
+        """
+        self.provider = provider
+        self.refresh_ahead = refresh_ahead
+        self.wait_timeout = wait_timeout
+
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._tasks = {}
+
+        # ======== Counters ========
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.coalesced = 0
+        self._latencies = deque(maxlen=latency_samples)
+
+    # ======== Storing grants ========
+    def exchange(self, key, code, state=None):
+        """
+        Exchange an authorization code and keep the full token response under ``key`` (e.g. the user id).
+
+        ``state`` is the state the login was started with, required by the providers using PKCE.
+        """
+        args = (code, state) if state else (code,)
+        return self.set(key, self.provider.get_token_response(*args))
+
+    async def aexchange(self, key, code, state=None):
+        args = (code, state) if state else (code,)
+        return self.set(key, await self.provider.aget_token_response(*args))
+
+    def set(self, key, token_response):
+        """
+        Store a token response, or a TokenSet, under ``key`` and return the TokenSet.
+        """
+        tokens = token_response if isinstance(token_response, TokenSet) else TokenSet.from_response(token_response)
+        self._tokens[key] = tokens
+        return tokens
+
+    def get(self, key):
+        return self._tokens.get(key)
+
+    def discard(self, key):
+        self._tokens.pop(key, None)
+
+    # ======== Access tokens ========
+    def get_access_token(self, key):
+        """
+        Return a valid access token for ``key``, refreshing it first when it is about to expire.
+
+        Raises:
+            KeyError: No tokens are stored under ``key``.
+            ProviderError: The token expired and cannot be refreshed.
+        """
+        tokens = self._tokens[key]
+        if not self._needs_refresh(tokens):
+            return tokens.access_token
+
+        flight, leader = self._join_flight(key)
+        if not leader:
+            if not tokens.expires_within(0):
+                return tokens.access_token
+            self.coalesced += 1
+            self._wait_flight(key, flight, flight.done.wait(self.wait_timeout))
+            return self._flight_result(flight).access_token
+
+        try:
+            current = self._current(key, tokens)
+            if current is None:
+                started = time.perf_counter()
+                response = self.provider.refresh_access_token(tokens.refresh_token)
+                current = self._store_refreshed(key, tokens, response, started)
+            flight.result = current
+        except Exception as e:
+            self.refresh_errors += 1
+            flight.error = e
+        finally:
+            self._land_flight(key, flight)
+        return self._flight_result(flight).access_token
+
+    async def aget_access_token(self, key):
+        """
+        Asyncio variant of ``get_access_token``.
+
+        Tasks of one event loop await a shared refresh task; a refresh already running in a thread or another loop
+        is awaited without blocking the event loop.
+        """
+        import asyncio
+
+        tokens = self._tokens[key]
+        if not self._needs_refresh(tokens):
+            return tokens.access_token
+
+        loop_key = (asyncio.get_running_loop(), key)
+        task = self._tasks.get(loop_key)
+        if task is None:
+            flight, leader = self._join_flight(key)
+            if not leader:
+                if not tokens.expires_within(0):
+                    return tokens.access_token
+                self.coalesced += 1
+                self._wait_flight(key, flight, await asyncio.to_thread(flight.done.wait, self.wait_timeout))
+                return self._flight_result(flight).access_token
+
+            task = self._tasks[loop_key] = asyncio.ensure_future(self._arefresh(key, tokens, flight))
+
+            def landed(_):
+                self._tasks.pop(loop_key, None)
+                # ==== A task cancelled before its first step never runs _arefresh's finally ====
+                self._land_flight(key, flight)
+
+            task.add_done_callback(landed)
+        elif not tokens.expires_within(0):
+            return tokens.access_token
+        else:
+            self.coalesced += 1
+        return (await asyncio.shield(task)).access_token
+
+    async def _arefresh(self, key, tokens, flight):
+        try:
+            current = self._current(key, tokens)
+            if current is None:
+                started = time.perf_counter()
+                response = await self.provider.arefresh_access_token(tokens.refresh_token)
+                current = self._store_refreshed(key, tokens, response, started)
+            flight.result = current
+        except Exception as e:
+            self.refresh_errors += 1
+            flight.error = e
+        finally:
+            self._land_flight(key, flight)
+        return self._flight_result(flight)
+
+    def _needs_refresh(self, tokens):
+        return tokens.expires_within(self.refresh_ahead) and (tokens.refresh_token or tokens.expires_within(0))
+
+    def _current(self, key, tokens):
+        # ==== Another caller refreshed this grant between our expiry check and taking the flight ====
+        current = self._tokens.get(key)
+        if current is not None and current is not tokens and not self._needs_refresh(current):
+            return current
+        if tokens.refresh_token is None:
+            raise ProviderError("The access token expired and the grant has no refresh_token")
+        return None
+
+    def _join_flight(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _land_flight(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if flight.result is None and flight.error is None:
+            flight.error = ProviderError("The token refresh was interrupted before it completed")
+        flight.done.set()
+
+    def _wait_flight(self, key, flight, landed):
+        if not landed:
+            raise DeadlineExceeded(
+                f"The token refresh of {key!r} did not complete within {self.wait_timeout}s"
+            )
+
+    @staticmethod
+    def _flight_result(flight):
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _store_refreshed(self, key, tokens, response, started):
+        self._latencies.append(time.perf_counter() - started)
+        self.refreshes += 1
+        refreshed = TokenSet.from_response(response, previous=tokens)
+        self._tokens[key] = refreshed
+        return refreshed
+
+    # ======== Metrics ========
+    def stats(self):
+        latencies = sorted(self._latencies)
+        return {
+            "grants": len(self._tokens),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "coalesced": self.coalesced,
+            "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "latency_max": latencies[-1] if latencies else None,
+        }
@@ -0,0 +1,442 @@
+import itertools
+import logging
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+from .exceptions import CircuitOpenError, DeadlineExceeded
+from .instrumentation import record_response, track_retry
+from .resilience import CircuitBreakerRegistry, RetryPolicy
+
+__all__ = ["HTTPTransport", "AsyncHTTPTransport", "get_default_transport", "get_default_async_transport"]
+
+logger = logging.getLogger(__name__)
+
+# ==== Attribute prewarm() sets on the connections it opens: (host, deadline of the warm-up) ====
+_WARM_MARK = "_omni_authify_warm"
+
+
+class HTTPTransport:
+    """
+    Pooled HTTP transport used by every OAuth2 provider.
+
+    A single ``requests.Session`` keeps a keep-alive connection pool per provider host, so the token exchange
+    and the profile fetch of consecutive logins reuse already open TCP/TLS connections.
+
+    Every call is bounded by a ``deadline`` covering all of its attempts, transient failures are retried according
+    to a ``RetryPolicy``, and a ``CircuitBreaker`` per host fails calls fast while that provider is down.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=(3.05, 10), retries=2, backoff_factor=0.2,
+                 deadline=15.0, retry_policy=None, circuit_breaker=None, warm_connections=1, warm_window=30.0):
+        """
+        Args:
+            pool_connections (int): Number of per-host connection pools to keep.
+            pool_maxsize (int): Maximum number of keep-alive connections kept per host.
+            timeout (float | tuple): Default ``(connect, read)`` timeout of a single attempt.
+            retries (int): Retry budget for failed connections and transient 5xx responses.
+            backoff_factor (float): Upper bound of the first jittered backoff in seconds.
+            deadline (float): Default time budget in seconds for a call, retries and backoff included.
+            retry_policy (RetryPolicy, optional): Replaces the policy built from ``retries`` and ``backoff_factor``.
+            circuit_breaker (dict, optional): ``failure_threshold`` and ``recovery_timeout`` of the per-host breakers.
+            warm_connections (int): Connections ``prewarm`` keeps open ahead of use per host, at most.
+            warm_window (float): Seconds a pre-opened connection is expected to be used within.
+        """
+        # ==== Imported here so that importing omni_authify does not pay for requests until a provider is used ====
+        import requests
+        import urllib3
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retry_policy = retry_policy or RetryPolicy(retries=retries, backoff_factor=backoff_factor)
+        self.breakers = CircuitBreakerRegistry(**(circuit_breaker or {}))
+        self.retries = 0
+        self.errors = (requests.RequestException, CircuitOpenError, DeadlineExceeded)
+        self._request_errors = requests.RequestException
+
+        # ======== Retries are driven by request(), urllib3 only pools connections ========
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # ======== Connections opened by prewarm(): per host, the deadlines of the warm-ups not used yet ========
+        self.warm_connections = warm_connections
+        self.warm_window = warm_window
+        self.warmed = 0
+        self.warm_hits = 0
+        self.warm_expired = 0
+        self.warm_failed = 0
+        self._warm = {}
+        self._warm_lock = threading.Lock()
+        self._warm_executor = None
+        # ==== prewarm() relies on the connection pool internals of urllib3 2 ====
+        self.prewarm_supported = int(urllib3.__version__.split(".")[0]) >= 2
+        if self.prewarm_supported:
+            self.session.hooks["response"].append(self._use_warm)
+
+    def request(self, method, url, deadline=None, **kwargs):
+        """
+        Send a request, retrying transient failures within ``deadline`` seconds (the transport default when omitted).
+
+        Raises:
+            CircuitOpenError: The host's circuit breaker is open.
+            DeadlineExceeded: The deadline passed before an attempt could be made.
+        """
+        timeout = kwargs.pop("timeout", self.timeout)
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        host = urlsplit(url).netloc
+        breaker = self.breakers.get(host)
+
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{method} {url} did not complete within its deadline")
+            breaker.before_call()
+
+            try:
+                response = self.session.request(method, url, timeout=_clamp_timeout(timeout, remaining), **kwargs)
+            except self._request_errors as e:
+                breaker.record_failure()
+                if not self.retry_policy.retry_error(method, attempt, sent=not _connection_failed(e)):
+                    raise
+                outcome = e
+            except BaseException:
+                # ==== Interrupted (e.g. gevent.Timeout) before an outcome: free the half-open probe slot ====
+                breaker.release()
+                raise
+            else:
+                record_response(response)
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if not self.retry_policy.retry_status(method, attempt, response.status_code):
+                    return response
+                outcome = response
+
+            delay = self.retry_policy.backoff(attempt)
+            if time.monotonic() + delay >= deadline_at:
+                # ==== No time left for another attempt: surface what the last one produced ====
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            if not isinstance(outcome, Exception):
+                outcome.close()
+            with track_retry(host, attempt + 1, outcome):
+                time.sleep(delay)
+            attempt += 1
+            self.retries += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+    # ======== Connection warm-up ========
+    def prewarm(self, *urls):
+        """
+        Resolve and connect (TCP and TLS) to the hosts of ``urls`` in the background, ahead of the requests a login
+        is about to make, so the first of them skips the handshake.
+
+        A host gets at most ``warm_connections`` warm-ups waiting to be used; further calls return at once. A request
+        sent over a pre-opened connection counts as a warm hit, while warm-ups whose connection is not used within
+        ``warm_window`` seconds count as expired and their connection is left to the pool like any idle one. Warming
+        up needs urllib3 2; with older versions this does nothing.
+        """
+        if not self.prewarm_supported:
+            return
+        now = time.monotonic()
+        targets = []
+        with self._warm_lock:
+            self._expire_warm(now)
+            for url in urls:
+                host = urlsplit(url).netloc
+                pending = self._warm.setdefault(host, [])
+                if len(pending) >= self.warm_connections:
+                    continue
+                pending.append(now + self.warm_window)
+                targets.append((url, host, pending[-1]))
+            if targets and self._warm_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._warm_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="omni-authify-prewarm")
+        for url, host, deadline in targets:
+            self._warm_executor.submit(self._open_connection, url, host, deadline)
+
+    def _open_connection(self, url, host, deadline):
+        import requests
+
+        try:
+            # ==== The pool requests itself picks for this URL, TLS settings and proxies included ====
+            settings = self.session.merge_environment_settings(url, {}, None, None, None)
+            adapter = self.session.get_adapter(url)
+            pool = adapter.get_connection_with_tls_context(
+                requests.Request("GET", url).prepare(), settings["verify"], settings["proxies"], settings["cert"]
+            )
+            connection = pool._get_conn()
+            mark = getattr(connection, _WARM_MARK, None)
+            if connection.is_connected and mark is not None and mark[1] > time.monotonic():
+                # ==== The idle connection is another pending warm-up's: open one more next to it ====
+                pool._put_conn(connection)
+                connection = pool._new_conn()
+            try:
+                opened = not connection.is_connected
+                if opened:
+                    connection.timeout = self.timeout[0] if isinstance(self.timeout, tuple) else self.timeout
+                    connection.connect()
+                    setattr(connection, _WARM_MARK, (host, deadline))
+            finally:
+                pool._put_conn(connection)
+        except Exception as e:
+            logger.warning("Prewarming a connection to %s failed: %r", host, e)
+            with self._warm_lock:
+                self.warm_failed += 1
+                _discard_warm(self._warm, host, deadline)
+        else:
+            with self._warm_lock:
+                if opened:
+                    self.warmed += 1
+                else:
+                    # ==== The pool already held an open connection: nothing was warmed up ====
+                    _discard_warm(self._warm, host, deadline)
+
+    def _use_warm(self, response, **kwargs):
+        # ==== Response hook, run before the body is read while the response still holds its connection ====
+        if not self._warm:
+            return
+        connection = getattr(response.raw, "connection", None)
+        mark = getattr(connection, _WARM_MARK, None)
+        if mark is None:
+            return
+        setattr(connection, _WARM_MARK, None)
+        with self._warm_lock:
+            self._expire_warm(time.monotonic())
+            if _discard_warm(self._warm, *mark):
+                self.warm_hits += 1
+
+    def _expire_warm(self, now):
+        for host, pending in list(self._warm.items()):
+            while pending and pending[0] <= now:
+                pending.pop(0)
+                self.warm_expired += 1
+            if not pending:
+                del self._warm[host]
+
+    def stats(self):
+        with self._warm_lock:
+            self._expire_warm(time.monotonic())
+            used = self.warm_hits + self.warm_expired
+            warm = {
+                "warmed": self.warmed,
+                "hits": self.warm_hits,
+                "expired": self.warm_expired,
+                "failed": self.warm_failed,
+                "hit_ratio": self.warm_hits / used if used else None,
+            }
+        return {"retries": self.retries, "breakers": self.breakers.stats(), "warm": warm}
+
+    def close(self):
+        if self._warm_executor is not None:
+            self._warm_executor.shutdown(wait=False)
+        self.session.close()
+
+
+def _discard_warm(warm, host, deadline):
+    pending = warm.get(host)
+    if not pending or deadline not in pending:
+        return False
+    pending.remove(deadline)
+    if not pending:
+        del warm[host]
+    return True
+
+
+def _clamp_timeout(timeout, remaining):
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(None if part is None else min(part, remaining) for part in timeout)
+    return min(timeout, remaining)
+
+
+def _connection_failed(error):
+    """
+    Whether a requests error happened before the request was sent (refused connection, DNS, connect timeout).
+    """
+    import requests
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    """
+    Return the process-wide transport shared by providers that were not given their own.
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HTTPTransport()
+    return _default_transport
+
+
+class AsyncHTTPTransport:
+    """
+    Asyncio counterpart of ``HTTPTransport`` backed by a pooled ``httpx.AsyncClient``.
+
+    Accepts the same keyword arguments as ``HTTPTransport`` (``params``, ``data``, ``headers``, ...), and its
+    responses expose the same ``raise_for_status()``, ``content``, ``headers`` and ``status_code`` interface.
+    Deadlines, retries and circuit breakers behave as in ``HTTPTransport``.
+
+    The connections are split over ``pool_shards`` clients, used in turn. httpcore walks every pooled connection for
+    each queued request whenever a request starts or ends, so one pool of 100 connections spends more time on that
+    bookkeeping than on I/O once a worker has dozens of callbacks in flight; four pools of 25 do not.
+    """
+
+    def __init__(self, max_connections=100, max_keepalive_connections=20, timeout=(3.05, 10), retries=2,
+                 backoff_factor=0.2, deadline=15.0, retry_policy=None, circuit_breaker=None, pool_shards=4):
+        """
+        Args:
+            max_connections (int): Maximum number of concurrent connections across all hosts.
+            max_keepalive_connections (int): Maximum number of idle keep-alive connections kept open.
+            timeout (float | tuple): Default ``(connect, read)`` timeout of a single attempt.
+            retries (int): Retry budget for failed connections and transient 5xx responses.
+            backoff_factor (float): Upper bound of the first jittered backoff in seconds.
+            deadline (float): Default time budget in seconds for a call, retries and backoff included.
+            retry_policy (RetryPolicy, optional): Replaces the policy built from ``retries`` and ``backoff_factor``.
+            circuit_breaker (dict, optional): ``failure_threshold`` and ``recovery_timeout`` of the per-host breakers.
+            pool_shards (int): Number of ``httpx.AsyncClient`` pools sharing the connection limits.
+        """
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("httpx is not installed. Install it using 'pip install omni-authify[async]'") from e
+
+        self._httpx = httpx
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retry_policy = retry_policy or RetryPolicy(retries=retries, backoff_factor=backoff_factor)
+        self.breakers = CircuitBreakerRegistry(**(circuit_breaker or {}))
+        self.retries = 0
+        self.errors = (httpx.HTTPError, CircuitOpenError, DeadlineExceeded)
+
+        pool_shards = max(1, min(pool_shards, max_connections))
+        limits = httpx.Limits(
+            max_connections=-(-max_connections // pool_shards),
+            max_keepalive_connections=-(-max_keepalive_connections // pool_shards),
+        )
+        self.clients = [
+            httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(limits=limits)) for _ in range(pool_shards)
+        ]
+        self.client = self.clients[0]
+        self._next_client = itertools.cycle(self.clients).__next__
+
+    async def request(self, method, url, deadline=None, **kwargs):
+        import asyncio
+
+        # ==== Keep the requests-style keyword used by the sync transport ====
+        if "allow_redirects" in kwargs:
+            kwargs["follow_redirects"] = kwargs.pop("allow_redirects")
+        timeout = kwargs.pop("timeout", self.timeout)
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        host = urlsplit(url).netloc
+        breaker = self.breakers.get(host)
+
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{method} {url} did not complete within its deadline")
+            breaker.before_call()
+
+            try:
+                response = await self._next_client().request(
+                    method, url, timeout=self._httpx_timeout(timeout, remaining), **kwargs
+                )
+            except self._httpx.TransportError as e:
+                breaker.record_failure()
+                sent = not isinstance(e, (self._httpx.ConnectError, self._httpx.ConnectTimeout))
+                if not self.retry_policy.retry_error(method, attempt, sent=sent):
+                    raise
+                outcome = e
+            except BaseException:
+                # ==== Cancelled before an outcome: free the half-open probe slot ====
+                breaker.release()
+                raise
+            else:
+                record_response(response)
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if not self.retry_policy.retry_status(method, attempt, response.status_code):
+                    return response
+                outcome = response
+
+            delay = self.retry_policy.backoff(attempt)
+            if time.monotonic() + delay >= deadline_at:
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            with track_retry(host, attempt + 1, outcome):
+                await asyncio.sleep(delay)
+            attempt += 1
+            self.retries += 1
+
+    def _httpx_timeout(self, timeout, remaining):
+        timeout = _clamp_timeout(timeout, remaining)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return timeout
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def head(self, url, **kwargs):
+        return await self.request("HEAD", url, **kwargs)
+
+    def stats(self):
+        return {"retries": self.retries, "breakers": self.breakers.stats()}
+
+    async def aclose(self):
+        for client in self.clients:
+            await client.aclose()
+
+
+# ======== httpx connections are bound to the event loop that opened them, so keep one transport per loop ========
+_default_async_transports = weakref.WeakKeyDictionary()
+
+
+def get_default_async_transport():
+    """
+    Return the async transport shared by providers running on the current event loop.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    transport = _default_async_transports.get(loop)
+    if transport is None:
+        transport = _default_async_transports[loop] = AsyncHTTPTransport()
+    return transport
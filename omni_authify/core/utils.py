@@ -1,40 +1,86 @@
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-
-OMNI_AUTHIFY = {
-    'PROVIDERS':{
-        'facebook':{
-            'client_id':os.getenv('FACEBOOK_CLIENT_ID'),
-            'client_secret':os.getenv('FACEBOOK_CLIENT_SECRET'),
-            'redirect_uri':os.getenv('FACEBOOK_REDIRECT_URI'),
-            'state':os.getenv('FACEBOOK_STATE'), # optional
-            'scope':os.getenv('FACEBOOK_SCOPE'),  # by default | add other FB app permissions you have!
-            'fields':os.getenv('FACEBOOK_FIELDS')
-        },
-        'github':{
-            'client_id':os.getenv('GITHUB_CLIENT_ID'),
-            'client_secret':os.getenv('GITHUB_CLIENT_SECRET'),
-            'redirect_uri':os.getenv('GITHUB_CLIENT_REDIRECT_URI'),
-            'scope':os.getenv('GITHUB_CLIENT_SCOPE'),
-        },
-        'google':{
-            'client_id':os.getenv('GOOGLE_CLIENT_ID'),
-            'client_secret':os.getenv('GOOGLE_CLIENT_SECRET'),
-            'redirect_uri':os.getenv('GOOGLE_REDIRECT_URI'),
-            'state':os.getenv('GOOGLE_STATE'), # optional
-            'scope':os.getenv('GOOGLE_SCOPE')
-        },
-        'linkedin':{
-            'client_id':os.getenv('LINKEDIN_CLIENT_ID'),
-            'client_secret':os.getenv('LINKEDIN_CLIENT_SECRET'),
-            'redirect_uri':os.getenv('LINKEDIN_REDIRECT_URI'),
-            'scope':os.getenv('LINKEDIN_SCOPE')
-        }
+import threading
+
+from .registry import provider_registry
+
+__all__ = ["get_settings", "load_settings", "reload_settings"]
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def _load_dotenv(override=False):
+    from dotenv import load_dotenv
+
+    load_dotenv(override=override)
+
 
-        # Add other providers here if needed
+def load_settings():
+    """
+    Build the OMNI_AUTHIFY settings from environment variables.
+    """
+    return {
+        'SECRET_KEY':os.getenv('OMNI_AUTHIFY_SECRET_KEY'),  # signs the OAuth state tokens
+        'PROVIDERS':{
+            'facebook':{
+                'client_id':os.getenv('FACEBOOK_CLIENT_ID'),
+                'client_secret':os.getenv('FACEBOOK_CLIENT_SECRET'),
+                'redirect_uri':os.getenv('FACEBOOK_REDIRECT_URI'),
+                'state':os.getenv('FACEBOOK_STATE'), # optional
+                'scope':os.getenv('FACEBOOK_SCOPE'),  # by default | add other FB app permissions you have!
+                'fields':os.getenv('FACEBOOK_FIELDS')
+            },
+            'github':{
+                'client_id':os.getenv('GITHUB_CLIENT_ID'),
+                'client_secret':os.getenv('GITHUB_CLIENT_SECRET'),
+                'redirect_uri':os.getenv('GITHUB_CLIENT_REDIRECT_URI'),
+                'scope':os.getenv('GITHUB_CLIENT_SCOPE'),
+            },
+            'google':{
+                'client_id':os.getenv('GOOGLE_CLIENT_ID'),
+                'client_secret':os.getenv('GOOGLE_CLIENT_SECRET'),
+                'redirect_uri':os.getenv('GOOGLE_REDIRECT_URI'),
+                'state':os.getenv('GOOGLE_STATE'), # optional
+                'scope':os.getenv('GOOGLE_SCOPE')
+            },
+            'linkedin':{
+                'client_id':os.getenv('LINKEDIN_CLIENT_ID'),
+                'client_secret':os.getenv('LINKEDIN_CLIENT_SECRET'),
+                'redirect_uri':os.getenv('LINKEDIN_REDIRECT_URI'),
+                'scope':os.getenv('LINKEDIN_SCOPE')
+            }
+
+            # Add other providers here if needed
+        }
     }
-}
\ No newline at end of file
+
+
+def get_settings():
+    """
+    Return the OMNI_AUTHIFY settings, loading the .env file on first use rather than at import time.
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _load_dotenv()
+                _settings = load_settings()
+    return _settings
+
+
+def reload_settings():
+    """
+    Re-read the .env file and environment variables into OMNI_AUTHIFY and drop providers built from the old values.
+    """
+    settings = get_settings()
+    _load_dotenv(override=True)
+    settings.clear()
+    settings.update(load_settings())
+    provider_registry.invalidate()
+
+
+def __getattr__(name):
+    # ==== `from omni_authify.core.utils import OMNI_AUTHIFY` keeps working, and is when the settings are loaded ====
+    if name == "OMNI_AUTHIFY":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
 try:
     from typing import Dict, Set, Tuple
     from django.conf import settings
+    from django.core.signals import setting_changed
     from django.contrib.auth import login
     from django.contrib.auth.models import User
     from django.http import HttpResponseRedirect
@@ -8,7 +9,21 @@ try:
 except ImportError as e:
     raise ImportError("Django is not installed. Install it using 'pip install omni-authify[django]'") from e
 
-from omni_authify.core.oauth import get_provider
+from omni_authify.core.exceptions import InvalidStateError
+from omni_authify.core.instrumentation import track
+from omni_authify.core.registry import provider_registry
+from omni_authify.core.state import StateSigner
+
+
+def invalidate_providers(setting, **kwargs):
+    """
+    Drop cached providers when OMNI_AUTHIFY is changed at runtime (e.g. by override_settings in tests).
+    """
+    if setting == 'OMNI_AUTHIFY':
+        provider_registry.invalidate()
+
+
+setting_changed.connect(invalidate_providers, dispatch_uid='omni_authify.invalidate_providers')
 
 
 class OmniAuthifyDjango:
@@ -24,17 +39,29 @@ class OmniAuthifyDjango:
         self.provider_name = provider_name
         self.fields = provider_settings.get('fields')
         self.scope = provider_settings.get('scope')
-        self.state = provider_settings.get('state')
-        self.provider = get_provider(provider_name, provider_settings)
+        self.provider = provider_registry.get(provider_name, provider_settings)
+        self.states = StateSigner.from_settings(settings.OMNI_AUTHIFY, secret_key=settings.SECRET_KEY)
 
     def login(self, scope=None) -> redirect:
         """
-        Generates the authorization URL and redirects the user
+        Generates the authorization URL with a signed, single-use state and redirects the user, setting the cookie
+        that binds the state to this browser
         """
         scope = scope or self.scope
-        auth_url = self.provider.get_authorization_url(state=self.state, scope=scope)
-        return redirect(auth_url)
+        state = self.states.issue(self.provider_name)
+        auth_url = self.provider.get_authorization_url(state=state, scope=scope)
+        secure = self.provider.redirect_uri.startswith('https://')
+        return self.states.bind(redirect(auth_url), state, self.provider_name, secure=secure)
+
+    async def alogin(self, scope=None):
+        """
+        ``login`` for async views. Building the authorization URL does no I/O, so nothing is handed to a thread.
+        """
+        return self.login(scope)
+
 
+    def _state_cookie(self, request):
+        return request.COOKIES.get(self.states.cookie_name(self.provider_name))
 
     def callback(self, request) -> dict[str, bool | str | int] | tuple[dict, int] | dict[str, bool | str | int]:
         """
@@ -43,18 +70,54 @@ class OmniAuthifyDjango:
         :param request:
         :return: HttpResponse
         """
+        with track('callback', self.provider_name):
+            return self._callback(request)
+
+    def _callback(self, request):
         error = request.GET.get('error')
         if error:
             return {'error':True, 'message':f"Error: {error}", 'status':400}
 
+        try:
+            self.states.verify(request.GET.get('state'), self.provider_name, self._state_cookie(request))
+        except InvalidStateError as e:
+            return {'error':True, 'message':f"Error: {e}", 'status':400}
+
         code = request.GET.get('code')
         if not code:
             raise ValueError(f"No code provided")
 
         try:
-            access_token = self.provider.get_access_token(code=code)
-            user_info = self.provider.get_user_profile(access_token=access_token, fields=self.fields)
+            user_info = self.provider.get_user_info(code, self.fields, request.GET.get('state'))
             return user_info, 200
         except Exception as e:
             return {'error':True, 'message':f"Error: {e}", 'status':500, }
 
+
+    async def acallback(self, request):
+        """
+        Async variant of ``callback`` for ASGI deployments: the state check, token exchange and profile fetch are
+        awaited on the event loop through the provider's async transport, without ``sync_to_async``.
+        """
+        with track('callback', self.provider_name):
+            return await self._acallback(request)
+
+    async def _acallback(self, request):
+        error = request.GET.get('error')
+        if error:
+            return {'error':True, 'message':f"Error: {error}", 'status':400}
+
+        try:
+            await self.states.averify(request.GET.get('state'), self.provider_name, self._state_cookie(request))
+        except InvalidStateError as e:
+            return {'error':True, 'message':f"Error: {e}", 'status':400}
+
+        code = request.GET.get('code')
+        if not code:
+            raise ValueError(f"No code provided")
+
+        try:
+            user_info = await self.provider.aget_user_info(code, self.fields, request.GET.get('state'))
+            return user_info, 200
+        except Exception as e:
+            return {'error':True, 'message':f"Error: {e}", 'status':500, }
@@ -8,7 +8,11 @@ except ImportError as e:
     raise ImportError("Django Rest Framework is not installed. Install it using 'pip install omni-authify[drf]'") \
         from e
 
-from omni_authify.core.oauth import get_provider
+from omni_authify.core.exceptions import IntegrationError, InvalidStateError
+from omni_authify.core.instrumentation import track
+from omni_authify.core.registry import provider_registry
+from omni_authify.core.state import StateSigner
+from omni_authify.frameworks.django import invalidate_providers  # registers the setting_changed receiver
 
 class OmniAuthifyDRF:
     def __init__(self, provider_name):
@@ -24,16 +28,49 @@ class OmniAuthifyDRF:
         self.provider_name = provider_name
         self.fields = provider_settings.get('fields')
         self.scope = provider_settings.get('scope')
-        self.state = provider_settings.get('state')
-        self.provider = get_provider(provider_name, provider_settings)
+        self.provider = provider_registry.get(provider_name, provider_settings)
+        self.states = StateSigner.from_settings(settings.OMNI_AUTHIFY, secret_key=settings.SECRET_KEY)
 
-    def get_auth_url(self, scope=None):
+    def get_auth_url(self, scope=None, response=None):
         """
-        Generate the authorization URL
+        Generate the authorization URL with a signed, single-use state
+        :param response: The response sent to the browser that follows the URL; the cookie binding the state to
+            that browser is set on it. Required: the callback rejects states whose cookie was never set.
         :return:
         """
+        if response is None:
+            raise IntegrationError(
+                "get_auth_url() needs the response that carries the URL to the browser, to set the state cookie on "
+                "it: use auth.login(), or auth.get_auth_url(response=response)."
+            )
         scope = scope or self.scope
-        return self.provider.get_authorization_url(state=self.state, scope=scope)
+        state = self.states.issue(self.provider_name)
+        secure = self.provider.redirect_uri.startswith('https://')
+        self.states.bind(response, state, self.provider_name, secure=secure)
+        return self.provider.get_authorization_url(state=state, scope=scope)
+
+    async def aget_auth_url(self, scope=None, response=None):
+        """
+        ``get_auth_url`` for async views; it does no I/O.
+        """
+        return self.get_auth_url(scope, response)
+
+    def login(self, scope=None):
+        """
+        Return ``{'auth_url': ...}`` as a Response carrying the cookie that binds the state to the browser
+        """
+        response = Response(status=status.HTTP_200_OK)
+        response.data = {'auth_url': self.get_auth_url(scope, response)}
+        return response
+
+    async def alogin(self, scope=None):
+        """
+        ``login`` for async views; it does no I/O.
+        """
+        return self.login(scope)
+
+    def _state_cookie(self, request):
+        return request.COOKIES.get(self.states.cookie_name(self.provider_name))
 
     def get_user_info(self, request, code):
         """
@@ -42,10 +79,41 @@ class OmniAuthifyDRF:
         :param code: code from the provider to get access token
         :return:
         """
+        with track('callback', self.provider_name):
+            return self._get_user_info(request, code)
+
+    def _get_user_info(self, request, code):
         error = request.GET.get('error')
         if error:
             return {'error': True, 'message': f"Error: {error}", 'status': 400}
 
-        access_token = self.provider.get_access_token(code=code)
-        user_info = self.provider.get_user_profile(access_token=access_token, fields=self.fields)
+        try:
+            self.states.verify(request.GET.get('state'), self.provider_name, self._state_cookie(request))
+        except InvalidStateError as e:
+            return {'error': True, 'message': f"Error: {e}", 'status': 400}
+
+        user_info = self.provider.get_user_info(code, self.fields, request.GET.get('state'))
+        return user_info
+
+    async def aget_user_info(self, request, code):
+        """
+        Async variant of ``get_user_info``, awaited on the event loop through the provider's async transport
+        :param request:
+        :param code: code from the provider to get access token
+        :return:
+        """
+        with track('callback', self.provider_name):
+            return await self._aget_user_info(request, code)
+
+    async def _aget_user_info(self, request, code):
+        error = request.GET.get('error')
+        if error:
+            return {'error': True, 'message': f"Error: {error}", 'status': 400}
+
+        try:
+            await self.states.averify(request.GET.get('state'), self.provider_name, self._state_cookie(request))
+        except InvalidStateError as e:
+            return {'error': True, 'message': f"Error: {e}", 'status': 400}
+
+        user_info = await self.provider.aget_user_info(code, self.fields, request.GET.get('state'))
         return user_info
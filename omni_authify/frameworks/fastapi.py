@@ -1,3 +1,6 @@
+import secrets
+import warnings
+
 try:
     from fastapi import FastAPI, Request, HTTPException
     from fastapi.responses import RedirectResponse
@@ -9,7 +12,28 @@ try:
 except ImportError as e:
     raise ImportError("FastAPI is not installed. Install it using 'pip install omni-authify[fastapi]'") from e
 
-from omni_authify.core.oauth import get_provider
+from omni_authify.core.exceptions import IntegrationError, InvalidStateError
+from omni_authify.core.instrumentation import track
+from omni_authify.core.registry import provider_registry
+from omni_authify.core.state import StateSigner
+
+# ==== Signs states when OMNI_AUTHIFY_SECRET_KEY is unset; only valid within this process ====
+_process_secret_key = None
+
+
+def _secret_key():
+    global _process_secret_key
+    secret_key = OMNI_AUTHIFY.get('SECRET_KEY')
+    if secret_key:
+        return secret_key
+    if _process_secret_key is None:
+        warnings.warn(
+            "OMNI_AUTHIFY_SECRET_KEY is not set: OAuth states are signed with a random key of this process, so a "
+            "login started on another worker or before a restart fails its callback. Set OMNI_AUTHIFY_SECRET_KEY.",
+            RuntimeWarning, stacklevel=3,
+        )
+        _process_secret_key = secrets.token_urlsafe(32)
+    return _process_secret_key
 
 
 class OmniAuthifyFastAPI:
@@ -25,32 +49,60 @@ class OmniAuthifyFastAPI:
         self.provider_name = provider_name
         self.fields = provider_settings.get('fields')
         self.scope = provider_settings.get('scope')
-        self.state = provider_settings.get('state')
-        self.provider = get_provider(provider_name, provider_settings)
+        self.provider = provider_registry.get(provider_name, provider_settings)
 
-    def get_auth_url(self, scope=None):
+        self.states = StateSigner.from_settings(OMNI_AUTHIFY, secret_key=_secret_key())
+
+    def get_auth_url(self, scope=None, response=None):
         """
-        Generate the authorization URL
+        Generate the authorization URL with a signed, single-use state
+        :param response: The response sent to the browser that follows the URL, e.g. the endpoint's ``Response``
+            parameter; the cookie binding the state to that browser is set on it. Required: the callback rejects
+            states whose cookie was never set.
         :return:
         """
+        if response is None:
+            raise IntegrationError(
+                "get_auth_url() needs the response that carries the URL to the browser, to set the state cookie on "
+                "it: use auth.login(), or auth.get_auth_url(response=response)."
+            )
         scope = scope or self.scope
-        return  self.provider.get_authorization_url(state=self.state, scope=scope)
+        state = self.states.issue(self.provider_name)
+        secure = self.provider.redirect_uri.startswith('https://')
+        self.states.bind(response, state, self.provider_name, secure=secure)
+        return self.provider.get_authorization_url(state=state, scope=scope)
 
-    def get_user_info(self, request, code):
+    def login(self, scope=None):
+        """
+        Redirect to the authorization URL, setting the cookie that binds the state to the browser
+        :return: RedirectResponse
         """
-        Exchange code for access token and fetch user profile
+        scope = scope or self.scope
+        state = self.states.issue(self.provider_name)
+        response = RedirectResponse(self.provider.get_authorization_url(state=state, scope=scope))
+        secure = self.provider.redirect_uri.startswith('https://')
+        return self.states.bind(response, state, self.provider_name, secure=secure)
+
+    async def get_user_info(self, request, code):
+        """
+        Exchange code for access token and fetch user profile without blocking the event loop
         :param request:
         :param code: code from the provider to get access token
         :return:
         """
-        error = request.GET.get('error')
+        with track('callback', self.provider_name):
+            return await self._get_user_info(request, code)
+
+    async def _get_user_info(self, request, code):
+        error = request.query_params.get('error')
         if error:
             return {'error':True, 'message':f"Error: {error}", 'status':400}
 
-        access_token = self.provider.get_access_token(code=code)
-        user_info = self.provider.get_user_profile(access_token=access_token, fields=self.fields)
-        return user_info
-
-
-
+        try:
+            cookie = request.cookies.get(self.states.cookie_name(self.provider_name))
+            await self.states.averify(request.query_params.get('state'), self.provider_name, cookie)
+        except InvalidStateError as e:
+            return {'error':True, 'message':f"Error: {e}", 'status':400}
 
+        user_info = await self.provider.aget_user_info(code, self.fields, request.query_params.get('state'))
+        return user_info
@@ -0,0 +1,126 @@
+import threading
+
+try:
+    from flask import current_app, redirect, request
+except ImportError as e:
+    raise ImportError("Flask is not installed. Install it using 'pip install omni-authify[flask]'") from e
+
+from omni_authify.core.exceptions import IntegrationError, InvalidStateError
+from omni_authify.core.instrumentation import track
+from omni_authify.core.oauth import get_provider
+from omni_authify.core.state import StateSigner
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.core.utils import get_settings
+
+
+class _FlaskState:
+    """
+    Everything the extension keeps per Flask app: settings, state signer, pooled transport and built providers.
+    """
+
+    def __init__(self, app):
+        self.settings = app.config.get('OMNI_AUTHIFY') or get_settings()
+        if not (self.settings.get('SECRET_KEY') or app.secret_key):
+            raise IntegrationError("Set OMNI_AUTHIFY['SECRET_KEY'] or the app SECRET_KEY to sign the OAuth state tokens.")
+        self.states = StateSigner.from_settings(self.settings, secret_key=app.secret_key)
+
+        # ======== One pooled session per app, shared by all its providers and requests ========
+        self.transport = HTTPTransport(**self.settings.get('TRANSPORT', {}))
+        self.providers = {}
+        self._lock = threading.Lock()
+
+    def provider(self, provider_name):
+        provider = self.providers.get(provider_name)
+        if provider is None:
+            with self._lock:
+                provider = self.providers.get(provider_name)
+                if provider is None:
+                    provider_settings = self.settings['PROVIDERS'].get(provider_name)
+                    if not provider_settings:
+                        raise NotImplementedError(
+                            f"Provider settings for '{provider_name}' not found in OMNI_AUTHIFY settings."
+                        )
+                    provider = get_provider(provider_name, provider_settings)
+                    provider.transport = self.transport
+                    self.providers[provider_name] = provider
+        return provider
+
+
+class OmniAuthifyFlask:
+    """
+    Flask extension for the OAuth2 login flow.
+
+    Settings come from ``app.config['OMNI_AUTHIFY']``, with the same ``PROVIDERS`` and ``SECRET_KEY`` keys as for
+    Django, falling back to the environment variables. ``TRANSPORT`` holds ``HTTPTransport`` options such as
+    ``pool_maxsize``. Providers and their pooled HTTP session are built once per app, not per request. Nothing is held
+    locked while talking to a provider, so under gevent (with ``monkey.patch_all()``) a callback waiting on the
+    provider yields to the other greenlets.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['omni_authify'] = _FlaskState(app)
+
+    def _state(self):
+        app = current_app._get_current_object() if self.app is None else self.app
+        try:
+            return app.extensions['omni_authify']
+        except KeyError:
+            raise IntegrationError("OmniAuthifyFlask.init_app() was not called for this app.") from None
+
+    def provider(self, provider_name):
+        """
+        Return the app's provider instance for ``provider_name``, building it on first use.
+        """
+        return self._state().provider(provider_name)
+
+    def login(self, provider_name, scope=None):
+        """
+        Redirect to the provider's authorization URL with a signed, single-use state, setting the cookie that binds
+        the state to this browser.
+        """
+        state = self._state()
+        provider = state.provider(provider_name)
+        scope = scope or state.settings['PROVIDERS'][provider_name].get('scope')
+        token = state.states.issue(provider_name)
+        auth_url = provider.get_authorization_url(state=token, scope=scope)
+        secure = provider.redirect_uri.startswith('https://')
+        return state.states.bind(redirect(auth_url), token, provider_name, secure=secure)
+
+    def callback(self, provider_name):
+        """
+        Handle the provider's redirect for the current request: verify the state, exchange the code for an access
+        token and fetch the user profile.
+
+        Returns:
+            tuple: ``(user_info, 200)``, or ``({'error': True, 'message': ...}, status)``, ready to return from a view.
+        """
+        with track('callback', provider_name):
+            return self._callback(provider_name)
+
+    def _callback(self, provider_name):
+        error = request.args.get('error')
+        if error:
+            return {'error':True, 'message':f"Error: {error}"}, 400
+
+        state = self._state()
+        try:
+            cookie = request.cookies.get(state.states.cookie_name(provider_name))
+            state.states.verify(request.args.get('state'), provider_name, cookie)
+        except InvalidStateError as e:
+            return {'error':True, 'message':f"Error: {e}"}, 400
+
+        code = request.args.get('code')
+        if not code:
+            return {'error':True, 'message':"Error: No code provided"}, 400
+
+        provider = state.provider(provider_name)
+        fields = state.settings['PROVIDERS'][provider_name].get('fields')
+        try:
+            return provider.get_user_info(code, fields, request.args.get('state')), 200
+        except Exception as e:
+            return {'error':True, 'message':f"Error: {e}"}, 500
@@ -1,10 +1,32 @@
-from .base import *
-from .facebook import *
-from .github import *
-from .google import *
-from .linkedin import *
-
-# Commented out providers not yet implemented
-# from .instagram import *
-# from .telegram import *
-# from .twitter import *
+import importlib
+
+# ==== Resolved on first attribute access so importing one provider does not import all of them ====
+_PROVIDERS = {
+    "BaseOAuth2Provider": ".base",
+    "OAuth2Provider": ".base",
+    "OpenIDConnectMixin": ".base",
+    "Facebook": ".facebook",
+    "GitHub": ".github",
+    "Google": ".google",
+    "LinkedIn": ".linkedin",
+    "Twitter": ".twitter",
+
+    # Commented out providers not yet implemented
+    # "Instagram": ".instagram",
+    # "Telegram": ".telegram",
+}
+
+__all__ = list(_PROVIDERS)
+
+
+def __getattr__(name):
+    module = _PROVIDERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
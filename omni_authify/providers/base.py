@@ -1,8 +1,66 @@
 import abc
+import base64
+import hashlib
+import hmac
+from urllib.parse import quote_plus, urlencode
+
+from ..core.batch import ProfileResult, bounded_map
+from ..core.cache import cached_profile
+from ..core.codec import response_json
+from ..core.exceptions import IntegrationError, ProviderError
+from ..core.instrumentation import instrumented
+from ..core.jwks import get_jwks_cache
+from ..core.oidc import decode_id_token, get_key_id
+from ..core.profile import ProfileMapping, UserProfile
+from ..core.ratelimit import get_rate_limit_tracker, get_token_rate_limits
+from ..core.spec import ProviderSpec
+from ..core.transport import get_default_async_transport, get_default_transport
 
 
 class BaseOAuth2Provider(abc.ABC):
-    def __init__(self, client_id, client_secret, redirect_uri, fields, scope):
+    # ======== Opt-in ProfileCache consulted by get_user_profile/aget_user_profile ========
+    profile_cache = None
+
+    # ======== Where the UserProfile fields live in this provider's profile payload ========
+    PROFILE_MAPPING = ProfileMapping(
+        id=("id", "sub"), name="name", email="email", email_verified="email_verified", picture="picture",
+    )
+
+    # ======== Opt-in: open the token and profile connections while the user is at the consent screen ========
+    prewarm = False
+
+    # ======== RateLimitTracker options, applied when the app's shared trackers are first created ========
+    rate_limit_options = {}
+
+    # ======== Instance attributes baked into the cached authorization URL prefixes ========
+    _AUTHORIZATION_FIELDS = frozenset({"AUTHORIZE_URL", "client_id", "redirect_uri", "scope"})
+    _AUTHORIZATION_CACHE_SIZE = 32
+
+    # ======== Provider methods timed as login phases by the registered instrumentations ========
+    _INSTRUMENTED_PHASES = {
+        "get_authorization_url": "authorization_url",
+        "get_access_token": "token_exchange",
+        "aget_access_token": "token_exchange",
+        "get_token_response": "token_exchange",
+        "aget_token_response": "token_exchange",
+        "refresh_access_token": "token_refresh",
+        "arefresh_access_token": "token_refresh",
+        "get_user_profile": "profile_fetch",
+        "aget_user_profile": "profile_fetch",
+        "fetch_identity": "identity_fetch",
+        "afetch_identity": "identity_fetch",
+        "check_token_scopes": "scope_check",
+        "acheck_token_scopes": "scope_check",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, phase in cls._INSTRUMENTED_PHASES.items():
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "__isabstractmethod__", False):
+                setattr(cls, name, instrumented(phase)(method))
+
+    def __init__(self, client_id, client_secret, redirect_uri, fields, scope, transport=None, async_transport=None):
 
         # ======== Validate input parameters ========
         assert client_id, "CLIENT_ID must be provided"
@@ -18,18 +76,504 @@ class BaseOAuth2Provider(abc.ABC):
         self.fields = fields or []
         self.scope = scope
 
-    @abc.abstractmethod
+        # ======== Pooled HTTP transport, shared by all providers unless one is injected ========
+        self.transport = transport or get_default_transport()
+        self._async_transport = async_transport
+
+        # ======== Encode the static part of the authorization URL once ========
+        self._authorization_prefix(self.scope)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._AUTHORIZATION_FIELDS:
+            self.__dict__["_authorization_prefixes"] = {}
+
+    @property
+    def rate_limit(self):
+        """
+        Rate limit budget shared by every provider instance of this app (provider name and ``client_id``).
+        """
+        return get_rate_limit_tracker(type(self).__name__.lower(), self.client_id, **self.rate_limit_options)
+
+    def rate_limit_for(self, access_token):
+        """
+        Rate limit budget a request made with ``access_token`` counts against: the token's own for providers limiting
+        each token (``ProviderSpec.rate_limited == "token"``), the app's ``rate_limit`` otherwise.
+        """
+        spec = getattr(self, "SPEC", None)
+        if spec is None or spec.rate_limited != "token":
+            return self.rate_limit
+        limits = get_token_rate_limits(type(self).__name__.lower(), self.client_id, **self.rate_limit_options)
+        return limits.get(access_token)
+
+    @property
+    def async_transport(self):
+        """
+        Transport used by the ``a*`` coroutine methods, resolved per event loop unless one was injected.
+        """
+        return self._async_transport or get_default_async_transport()
+
+    @instrumented("authorization_url")
     def get_authorization_url(self, state=None, scope=None):
-        pass
+        """
+        Generate the authorization URL to redirect the user for authentication.
+
+        The query string up to ``state`` is encoded once per scope and cached, so a redirect only encodes the state.
+
+        Args:
+            state (str, optional): An unguessable random string to protect against CSRF attacks.
+            scope (str, optional): Permissions to request instead of the configured scope.
+
+        Returns:
+            str: The authorization URL.
+        """
+        if self.prewarm:
+            self._prewarm()
+
+        scope = scope or self.scope
+        prefix = self._authorization_prefixes.get(scope) if isinstance(scope, str) else None
+        if prefix is None:
+            prefix = self._authorization_prefix(scope)
+
+        suffix = self._authorization_suffix(state)
+        if state:
+            return f"{prefix}&state={quote_plus(state if isinstance(state, (str, bytes)) else str(state))}{suffix}"
+        return prefix + suffix
+
+    def _authorization_suffix(self, state):
+        """
+        Query parameters that change with every login and follow ``state``, e.g. a PKCE challenge.
+        """
+        return ""
+
+    def _prewarm(self):
+        """
+        Ask the transport to open the connections the callback will use, see ``HTTPTransport.prewarm``.
+        """
+        prewarm = getattr(self.transport, "prewarm", None)
+        if prewarm is not None:
+            prewarm(*self._prewarm_urls())
+
+    def _prewarm_urls(self):
+        """
+        Endpoints the callback calls once the user is back: the token endpoint and, unless the profile comes from
+        the id_token, the profile endpoint.
+        """
+        urls = [getattr(self, "TOKEN_URL", None)]
+        if not getattr(self, "oidc", False):
+            urls.append(getattr(self, "PROFILE_URL", None))
+        return [url for url in urls if url]
+
+    def _authorization_params(self, scope):
+        """
+        Static query parameters of the authorization URL, in the order the provider documents them.
+        """
+        return {
+            "client_id": self.client_id,
+            "redirect_uri": self.redirect_uri,
+            "response_type": "code",
+            "scope": scope,
+        }
+
+    def _authorization_prefix(self, scope):
+        prefix = f"{self.AUTHORIZE_URL}?{urlencode(self._authorization_params(scope))}"
+        if isinstance(scope, str):
+            prefixes = self._authorization_prefixes
+            if len(prefixes) >= self._AUTHORIZATION_CACHE_SIZE:
+                prefixes.clear()
+            prefixes[scope] = prefix
+        return prefix
 
     @abc.abstractmethod
-    def get_access_token(self, code):
+    def get_access_token(self, code, state=None):
         pass
 
     @abc.abstractmethod
     def get_user_profile(self, access_token, fields=None):
         pass
 
+    def get_token_response(self, code, state=None):
+        """
+        Exchange the authorization code and return the whole token response.
+
+        Providers whose token endpoint returns more than the access token (``refresh_token``, ``expires_in``,
+        ``id_token``) override this; the default wraps ``get_access_token``.
+        """
+        return {"access_token": self.get_access_token(code, state)}
+
+    def refresh_access_token(self, refresh_token):
+        """
+        Exchange a refresh token for a new token response.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support refresh tokens.")
+
+    def get_user_info(self, code, fields=None, state=None):
+        """
+        Exchange the authorization code and fetch the user profile in one call, as done by the framework callbacks.
+
+        ``state`` is the state the login was started with, required by the providers using PKCE.
+        """
+        access_token = self.get_access_token(code, state)
+        return self.get_user_profile(access_token, fields)
+
+    def normalize_profile(self, payload, keep_raw=True):
+        """
+        Convert a profile payload, or verified id_token claims, into a provider-independent ``UserProfile``.
+        """
+        return UserProfile.from_payload(type(self).__name__.lower(), payload, self.PROFILE_MAPPING, keep_raw)
+
+    def get_profile(self, access_token, fields=None):
+        """
+        Fetch the user profile as a normalized ``UserProfile``.
+
+        Args:
+            access_token (str): The access token for the user.
+            fields: Passed to ``get_user_profile`` when given.
+
+        Returns:
+            UserProfile: The normalized profile, with the provider payload available as ``raw``.
+        """
+        args = () if fields is None else (fields,)
+        return self.normalize_profile(self.get_user_profile(access_token, *args))
+
+    def get_user_profiles(self, access_tokens, fields=None, max_workers=8):
+        """
+        Fetch the profiles of many users, for back-office resync jobs.
+
+        Profiles are fetched on a bounded thread pool and streamed back in input order, so memory stays flat for
+        any number of tokens and one revoked token only fails its own item.
+
+        Args:
+            access_tokens (Iterable[str]): Access tokens, consumed lazily.
+            fields: Passed to ``get_user_profile`` for every token.
+            max_workers (int): Maximum number of concurrent profile requests.
+
+        Yields:
+            ProfileResult: ``(access_token, profile, error)`` for every token.
+        """
+        results = bounded_map(lambda token: self.get_user_profile(token, fields), access_tokens, max_workers)
+        for access_token, profile, error in results:
+            yield ProfileResult(access_token, profile, error)
+
+    # ======== Asyncio variants, awaited from async frameworks instead of blocking the event loop ========
+    async def aget_access_token(self, code, state=None):
+        raise NotImplementedError(f"{type(self).__name__} does not support asyncio yet.")
+
+    async def aget_user_profile(self, access_token, fields=None):
+        raise NotImplementedError(f"{type(self).__name__} does not support asyncio yet.")
+
+    async def aget_profile(self, access_token, fields=None):
+        args = () if fields is None else (fields,)
+        return self.normalize_profile(await self.aget_user_profile(access_token, *args))
+
+    async def aget_user_info(self, code, fields=None, state=None):
+        access_token = await self.aget_access_token(code, state)
+        return await self.aget_user_profile(access_token, fields)
+
+    async def aget_token_response(self, code, state=None):
+        return {"access_token": await self.aget_access_token(code, state)}
+
+    async def arefresh_access_token(self, refresh_token):
+        raise NotImplementedError(f"{type(self).__name__} does not support refresh tokens.")
+
+
+class OAuth2Provider(BaseOAuth2Provider):
+    """
+    OAuth2 provider driven by its ``SPEC``.
+
+    Subclasses declare a ``ProviderSpec`` and inherit the token exchange, refresh and profile requests, sync and
+    async, built from it, so every provider goes through the same request path. ``AUTHORIZE_URL``, ``TOKEN_URL``,
+    ``PROFILE_URL`` and ``PROFILE_MAPPING`` are set on the class from the spec and can still be overridden per
+    instance. Providers override the methods their API does differently, e.g. Facebook's profile fields.
+    """
+    SPEC: ProviderSpec = None
+
+    def __init_subclass__(cls, **kwargs):
+        spec = cls.__dict__.get("SPEC")
+        if spec is not None:
+            cls.AUTHORIZE_URL = spec.authorize_url
+            cls.TOKEN_URL = spec.token_url
+            cls.PROFILE_URL = spec.profile_url
+            if spec.profile_mapping is not None:
+                cls.PROFILE_MAPPING = spec.profile_mapping
+        super().__init_subclass__(**kwargs)
+
+    def _authorization_params(self, scope):
+        values = {
+            "client_id": self.client_id,
+            "redirect_uri": self.redirect_uri,
+            "response_type": "code",
+            "scope": scope,
+        }
+        return {name: values[name] for name in self.SPEC.authorization_params}
+
+    def _authorization_suffix(self, state):
+        if not self.SPEC.pkce:
+            return ""
+        return f"&code_challenge={self._code_challenge(state)}&code_challenge_method=S256"
+
+    # ======== Token endpoint ========
+    def get_access_token(self, code, state=None):
+        """
+        Exchange the authorization code for an access token.
+
+        Args:
+            code (str): The authorization code received from the callback.
+            state (str, optional): The state of the login, required by providers using PKCE.
+
+        Returns:
+            str: The access token.
+        """
+        return self.get_token_response(code, state).get("access_token")
+
+    async def aget_access_token(self, code, state=None):
+        """
+        Asyncio variant of ``get_access_token``.
+        """
+        return (await self.aget_token_response(code, state)).get("access_token")
+
+    def get_token_response(self, code, state=None):
+        """
+        Exchange the authorization code and return the whole token response.
+
+        Args:
+            code (str): The authorization code received from the callback.
+            state (str, optional): The state of the login, required by providers using PKCE.
+
+        Returns:
+            dict: The token response, with ``refresh_token``, ``expires_in`` or ``id_token`` when the provider
+            issues them.
+        """
+        send = self.transport.post if self.SPEC.token_method == "POST" else self.transport.get
+        return self._token_json(send(self.TOKEN_URL, **self._token_kwargs(self._access_token_payload(code, state))))
+
+    async def aget_token_response(self, code, state=None):
+        """
+        Asyncio variant of ``get_token_response``.
+        """
+        transport = self.async_transport
+        send = transport.post if self.SPEC.token_method == "POST" else transport.get
+        payload = self._access_token_payload(code, state)
+        return self._token_json(await send(self.TOKEN_URL, **self._token_kwargs(payload)))
+
+    def refresh_access_token(self, refresh_token):
+        """
+        Exchange a refresh token for a new access token.
+
+        Args:
+            refresh_token (str): The ``refresh_token`` of an earlier token response.
+
+        Returns:
+            dict: The token response. It carries a new ``refresh_token`` only when the provider rotated it.
+        """
+        if not self.SPEC.refresh:
+            raise NotImplementedError(f"{type(self).__name__} does not support refresh tokens.")
+        send = self.transport.post if self.SPEC.token_method == "POST" else self.transport.get
+        return self._token_json(send(self.TOKEN_URL, **self._token_kwargs(self._refresh_token_payload(refresh_token))))
+
+    async def arefresh_access_token(self, refresh_token):
+        """
+        Asyncio variant of ``refresh_access_token``.
+        """
+        if not self.SPEC.refresh:
+            raise NotImplementedError(f"{type(self).__name__} does not support refresh tokens.")
+        transport = self.async_transport
+        send = transport.post if self.SPEC.token_method == "POST" else transport.get
+        payload = self._refresh_token_payload(refresh_token)
+        return self._token_json(await send(self.TOKEN_URL, **self._token_kwargs(payload)))
+
+    def _access_token_payload(self, code, state=None):
+        payload = {"client_id": self.client_id, "redirect_uri": self.redirect_uri, "code": code}
+        if self.SPEC.grant_type:
+            payload["grant_type"] = "authorization_code"
+        if self.SPEC.pkce:
+            payload["code_verifier"] = self._code_verifier(state)
+        if self.SPEC.token_auth == "body":
+            payload["client_secret"] = self.client_secret
+        return payload
+
+    def _refresh_token_payload(self, refresh_token):
+        payload = {"client_id": self.client_id, "grant_type": "refresh_token", "refresh_token": refresh_token}
+        if self.SPEC.token_auth == "body":
+            payload["client_secret"] = self.client_secret
+        return payload
+
+    def _token_kwargs(self, payload):
+        spec = self.SPEC
+        kwargs = {"data" if spec.token_method == "POST" else "params": payload}
+        headers = spec.token_headers
+        if spec.token_auth == "basic":
+            credentials = f"{quote_plus(self.client_id)}:{quote_plus(self.client_secret)}".encode()
+            headers = {**headers, "Authorization": f"Basic {base64.b64encode(credentials).decode()}"}
+        if headers:
+            kwargs["headers"] = headers
+        return kwargs
+
+    def _token_json(self, response):
+        response.raise_for_status()
+        data = response_json(response)
+        # ==== Some token endpoints (GitHub) report a bad code or refresh token as HTTP 200 with an error body ====
+        if self.SPEC.token_errors_in_body and "error" in data:
+            raise ProviderError(
+                f"{type(self).__name__} token error: {data.get('error_description') or data['error']}"
+            )
+        return data
+
+    # ======== PKCE, with a verifier derived from each login's state (see ProviderSpec.pkce) ========
+    def _code_verifier(self, state):
+        if not state:
+            raise IntegrationError(
+                f"{type(self).__name__} uses PKCE: pass the login's state to the authorization URL and code exchange."
+            )
+        message = f"pkce:{self.client_id}:{state}".encode()
+        digest = hmac.new(self.client_secret.encode(), message, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def _code_challenge(self, state):
+        digest = hashlib.sha256(self._code_verifier(state).encode()).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    # ======== Profile endpoint ========
+    @cached_profile
+    def get_user_profile(self, access_token, fields=None):
+        """
+        Fetch the user profile.
+
+        Args:
+            access_token (str): The access token for the user.
+            fields: Not used by the providers without field selection, kept for a uniform signature.
+
+        Returns:
+            dict: The user profile data.
+        """
+        rate_limit = self.rate_limit_for(access_token) if self.SPEC.rate_limited else None
+        if rate_limit is not None:
+            rate_limit.acquire()
+        response = self.transport.get(self.PROFILE_URL, **self._profile_kwargs(access_token))
+        return self._profile_json(response, rate_limit)
+
+    @cached_profile
+    async def aget_user_profile(self, access_token, fields=None):
+        """
+        Asyncio variant of ``get_user_profile``.
+        """
+        rate_limit = self.rate_limit_for(access_token) if self.SPEC.rate_limited else None
+        if rate_limit is not None:
+            await rate_limit.aacquire()
+        response = await self.async_transport.get(self.PROFILE_URL, **self._profile_kwargs(access_token))
+        return self._profile_json(response, rate_limit)
+
+    def _profile_kwargs(self, access_token):
+        spec = self.SPEC
+        if spec.profile_auth == "query":
+            return {"params": {**spec.profile_params, "access_token": access_token}}
+        kwargs = {"headers": {"Authorization": f"Bearer {access_token}"}}
+        if spec.profile_params:
+            kwargs["params"] = spec.profile_params
+        return kwargs
+
+    def _profile_json(self, response, rate_limit=None):
+        if rate_limit is not None:
+            rate_limit.observe(response)
+        response.raise_for_status()
+        profile = response_json(response)
+        root = self.SPEC.profile_root
+        if root is None:
+            return profile
+        if not isinstance(profile, dict) or root not in profile:
+            raise ProviderError(f"{type(self).__name__} profile response has no '{root}' object.")
+        return profile[root]
+
+
+class OpenIDConnectMixin:
+    """
+    id_token login for OpenID Connect providers.
+
+    With ``oidc`` enabled, ``get_user_info`` verifies the id_token returned by the token endpoint against the
+    provider's JWKS and returns its claims, so a login needs the token request only and no userinfo request.
+    Providers declare ``JWKI_URL`` and the accepted ``ISSUERS`` and implement ``get_token_response``.
+
+    With a ``discovery`` set, the endpoints named in ``DISCOVERY_ENDPOINTS`` follow the provider's discovery
+    document whenever a login starts or a callback arrives. The built-in ones stay in use until a document is loaded.
+    """
+    JWKI_URL: str
+    ISSUERS: tuple
+    DISCOVERY_URL: str
+
+    # ======== Discovery document keys and the endpoint attributes they replace ========
+    DISCOVERY_ENDPOINTS = {
+        "authorization_endpoint": "AUTHORIZE_URL",
+        "token_endpoint": "TOKEN_URL",
+        "userinfo_endpoint": "PROFILE_URL",
+        "jwks_uri": "JWKI_URL",
+    }
+
+    oidc = False
+
+    # ======== Opt-in OIDCDiscovery, and the generation of its document applied to this instance ========
+    discovery = None
+    _discovery_generation = 0
+
+    def get_authorization_url(self, state=None, scope=None):
+        if self.discovery is not None:
+            self._apply_discovery()
+        return super().get_authorization_url(state, scope)
+
+    def get_user_info(self, code, fields=None, state=None):
+        if self.discovery is not None:
+            self._apply_discovery()
+        if not self.oidc:
+            return super().get_user_info(code, fields, state)
+        token = self.get_token_response(code, state)
+        return self.verify_id_token(token.get("id_token"))
+
+    async def aget_user_info(self, code, fields=None, state=None):
+        if self.discovery is not None:
+            self._apply_discovery()
+        if not self.oidc:
+            return await super().aget_user_info(code, fields, state)
+        token = await self.aget_token_response(code, state)
+        return await self.averify_id_token(token.get("id_token"))
+
+    def _apply_discovery(self):
+        generation, document = self.discovery.current()
+        if generation == self._discovery_generation:
+            return
+        for key, attribute in self.DISCOVERY_ENDPOINTS.items():
+            if document.get(key):
+                setattr(self, attribute, document[key])
+        issuers = type(self).ISSUERS
+        self.ISSUERS = issuers if document["issuer"] in issuers else (document["issuer"], *issuers)
+        self._discovery_generation = generation
+
+    @property
+    def jwks(self):
+        """
+        Process-wide signing key cache of this provider's JWKS endpoint.
+        """
+        return get_jwks_cache(self.JWKI_URL, self.transport)
+
+    @instrumented("id_token_verify")
+    def verify_id_token(self, id_token):
+        """
+        Verify an id_token issued to this client and return its claims.
+
+        Args:
+            id_token (str): The id_token from the token response.
 
+        Returns:
+            dict: The verified claims (``sub``, ``email``, ``name``, ...).
+        """
+        key = self.jwks.get_key(self._id_token_kid(id_token))
+        return decode_id_token(id_token, key, audience=self.client_id, issuers=self.ISSUERS)
 
+    @instrumented("id_token_verify")
+    async def averify_id_token(self, id_token):
+        key = await self.jwks.aget_key(self._id_token_kid(id_token))
+        return decode_id_token(id_token, key, audience=self.client_id, issuers=self.ISSUERS)
 
+    @staticmethod
+    def _id_token_kid(id_token):
+        if not id_token:
+            raise ProviderError("The token response has no id_token, request the 'openid' scope to use OIDC mode.")
+        return get_key_id(id_token)
@@ -1,19 +1,39 @@
+import json
+import time
 from urllib.parse import urlencode
 
-import requests
+from ..core.batch import ProfileResult, bounded_map, chunked
+from ..core.cache import cached_profile
+from ..core.codec import json_loads, response_json
+from ..core.exceptions import ProviderError
+from ..core.fields import FieldSpec, get_field_cost_tracker
+from ..core.profile import ProfileMapping
+from ..core.spec import ProviderSpec
+from .base import OAuth2Provider
 
-from .base import BaseOAuth2Provider
 
-
-class Facebook(BaseOAuth2Provider):
+class Facebook(OAuth2Provider):
     """
     Facebook OAuth2 provider.
     """
-    AUTHORIZE_URL: str = "https://www.facebook.com/v16.0/dialog/oauth"
-    TOKEN_URL: str = "https://graph.facebook.com/v16.0/oauth/access_token"
-    PROFILE_URL: str = "https://graph.facebook.com/me"
-
-    def __init__(self, client_id, client_secret, redirect_uri, fields, scope):
+    SPEC = ProviderSpec(
+        authorize_url="https://www.facebook.com/v16.0/dialog/oauth",
+        token_url="https://graph.facebook.com/v16.0/oauth/access_token",
+        profile_url="https://graph.facebook.com/me",
+        token_method="GET",
+        grant_type=False,
+        profile_auth="query",
+        rate_limited="app",
+        profile_mapping=ProfileMapping(
+            id="id", name="name", first_name="first_name", last_name="last_name", email="email",
+            picture="picture.data.url",
+        ),
+    )
+    BATCH_URL: str = "https://graph.facebook.com/"
+    BATCH_SIZE: int = 50
+    DEFAULT_FIELDS: str = "id,name,email,picture"
+
+    def __init__(self, client_id, client_secret, redirect_uri, fields, scope, transport=None, async_transport=None):
         """
             Initialize the Facebook provider with client credentials.
 
@@ -21,67 +41,122 @@ class Facebook(BaseOAuth2Provider):
                 client_id (str): The client ID provided by Facebook.
                 client_secret (str): The client secret provided by Facebook.
                 redirect_uri (str): The URI to redirect to after authentication.
+                transport (HTTPTransport, optional): HTTP transport to use instead of the shared one.
+                async_transport (AsyncHTTPTransport, optional): Transport used by the asyncio methods.
         """
-        super().__init__(client_id, client_secret, redirect_uri, fields, scope)
+        super().__init__(
+            client_id, client_secret, redirect_uri, fields, scope, transport=transport, async_transport=async_transport
+        )
 
-    def get_authorization_url(self, state=None, scope=None):
+    @property
+    def field_costs(self):
         """
-        Generate the authorization URL to redirect the user for authentication.
-
-        Args:
-            state (str, optional): An unguessable random string to protect against CSRF attacks.
-
-        Returns:
-            str: The authorization URL.
-            :param state: random string
-            :param scope: the permissions the FB has
+        Response size and latency per requested field set, shared by every instance of this provider.
         """
-        params = {
-            "client_id": self.client_id,
-            "redirect_uri": self.redirect_uri,
-            "response_type": "code",
-            "scope": scope or self.scope,
-        }
-
-        if state:
-            params["state"] = state
-        return f"{self.AUTHORIZE_URL}?{urlencode(params)}"
-
+        return get_field_cost_tracker(type(self).__name__.lower())
 
-    def get_access_token(self, code: str) -> str:
+    def field_spec(self, fields=None):
         """
-        Exchange the authorization code for an access token.
-
-        Args:
-            code (str): The authorization code received from the callback.
+        Parse ``fields`` (a comma-separated string or a list), falling back to the provider's configured fields.
 
         Returns:
-            str: The access token.
+            FieldSpec: The normalized spec; its ``encoded`` string is what is sent as the ``fields`` parameter.
         """
-        payload = {
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-            "redirect_uri": self.redirect_uri,
-            "code": code,
-        }
-        response = requests.get(self.TOKEN_URL, params=payload)
-        response.raise_for_status()
-        return response.json().get("access_token")
-
+        return FieldSpec.parse(fields or self.fields or self.DEFAULT_FIELDS)
 
-    def get_user_profile(self, access_token: str, fields: str = "id,name,email,picture") -> dict:
+    @cached_profile
+    def get_user_profile(self, access_token: str, fields: str = DEFAULT_FIELDS) -> dict:
         """
         Fetch user profile information from Facebook.
 
         Args:
             access_token (str): The access token for the user.
-            fields (str): A comma-separated string of fields to retrieve. Defaults to "id,name,email,picture".
+            fields (str): A comma-separated string of fields to retrieve, nested projections such as
+                ``picture.width(200){url}`` included. Defaults to "id,name,email,picture".
 
         Returns:
             dict: The user profile data.
         """
-        params = {"access_token":access_token, "fields":fields,}
-        response = requests.get(self.PROFILE_URL, params=params)
+        spec = self.field_spec(fields)
+        params = {"access_token":access_token, "fields":spec.encoded,}
+        self.rate_limit.acquire()
+        started = time.perf_counter()
+        response = self.transport.get(self.PROFILE_URL, params=params)
+        elapsed = time.perf_counter() - started
+        profile = self._profile_json(response, self.rate_limit)
+        self.field_costs.record(spec, len(response.content), elapsed, profile)
+        return profile
+
+    @cached_profile
+    async def aget_user_profile(self, access_token: str, fields: str = DEFAULT_FIELDS) -> dict:
+        """
+        Asyncio variant of ``get_user_profile``.
+        """
+        spec = self.field_spec(fields)
+        params = {"access_token":access_token, "fields":spec.encoded,}
+        await self.rate_limit.aacquire()
+        started = time.perf_counter()
+        response = await self.async_transport.get(self.PROFILE_URL, params=params)
+        elapsed = time.perf_counter() - started
+        profile = self._profile_json(response, self.rate_limit)
+        self.field_costs.record(spec, len(response.content), elapsed, profile)
+        return profile
+
+    def get_user_profiles(self, access_tokens, fields: str = DEFAULT_FIELDS, max_workers=4):
+        """
+        Fetch the profiles of many users through the Graph API batch endpoint, 50 users per request.
+
+        Args:
+            access_tokens (Iterable[str]): Access tokens, consumed lazily.
+            fields (str): A comma-separated string of fields to retrieve for every user.
+            max_workers (int): Maximum number of batch requests in flight.
+
+        Yields:
+            ProfileResult: ``(access_token, profile, error)`` for every token, in input order.
+        """
+        spec = self.field_spec(fields)
+        batches = chunked(access_tokens, self.BATCH_SIZE)
+        for batch, results, error in bounded_map(lambda batch: self._fetch_batch(batch, spec), batches, max_workers):
+            if error is not None:
+                for access_token in batch:
+                    yield ProfileResult(access_token, None, error)
+            else:
+                yield from results
+
+    def _fetch_batch(self, access_tokens, spec):
+        fields = urlencode({"fields": spec.encoded})
+        batch = [
+            {"method": "GET", "relative_url": f"me?{fields}&{urlencode({'access_token': access_token})}"}
+            for access_token in access_tokens
+        ]
+        payload = {
+            "access_token": f"{self.client_id}|{self.client_secret}",
+            "batch": json.dumps(batch),
+            "include_headers": "false",
+        }
+        # ==== Facebook counts every request of a batch against the app's rate limit ====
+        self.rate_limit.acquire(cost=len(access_tokens))
+        started = time.perf_counter()
+        response = self.transport.post(self.BATCH_URL, data=payload)
+        elapsed = time.perf_counter() - started
+        self.rate_limit.observe(response)
         response.raise_for_status()
-        return response.json()
 
+        results, first_profile = [], None
+        for access_token, item in zip(access_tokens, response_json(response)):
+            # ==== Items Facebook could not complete in time come back as null ====
+            if item is None:
+                results.append(ProfileResult(access_token, None, ProviderError("Batch request timed out")))
+                continue
+
+            body = json_loads(item.get("body") or "null")
+            if item.get("code") == 200:
+                results.append(ProfileResult(access_token, body, None))
+                first_profile = first_profile if first_profile is not None else body
+            else:
+                message = ((body or {}).get("error") or {}).get("message") or f"HTTP {item.get('code')}"
+                results.append(ProfileResult(access_token, None, ProviderError(message)))
+
+        # ==== One batch counts as one request of len(access_tokens) profiles ====
+        self.field_costs.record(spec, len(response.content), elapsed, first_profile, count=len(access_tokens))
+        return results
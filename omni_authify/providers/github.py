@@ -1,20 +1,73 @@
-from urllib.parse import urlencode
+import threading
+import warnings
 
-import requests
+from ..core.codec import response_json
+from ..core.exceptions import ProviderError
+from ..core.profile import ProfileMapping
+from ..core.spec import ProviderSpec
+from .base import OAuth2Provider
 
-from .base import BaseOAuth2Provider
+_executor = None
+_executor_lock = threading.Lock()
 
 
-class GitHub(BaseOAuth2Provider):
+def _get_executor():
     """
-    GitHub OAuth2 provider.
+    Shared worker pool that runs the side requests of ``GitHub.fetch_identity`` next to the profile request.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="omni-authify-github")
+    return _executor
+
+
+def _transport_errors(transport):
+    """
+    Errors ``check_token_scopes`` reports instead of raising: the provider errors (open circuit, deadline, rate limit)
+    and, when the transport lists them in ``errors``, its own network errors. Custom transports need only
+    implement ``head``.
     """
+    return (ProviderError, *getattr(transport, "errors", ()))
+
+
+def _fields_alias(fields, scope):
+    if scope is None:
+        return fields
+    warnings.warn(
+        "GitHub.get_user_profile(scope=...) is deprecated, use fields=... instead.", DeprecationWarning, stacklevel=3
+    )
+    return scope if fields is None else fields
 
-    AUTHORIZE_URL: str = "https://github.com/login/oauth/authorize"
-    TOKEN_URL: str = "https://github.com/login/oauth/access_token"
-    PROFILE_URL: str = "https://api.github.com/user"
 
-    def __init__(self, client_id, client_secret, redirect_uri, scope):
+class GitHub(OAuth2Provider):
+    """
+    GitHub OAuth2 provider.
+    """
+
+    SPEC = ProviderSpec(
+        authorize_url="https://github.com/login/oauth/authorize",
+        token_url="https://github.com/login/oauth/access_token",
+        profile_url="https://api.github.com/user",
+        token_headers={"Accept": "application/json"},
+        grant_type=False,
+        token_errors_in_body=True,
+        refresh=True,
+        rate_limited="token",
+        profile_mapping=ProfileMapping(id="id", username="login", name="name", email="email", picture="avatar_url"),
+    )
+    EMAILS_URL: str = "https://api.github.com/user/emails"
+
+    # ==== get_user_profile/aget_user_profile only resolve the scope alias: the inherited methods time the fetch ====
+    _INSTRUMENTED_PHASES = {
+        name: phase for name, phase in OAuth2Provider._INSTRUMENTED_PHASES.items()
+        if name not in ("get_user_profile", "aget_user_profile")
+    }
+
+    def __init__(self, client_id, client_secret, redirect_uri, scope, transport=None, async_transport=None):
         """
             Initialize the GitHub provider with client credentials.
 
@@ -22,49 +75,33 @@ class GitHub(BaseOAuth2Provider):
                 client_id (str): The client ID provided by GitHub.
                 client_secret (str): The client secret provided by GitHub.
                 redirect_uri (str): The URI to redirect to after authentication.
+                transport (HTTPTransport, optional): HTTP transport to use instead of the shared one.
+                async_transport (AsyncHTTPTransport, optional): Transport used by the asyncio methods.
         """
-        super().__init__(client_id, client_secret, redirect_uri, fields=['id'], scope=scope)
+        super().__init__(
+            client_id, client_secret, redirect_uri, fields=['id'], scope=scope, transport=transport,
+            async_transport=async_transport,
+        )
 
-    def get_authorization_url(self, state=None, scope=None):
-        """
-        Generate the authorization URL to redirect the user for authentication.
-
-        Returns:
-            str: The authorization URL.
-            :param state: random string
-            :param scope: the permissions your OAuth apps has
-        """
-        params = {
-            "client_id": self.client_id,
-            "redirect_uri": self.redirect_uri,
-            "response_type": "code", # ==== expires after 10 minutes ====
-            "scope": scope or self.scope,
-        }
-
-        if state:
-            params["state"] = state
-        return f"{self.AUTHORIZE_URL}?{urlencode(params)}"
-
-    def get_access_token(self, code: str) -> str:
+    def get_user_profile(self, access_token, fields=None, scope=None):
         """
-        Exchange the authorization code for an access token.
+        Fetch the user profile.
 
         Args:
-            code (str): The authorization code received from the callback.
+            access_token (str): The access token for the user.
+            fields: Not used by GitHub, kept for a uniform signature.
+            scope: Deprecated alias of ``fields``, the keyword this method used to take.
 
         Returns:
-            str: The access token.
+            dict: The user profile data.
+        """
+        return super().get_user_profile(access_token, _fields_alias(fields, scope))
+
+    async def aget_user_profile(self, access_token, fields=None, scope=None):
         """
-        payload = {
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-            "redirect_uri": self.redirect_uri,
-            "code":code,
-        }
-        headers = {"Accept": "application/json"}
-        response = requests.post(self.TOKEN_URL, data=payload, headers=headers)
-        response.raise_for_status()
-        return response.json().get("access_token")
+        Asyncio variant of ``get_user_profile``.
+        """
+        return await super().aget_user_profile(access_token, _fields_alias(fields, scope))
 
     def check_token_scopes(self, access_token):
         """
@@ -79,30 +116,80 @@ class GitHub(BaseOAuth2Provider):
                 - 'accepted_scopes': Scopes accepted by the GitHub API
         """
         try:
-            response = requests.head(
+            response = self.transport.head(
                 self.PROFILE_URL, headers={'Authorization':f'Bearer {access_token}'}
             )
             response.raise_for_status()
+            return self._parse_scopes(response.headers)
+        except _transport_errors(self.transport) as e:
+            return {'error':str(e), 'authorized_scopes':[], 'accepted_scopes':[]}
 
-            return {'authorized_scopes':response.headers.get('X-OAuth-Scopes', '').split(', '),
-                'accepted_scopes':response.headers.get('X-Accepted-OAuth-Scopes', '').split(', ')}
-        except requests.RequestException as e:
+    async def acheck_token_scopes(self, access_token):
+        """
+        Asyncio variant of ``check_token_scopes``.
+        """
+        transport = self.async_transport
+        try:
+            response = await transport.head(self.PROFILE_URL, headers={'Authorization':f'Bearer {access_token}'})
+            response.raise_for_status()
+            return self._parse_scopes(response.headers)
+        except _transport_errors(transport) as e:
             return {'error':str(e), 'authorized_scopes':[], 'accepted_scopes':[]}
 
+    @staticmethod
+    def _parse_scopes(headers):
+        return {'authorized_scopes':headers.get('X-OAuth-Scopes', '').split(', '),
+            'accepted_scopes':headers.get('X-Accepted-OAuth-Scopes', '').split(', ')}
 
-    def get_user_profile(self, access_token, scope=None):
+    def fetch_identity(self, access_token):
         """
-        Fetch user profile information from GitHub.
+        Fetch the profile, e-mail addresses and token scopes in one concurrent round trip.
+
+        The ``/user/emails`` request runs alongside the profile request, and the scopes are read from the
+        profile response headers instead of a separate ``check_token_scopes`` HEAD request.
 
         Args:
             access_token (str): The access token for the user.
-            scope (str): A comma-separated string of fields to retrieve. Defaults to "user,repo".
 
         Returns:
-            dict: The user profile data.
+            dict: The profile data, with ``email`` set to the primary verified address, plus ``emails``,
+            ``authorized_scopes`` and ``accepted_scopes``.
         """
         headers = {"Authorization": f'Bearer {access_token}'}
-        response = requests.get(self.PROFILE_URL, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        rate_limit = self.rate_limit_for(access_token)
+        rate_limit.acquire(cost=2)
+        emails = _get_executor().submit(self.transport.get, self.EMAILS_URL, headers=headers)
+        profile = self.transport.get(self.PROFILE_URL, headers=headers)
+        return self._merge_identity(profile, emails.result(), rate_limit)
 
+    async def afetch_identity(self, access_token):
+        """
+        Asyncio variant of ``fetch_identity``.
+        """
+        import asyncio
+
+        headers = {"Authorization": f'Bearer {access_token}'}
+        rate_limit = self.rate_limit_for(access_token)
+        await rate_limit.aacquire(cost=2)
+        profile, emails = await asyncio.gather(
+            self.async_transport.get(self.PROFILE_URL, headers=headers),
+            self.async_transport.get(self.EMAILS_URL, headers=headers),
+        )
+        return self._merge_identity(profile, emails, rate_limit)
+
+    def _merge_identity(self, profile_response, emails_response, rate_limit):
+        rate_limit.observe(profile_response)
+        profile_response.raise_for_status()
+        identity = dict(response_json(profile_response))
+
+        # ==== Tokens without the user:email scope cannot list addresses; keep the public profile email ====
+        emails = []
+        if emails_response.status_code not in (403, 404):
+            emails_response.raise_for_status()
+            emails = response_json(emails_response)
+
+        primary = next((item["email"] for item in emails if item.get("primary") and item.get("verified")), None)
+        identity["email"] = primary or identity.get("email")
+        identity["emails"] = emails
+        identity.update(self._parse_scopes(profile_response.headers))
+        return identity
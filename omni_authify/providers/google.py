@@ -1,20 +1,33 @@
-from urllib.parse import urlencode
+from ..core.profile import ProfileMapping
+from ..core.spec import ProviderSpec
+from .base import OAuth2Provider, OpenIDConnectMixin
 
-import requests
 
-from .base import BaseOAuth2Provider
 
-
-
-class Google(BaseOAuth2Provider):
+class Google(OpenIDConnectMixin, OAuth2Provider):
     """
     Google OAuth2 provider.
     """
-    AUTHORIZE_URL: str = "https://accounts.google.com/o/oauth2/v2/auth"
-    PROFILE_URL: str = "https://www.googleapis.com/oauth2/v1/userinfo"
-    TOKEN_URL: str = "https://oauth2.googleapis.com/token"
-
-    def __init__(self, client_id, client_secret, redirect_uri, scope):
+    SPEC = ProviderSpec(
+        authorize_url="https://accounts.google.com/o/oauth2/v2/auth",
+        token_url="https://oauth2.googleapis.com/token",
+        profile_url="https://www.googleapis.com/oauth2/v1/userinfo",
+        token_headers={"Content-Type": "application/x-www-form-urlencoded"},
+        refresh=True,
+        profile_mapping=ProfileMapping(
+            id=("id", "sub"), name="name", first_name="given_name", last_name="family_name", email="email",
+            email_verified=("verified_email", "email_verified"), picture="picture",
+        ),
+    )
+    JWKI_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    ISSUERS: tuple = ("https://accounts.google.com", "accounts.google.com")
+    DISCOVERY_URL: str = "https://accounts.google.com/.well-known/openid-configuration"
+    # ==== The discovered userinfo endpoint answers OIDC claims, not the v1 payload get_user_profile returns ====
+    DISCOVERY_ENDPOINTS = {
+        "authorization_endpoint": "AUTHORIZE_URL", "token_endpoint": "TOKEN_URL", "jwks_uri": "JWKI_URL",
+    }
+
+    def __init__(self, client_id, client_secret, redirect_uri, scope, transport=None, async_transport=None, oidc=False):
         """
         Initialize the Google provider with client credentials.
 
@@ -23,66 +36,12 @@ class Google(BaseOAuth2Provider):
             client_secret (str): The client secret provided by Google (not used for service accounts).
             redirect_uri (str): The URI to redirect to after authentication.
             scope/fields (str): The comma-separated string of permissions requested.
+            transport (HTTPTransport, optional): HTTP transport to use instead of the shared one.
+            async_transport (AsyncHTTPTransport, optional): Transport used by the asyncio methods.
+            oidc (bool): Return the verified id_token claims from ``get_user_info`` instead of calling PROFILE_URL.
         """
         super().__init__(
-            client_id=client_id, client_secret=client_secret, redirect_uri=redirect_uri, fields=['id'], scope=scope
+            client_id=client_id, client_secret=client_secret, redirect_uri=redirect_uri, fields=['id'], scope=scope,
+            transport=transport, async_transport=async_transport,
             )
-
-    def get_authorization_url(self, state=None, scope=None):
-        """
-        Generate the authorization URL to redirect the user for authentication.
-
-        Returns:
-            str: The authorization URL.
-        """
-        params = {
-            "client_id": self.client_id,
-            "redirect_uri": self.redirect_uri,
-            "response_type": "code",
-            "scope": scope or self.scope
-        }
-
-        if state:
-            params["state"] = state
-        return f"{self.AUTHORIZE_URL}?{urlencode(params)}"
-
-    def get_access_token(self, code):
-        """
-        Exchange the authorization code for an access token.
-
-        Args:
-            code (str): The authorization code received from the callback.
-
-        Returns:
-            str: The access token.
-        """
-        payload = {
-            "grant_type": "authorization_code",
-            "code": code,
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-            "redirect_uri": self.redirect_uri,
-        }
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        response = requests.post(self.TOKEN_URL, data=payload, headers=headers)
-        response.raise_for_status()
-        return  response.json().get("access_token")
-
-    def get_user_profile(self, access_token, fields=None):
-        """
-        Fetch user profile information from Google.
-
-        Args:
-            access_token (str): The access token for the user.
-
-        Returns:
-            dict: The user profile data.
-            :param access_token: from exchanging the code for an access token.
-            :param fields: scope permissions for fetching user profile data.
-        """
-        headers = {"Authorization": f"Bearer {access_token}"}
-        response = requests.get(self.PROFILE_URL, headers=headers)
-        response.raise_for_status()
-        return response.json()
-
-
+        self.oidc = oidc
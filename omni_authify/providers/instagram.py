@@ -1,5 +1,9 @@
-import requests
+import time
 
+from ..core.cache import cached_profile
+from ..core.codec import response_json
+from ..core.profile import ProfileMapping
+from .base import BaseOAuth2Provider
 from .facebook import Facebook
 
 
@@ -8,13 +12,37 @@ class Instagram(Facebook):
     Instagram currently not supported.
     """
     PROFILE_URL: str = "https://graph.instagram.com/me"
+    PROFILE_MAPPING = ProfileMapping(id="id", username="username", name="name", picture="profile_picture_url")
 
+    # ==== graph.instagram.com has no batch endpoint ====
+    get_user_profiles = BaseOAuth2Provider.get_user_profiles
+
+    @cached_profile
     def get_user_profile(self, access_token: str, fields: str) -> dict:
+        spec = self.field_spec(fields)
         payload = {
             "access_token": access_token,
-            "fields": fields,
+            "fields": spec.encoded,
         }
-        response = requests.get(self.PROFILE_URL, params=payload)
+        started = time.perf_counter()
+        response = self.transport.get(self.PROFILE_URL, params=payload)
+        elapsed = time.perf_counter() - started
         response.raise_for_status()
-        return response.json()
+        profile = response_json(response)
+        self.field_costs.record(spec, len(response.content), elapsed, profile)
+        return profile
 
+    @cached_profile
+    async def aget_user_profile(self, access_token: str, fields: str) -> dict:
+        spec = self.field_spec(fields)
+        payload = {
+            "access_token": access_token,
+            "fields": spec.encoded,
+        }
+        started = time.perf_counter()
+        response = await self.async_transport.get(self.PROFILE_URL, params=payload)
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        profile = response_json(response)
+        self.field_costs.record(spec, len(response.content), elapsed, profile)
+        return profile
@@ -0,0 +1,41 @@
+from ..core.profile import ProfileMapping
+from ..core.spec import ProviderSpec
+from .base import OAuth2Provider
+
+
+class Twitter(OAuth2Provider):
+    """
+    Twitter (X) OAuth 2.0 provider, for confidential clients.
+
+    Request the ``users.read`` and ``tweet.read`` scopes to read the profile, and ``offline.access`` for a refresh
+    token. X does not share e-mail addresses through this endpoint, so the profile has no ``email``.
+    """
+    SPEC = ProviderSpec(
+        authorize_url="https://twitter.com/i/oauth2/authorize",
+        token_url="https://api.twitter.com/2/oauth2/token",
+        profile_url="https://api.twitter.com/2/users/me",
+        authorization_params=("response_type", "client_id", "redirect_uri", "scope"),
+        token_auth="basic",
+        refresh=True,
+        pkce=True,
+        profile_params={"user.fields": "id,name,username,profile_image_url"},
+        profile_root="data",
+        profile_mapping=ProfileMapping(id="id", username="username", name="name", picture="profile_image_url"),
+    )
+
+    def __init__(self, client_id, client_secret, redirect_uri, scope, transport=None, async_transport=None):
+        """
+        Initialize the Twitter provider with client credentials.
+
+        Args:
+            client_id (str): The OAuth 2.0 client ID from the X developer portal.
+            client_secret (str): The OAuth 2.0 client secret from the X developer portal.
+            redirect_uri (str): The URI to redirect to after authentication.
+            scope (str): The space-separated string of permissions requested.
+            transport (HTTPTransport, optional): HTTP transport to use instead of the shared one.
+            async_transport (AsyncHTTPTransport, optional): Transport used by the asyncio methods.
+        """
+        super().__init__(
+            client_id, client_secret, redirect_uri, fields=['id'], scope=scope, transport=transport,
+            async_transport=async_transport,
+        )
@@ -36,6 +36,9 @@ setup(
         'django':['Django>=4.2'],
         'drf':['djangorestframework>=3.12.3'],
         'flask':['Flask>=3.0.0'],
-        'fastapi':['fastapi>=0.115.0'],
+        'fastapi':['fastapi>=0.115.0', 'httpx>=0.27.0'],
+        'async':['httpx>=0.27.0'],
+        'oidc':['PyJWT[crypto]>=2.8.0'],
+        'fast-json':['orjson>=3.9.0'],
     }
 )
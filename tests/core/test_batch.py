@@ -0,0 +1,68 @@
+import time
+import unittest
+
+from omni_authify.core.batch import bounded_map, chunked
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+
+class TestBoundedMap(unittest.TestCase):
+    def test_results_in_input_order_with_errors(self):
+        def square(value):
+            if value == 3:
+                raise ValueError("boom")
+            time.sleep(0.01 * (5 - value))
+            return value * value
+
+        results = list(bounded_map(square, range(5), max_workers=3))
+        self.assertEqual([item for item, _, _ in results], [0, 1, 2, 3, 4])
+        self.assertEqual([result for _, result, _ in results], [0, 1, 4, None, 16])
+        self.assertIsInstance(results[3][2], ValueError)
+
+    def test_consumes_input_lazily(self):
+        consumed = []
+
+        def tokens():
+            for index in range(1000):
+                consumed.append(index)
+                yield index
+
+        for index, _ in enumerate(bounded_map(lambda value: value, tokens(), max_workers=4)):
+            # ==== Never more than the 2 * max_workers window read ahead of the consumer ====
+            self.assertLessEqual(len(consumed) - index, 8)
+        self.assertEqual(len(consumed), 1000)
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+
+
+class TestGetUserProfiles(unittest.TestCase):
+    def setUp(self):
+        def user(request):
+            if request.headers["Authorization"] == "Bearer revoked":
+                return 401, {}, {"message": "Bad credentials"}
+            return 200, {}, {"login": request.headers["Authorization"].split()[1]}
+
+        self.server = MockServer(routes={("GET", "/user"): user}).start()
+        self.transport = HTTPTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def test_per_item_errors(self):
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "user",
+                          transport=self.transport)
+        provider.PROFILE_URL = f"{self.server.url}/user"
+
+        results = list(provider.get_user_profiles(iter(["alice", "revoked", "bob"]), max_workers=2))
+        self.assertEqual([result.access_token for result in results], ["alice", "revoked", "bob"])
+        self.assertEqual(results[0].profile, {"login": "alice"})
+        self.assertIsNotNone(results[1].error)
+        self.assertIsNone(results[1].profile)
+        self.assertEqual(results[2].profile, {"login": "bob"})
+
+
+if __name__ == "__main__":
+    unittest.main()
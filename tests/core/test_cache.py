@@ -0,0 +1,137 @@
+import asyncio
+import time
+import unittest
+
+from omni_authify.core.cache import MemoryCacheBackend, ProfileCache, RedisCacheBackend
+from omni_authify.core.oauth import get_provider
+from omni_authify.providers.facebook import Facebook
+from tests.core.test_transport import StubTransport
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        value, expires_at = self.store.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.store[key] = (value.encode(), time.monotonic() + ex if ex else None)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+class AsyncStubTransport(StubTransport):
+    async def request(self, method, url, **kwargs):
+        return super().request(method, url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+
+class TestMemoryCacheBackend(unittest.TestCase):
+    def test_lru_eviction(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", 1, ttl=60)
+        backend.set("b", 2, ttl=60)
+        backend.get("a")
+        backend.set("c", 3, ttl=60)
+
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual((backend.get("a"), backend.get("c")), (1, 3))
+        self.assertEqual(backend.evictions, 1)
+
+    def test_ttl_expiry(self):
+        backend = MemoryCacheBackend()
+        backend.set("a", 1, ttl=0)
+        self.assertIsNone(backend.get("a"))
+        self.assertEqual(len(backend), 0)
+
+
+class TestProfileCache(unittest.TestCase):
+    def setUp(self):
+        self.transport = StubTransport({"id": "1", "name": "Test User"})
+
+    def make_provider(self, cache):
+        provider = Facebook("client_id", "client_secret", "https://example.com/callback", "id,name", "email",
+                            transport=self.transport)
+        provider.profile_cache = cache
+        return provider
+
+    def test_disabled_by_default(self):
+        provider = self.make_provider(None)
+        provider.get_user_profile("token")
+        provider.get_user_profile("token")
+        self.assertEqual(len(self.transport.calls), 2)
+
+    def test_repeated_lookups_hit_cache(self):
+        cache = ProfileCache(ttl=60)
+        provider = self.make_provider(cache)
+
+        first = provider.get_user_profile("token")
+        # ==== Default, positional and keyword fields are the same request ====
+        provider.get_user_profile("token", "id,name,email,picture")
+        provider.get_user_profile("token", fields="id,name,email,picture")
+
+        self.assertEqual(first["name"], "Test User")
+        self.assertEqual(len(self.transport.calls), 1)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertAlmostEqual(cache.hit_ratio, 2 / 3)
+
+    def test_hits_are_copies(self):
+        provider = self.make_provider(ProfileCache(ttl=60))
+        provider.get_user_profile("token")["name"] = "Changed"
+        provider.get_user_profile("token")["name"] = "Changed again"
+        self.assertEqual(provider.get_user_profile("token")["name"], "Test User")
+        self.assertEqual(len(self.transport.calls), 1)
+
+    def test_key_covers_token_and_fields(self):
+        provider = self.make_provider(ProfileCache(ttl=60))
+        provider.get_user_profile("token", "id")
+        provider.get_user_profile("token", "id,email")
+        provider.get_user_profile("other_token", "id")
+        self.assertEqual(len(self.transport.calls), 3)
+
+    def test_key_does_not_contain_token(self):
+        self.assertNotIn("secret_token", ProfileCache.key("Facebook", "secret_token", {"fields": "id"}))
+
+    def test_redis_backend(self):
+        redis = FakeRedis()
+        provider = self.make_provider(ProfileCache(RedisCacheBackend(redis), ttl=60))
+        provider.get_user_profile("token")
+        self.assertEqual(provider.get_user_profile("token"), {"id": "1", "name": "Test User"})
+        self.assertEqual(len(self.transport.calls), 1)
+        self.assertEqual(len(redis.store), 1)
+
+    def test_async_profile_uses_cache(self):
+        transport = AsyncStubTransport({"id": "1"})
+        provider = Facebook("client_id", "client_secret", "https://example.com/callback", "id", "email",
+                            async_transport=transport)
+        provider.profile_cache = ProfileCache(ttl=60)
+
+        async def run():
+            await provider.aget_user_profile("token")
+            return await provider.aget_user_profile("token")
+
+        self.assertEqual(asyncio.run(run()), {"id": "1"})
+        self.assertEqual(len(transport.calls), 1)
+
+    def test_configured_from_settings(self):
+        provider = get_provider('github', {
+            'client_id': 'client_id',
+            'client_secret': 'client_secret',
+            'redirect_uri': 'https://example.com/callback',
+            'scope': 'user',
+            'profile_cache': {'ttl': 120, 'max_entries': 10},
+        })
+        self.assertEqual(provider.profile_cache.ttl, 120)
+        self.assertEqual(provider.profile_cache.backend.max_entries, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
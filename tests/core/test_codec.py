@@ -0,0 +1,112 @@
+import asyncio
+import importlib.util
+import unittest
+
+from omni_authify.core import codec
+from omni_authify.core.codec import get_json_backend, json_dumps, json_loads, response_json, set_json_backend
+from omni_authify.core.exceptions import InvalidResponseError, ProviderError
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from tests.mock_server import MockServer
+
+PAYLOAD = {"id": "1", "name": "Zoë", "picture": {"data": {"url": "https://example.com/p.jpg"}}, "n": [1, 2.5, None]}
+
+
+class TestJSONBackends(unittest.TestCase):
+
+    def setUp(self):
+        previous = codec._backend
+        self.addCleanup(setattr, codec, "_backend", previous)
+
+    def test_every_installed_backend_round_trips(self):
+        for name in codec.JSON_BACKENDS:
+            if name != "json" and importlib.util.find_spec(name) is None:
+                continue
+            with self.subTest(backend=name):
+                self.assertEqual(set_json_backend(name), name)
+                encoded = json_dumps(PAYLOAD)
+                self.assertIsInstance(encoded, bytes)
+                self.assertNotIn(b" ", encoded)
+                self.assertEqual(json_loads(encoded), PAYLOAD)
+                self.assertEqual(json_loads(encoded.decode()), PAYLOAD)
+
+    def test_auto_prefers_installed_fast_backend(self):
+        expected = next(name for name in codec.JSON_BACKENDS
+                        if name == "json" or importlib.util.find_spec(name) is not None)
+        self.assertEqual(set_json_backend("auto"), expected)
+        codec._backend = None
+        self.assertEqual(get_json_backend(), expected)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            set_json_backend("simplejson5")
+
+    def test_invalid_json_is_a_value_error(self):
+        with self.assertRaises(ValueError):
+            json_loads(b"{not json")
+
+
+class TestTransportDecoding(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer().start()
+        self.server.route("GET", "/me", PAYLOAD)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def use_recording_backend(self):
+        decoded = []
+        standard = codec._load("json")
+
+        def loads(data):
+            decoded.append(data)
+            return standard.loads(data)
+
+        previous = codec._backend
+        codec._backend = codec._Backend("recording", loads, standard.dumps, standard.errors)
+        self.addCleanup(setattr, codec, "_backend", previous)
+        return decoded
+
+    def test_sync_response_json_uses_backend(self):
+        decoded = self.use_recording_backend()
+        transport = HTTPTransport()
+        response = transport.get(f"{self.server.url}/me")
+        transport.close()
+
+        self.assertEqual(response_json(response), PAYLOAD)
+        self.assertEqual(decoded, [response.content])
+
+    def test_async_response_json_uses_backend(self):
+        decoded = self.use_recording_backend()
+
+        async def main():
+            transport = AsyncHTTPTransport()
+            try:
+                return response_json(await transport.get(f"{self.server.url}/me"))
+            finally:
+                await transport.aclose()
+
+        self.assertEqual(asyncio.run(main()), PAYLOAD)
+        self.assertEqual(len(decoded), 1)
+
+    def test_invalid_body_raises_one_error_type_with_every_backend(self):
+        self.server.route("GET", "/html", b"<html>Bad Gateway</html>")
+        transport = HTTPTransport()
+        self.addCleanup(transport.close)
+        response = transport.get(f"{self.server.url}/html")
+
+        previous = codec._backend
+        self.addCleanup(setattr, codec, "_backend", previous)
+        for name in codec.JSON_BACKENDS:
+            if name != "json" and importlib.util.find_spec(name) is None:
+                continue
+            with self.subTest(backend=name):
+                set_json_backend(name)
+                with self.assertRaises(InvalidResponseError) as raised:
+                    response_json(response)
+                self.assertIsInstance(raised.exception, ProviderError)
+                self.assertIsInstance(raised.exception, ValueError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import time
+import unittest
+
+from omni_authify.core.discovery import OIDCDiscovery
+from omni_authify.core.exceptions import IntegrationError, ProviderError
+from omni_authify.core.oauth import get_provider
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers import Google, LinkedIn
+from tests.mock_oauth import PROFILES, MockOAuthServer
+
+
+class TestOIDCDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.server = MockOAuthServer("linkedin", strict=True).start()
+        self.transport = HTTPTransport(backoff_factor=0.01)
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+        self.cache_dir.cleanup()
+
+    def make_discovery(self, **kwargs):
+        return OIDCDiscovery(self.server.url_for("discovery"), transport=self.transport,
+                             cache_dir=self.cache_dir.name, **kwargs)
+
+    def discovery_requests(self):
+        return len([path for _, path in self.server.requests if path == self.server.paths["discovery"]])
+
+    def wait_for(self, discovery, generation=1):
+        for _ in range(200):
+            if discovery.generation >= generation or discovery.errors:
+                return
+            time.sleep(0.01)
+        self.fail("discovery did not complete")
+
+    def test_first_call_does_not_wait_and_fetches_in_background(self):
+        discovery = self.make_discovery()
+        self.assertIsNone(discovery.metadata())
+        self.wait_for(discovery)
+
+        for _ in range(20):
+            self.assertEqual(discovery.metadata()["token_endpoint"], self.server.url_for("token"))
+        self.assertEqual(self.discovery_requests(), 1)
+        self.assertEqual(discovery.stats()["source"], "network")
+
+    def test_document_is_read_back_from_disk(self):
+        self.make_discovery().refresh()
+
+        discovery = self.make_discovery()
+        self.assertEqual(discovery.metadata()["jwks_uri"], self.server.url_for("jwks"))
+        self.assertEqual(discovery.stats()["source"], "disk")
+        self.assertEqual(self.discovery_requests(), 1)
+
+    def test_expired_document_is_served_while_refreshing(self):
+        first = self.make_discovery()
+        first._write_disk(first.refresh(), time.time() - 1)
+        self.server.route("GET", self.server.paths["discovery"], {"issuer": "https://elsewhere.example.com"})
+
+        discovery = self.make_discovery(retry_interval=60)
+        self.assertEqual(discovery.metadata()["token_endpoint"], self.server.url_for("token"))
+        self.wait_for(discovery, generation=2)
+        # ==== The refresh was rejected: the stale document stays and no retry happens before retry_interval ====
+        self.assertEqual(discovery.errors, 1)
+        for _ in range(5):
+            self.assertEqual(discovery.metadata()["token_endpoint"], self.server.url_for("token"))
+        self.assertEqual(self.discovery_requests(), 2)
+
+    def test_document_of_another_issuer_is_rejected(self):
+        self.server.route("GET", self.server.paths["discovery"], {
+            "issuer": "https://elsewhere.example.com", "authorization_endpoint": "https://elsewhere.example.com/a",
+            "token_endpoint": "https://elsewhere.example.com/t", "jwks_uri": "https://elsewhere.example.com/k",
+        })
+        with self.assertRaises(ProviderError):
+            self.make_discovery().refresh()
+        self.assertFalse(os.listdir(self.cache_dir.name))
+
+    def test_corrupt_cache_file_is_ignored(self):
+        discovery = self.make_discovery(retry_interval=60)
+        with open(discovery.path, "wb") as file:
+            file.write(b"{not json")
+        self.server.fail_endpoint("discovery", times=1, status=404)
+        self.assertIsNone(discovery.metadata())
+        self.wait_for(discovery)
+        self.assertIsNone(discovery.metadata())
+
+
+class TestProviderDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.transport = HTTPTransport(backoff_factor=0.01)
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.transport.close()
+        self.cache_dir.cleanup()
+
+    def make_provider(self, cls, server, scope, **kwargs):
+        provider = cls("client_id", "client_secret", "https://example.com/callback", scope, transport=self.transport,
+                       **kwargs)
+        provider.discovery = OIDCDiscovery(server.url_for("discovery"), transport=self.transport,
+                                           cache_dir=self.cache_dir.name)
+        return provider
+
+    def test_login_follows_the_discovered_endpoints(self):
+        with MockOAuthServer("linkedin", strict=True) as server:
+            provider = self.make_provider(LinkedIn, server, "openid profile email")
+            provider.discovery.refresh()
+
+            callback = server.consent(provider.get_authorization_url(state="state-1"))
+            profile = provider.get_user_info(callback["code"])
+            self.assertEqual(profile["sub"], PROFILES["linkedin"]["sub"])
+            self.assertEqual(provider.TOKEN_URL, server.url_for("token"))
+            self.assertEqual(provider.ISSUERS[0], server.url_for("discovery").split("/.well-known")[0])
+
+    def test_builtin_endpoints_are_kept_until_a_document_is_loaded(self):
+        with MockOAuthServer("google") as server:
+            server.fail_endpoint("discovery", times=1, status=503)
+            provider = self.make_provider(Google, server, "openid email")
+            url = provider.get_authorization_url(state="state-1")
+            self.assertTrue(url.startswith(Google.AUTHORIZE_URL))
+            self.assertEqual(provider.TOKEN_URL, Google.TOKEN_URL)
+
+            provider.discovery.refresh()
+            self.assertTrue(provider.get_authorization_url(state="state-1").startswith(server.url_for("authorize")))
+            # ==== Google's v1 userinfo payload is not the discovered OIDC userinfo endpoint's ====
+            self.assertEqual(provider.PROFILE_URL, Google.PROFILE_URL)
+
+    def test_settings_enable_discovery(self):
+        provider = get_provider("google", {
+            "client_id": "id", "client_secret": "secret", "redirect_uri": "https://example.com/callback",
+            "scope": "openid", "discovery": {"cache_dir": False},
+        })
+        self.assertEqual(provider.discovery.url, Google.DISCOVERY_URL)
+        with self.assertRaises(IntegrationError):
+            get_provider("github", {"client_id": "id", "client_secret": "secret",
+                                    "redirect_uri": "https://example.com/callback", "scope": "user", "discovery": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+from omni_authify.core.fields import FieldCostTracker, FieldSpec, get_field_cost_tracker
+
+
+class TestFieldSpec(unittest.TestCase):
+    def test_normalizes_order_spacing_and_duplicates(self):
+        spec = FieldSpec.parse(" name, id ,email,id,, ")
+
+        self.assertEqual(spec.encoded, "email,id,name")
+        self.assertEqual(spec.names, ("email", "id", "name"))
+
+    def test_list_and_string_give_the_same_spec(self):
+        self.assertEqual(FieldSpec.parse(["id", "name"]), FieldSpec.parse("name,id"))
+
+    def test_parse_is_cached(self):
+        self.assertIs(FieldSpec.parse("id,name,picture"), FieldSpec.parse("id,name,picture"))
+
+    def test_nested_projections(self):
+        spec = FieldSpec.parse("friends.limit(5){name,id},picture.width(200).height(200){url},id")
+
+        self.assertEqual(spec.encoded, "friends.limit(5){id,name},id,picture.height(200).width(200){url}")
+        self.assertIn("friends", spec)
+
+    def test_repeated_projections_are_merged(self):
+        spec = FieldSpec.parse("picture{url},picture{width},picture{url}")
+
+        self.assertEqual(spec.encoded, "picture{url,width}")
+
+    def test_bare_field_merges_with_its_projection(self):
+        self.assertEqual(FieldSpec.parse("picture,picture{url}").encoded, "picture{url}")
+
+    def test_conflicting_modifiers_are_rejected(self):
+        with self.assertRaises(ValueError):
+            FieldSpec.parse("picture.width(100),picture.width(1000)")
+
+    def test_malformed_specs_are_rejected(self):
+        for fields in ("", "id,", "picture.width", "picture.width(100", "friends{name", "id}", "na-me", "a{}"):
+            with self.subTest(fields=fields):
+                if fields == "id,":
+                    self.assertEqual(FieldSpec.parse(fields).encoded, "id")
+                    continue
+                with self.assertRaises(ValueError):
+                    FieldSpec.parse(fields)
+
+
+class TestFieldCostTracker(unittest.TestCase):
+    def test_stats_per_field_set(self):
+        tracker = FieldCostTracker("test")
+        small, large = FieldSpec.parse("id,name"), FieldSpec.parse("id,friends{name}")
+
+        tracker.record(small, 100, 0.010)
+        tracker.record(small, 120, 0.030)
+        tracker.record(large, 5000, 0.200, count=2)
+
+        stats = tracker.stats()["field_sets"]
+        self.assertEqual(stats["id,name"]["requests"], 2)
+        self.assertEqual(stats["id,name"]["avg_bytes"], 110)
+        self.assertAlmostEqual(stats["id,name"]["avg_latency_ms"], 20)
+        self.assertAlmostEqual(stats["id,name"]["max_latency_ms"], 30)
+        self.assertEqual(stats["friends{name},id"]["avg_bytes"], 2500)
+
+    def test_fields_are_sampled(self):
+        tracker = FieldCostTracker("test", sample_every=2)
+        spec = FieldSpec.parse("id,friends{name}")
+        profile = {"id": "1", "friends": {"data": [{"name": "x" * 100}]}}
+
+        for _ in range(3):
+            tracker.record(spec, 150, 0.01, profile)
+
+        fields = tracker.stats()["fields"]
+        self.assertEqual(list(fields), ["friends", "id"])
+        self.assertGreater(fields["friends"], 100)
+        self.assertEqual(fields["id"], 3)
+
+    def test_least_recently_requested_field_sets_are_evicted(self):
+        tracker = FieldCostTracker("test", max_field_sets=2)
+        tracker.record(FieldSpec.parse("id"), 10, 0.01)
+        tracker.record(FieldSpec.parse("id,name"), 20, 0.01)
+        tracker.record(FieldSpec.parse("id"), 10, 0.01)
+        tracker.record(FieldSpec.parse("id,email"), 30, 0.01)
+
+        self.assertEqual(sorted(tracker.stats()["field_sets"]), ["email,id", "id"])
+        self.assertEqual(tracker.evictions, 1)
+
+    def test_reset(self):
+        tracker = FieldCostTracker("test")
+        tracker.record(FieldSpec.parse("id"), 10, 0.01, {"id": "1"})
+        tracker.reset()
+
+        self.assertEqual(tracker.stats(), {"field_sets": {}, "fields": {}})
+
+    def test_trackers_are_shared_per_provider(self):
+        self.assertIs(get_field_cost_tracker("facebook"), get_field_cost_tracker("facebook"))
+        self.assertIsNot(get_field_cost_tracker("facebook"), get_field_cost_tracker("instagram"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+import asyncio
+import unittest
+
+from omni_authify.core.instrumentation import (
+    Instrumentation, OpenTelemetryInstrumentation, PrometheusInstrumentation, add_instrumentation,
+    get_instrumentations, remove_instrumentation, track,
+)
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+
+class RecordingInstrumentation(Instrumentation):
+
+    def __init__(self):
+        self.events = []
+
+    def finish(self, event, token):
+        self.events.append(event)
+
+    def phases(self):
+        return [(event.phase, event.provider, event.status) for event in self.events]
+
+
+class FakeHistogram:
+    """
+    Duck-typed ``prometheus_client.Histogram``.
+    """
+
+    def __init__(self):
+        self.observations = []
+
+    def labels(self, **labels):
+        histogram = self
+
+        class Child:
+            def observe(self, value):
+                histogram.observations.append((labels, value))
+
+        return Child()
+
+
+class FakeSpan:
+
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.parent = parent
+        self.exception = None
+        self.ended = False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class FakeTracer:
+    """
+    Duck-typed ``opentelemetry.trace.Tracer`` keeping a stack of current spans.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.stack = []
+
+    def start_as_current_span(self, name, attributes=None):
+        tracer = self
+
+        class Context:
+            def __enter__(self):
+                self.span = FakeSpan(name, attributes or {}, tracer.stack[-1] if tracer.stack else None)
+                tracer.spans.append(self.span)
+                tracer.stack.append(self.span)
+                return self.span
+
+            def __exit__(self, exc_type, exc, traceback):
+                assert tracer.stack.pop() is self.span, "spans must be closed in LIFO order"
+                self.span.exception = exc
+                self.span.ended = True
+
+        return Context()
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer().start()
+        self.server.route("POST", "/token", {"access_token": "token", "token_type": "bearer"})
+        self.server.route("GET", "/user", {"id": 1, "login": "octocat"})
+        self.provider = GitHub("client_id", "client_secret", "https://example.com/cb", "user",
+                               transport=HTTPTransport(backoff_factor=0.01))
+        self.provider.TOKEN_URL = f"{self.server.url}/token"
+        self.provider.PROFILE_URL = f"{self.server.url}/user"
+
+    def tearDown(self):
+        for instrumentation in get_instrumentations():
+            remove_instrumentation(instrumentation)
+        self.provider.transport.close()
+        self.server.stop()
+
+    def instrument(self, instrumentation):
+        return add_instrumentation(instrumentation)
+
+
+class TestProviderPhases(InstrumentationTestCase):
+
+    def test_no_instrumentation_means_no_events(self):
+        self.assertEqual(get_instrumentations(), ())
+        with track("token_exchange", "github") as event:
+            self.assertIsNone(event)
+        self.assertEqual(self.provider.get_user_info("code")["login"], "octocat")
+
+    def test_login_phases_carry_status_and_bytes(self):
+        recorder = self.instrument(RecordingInstrumentation())
+        self.provider.get_authorization_url(state="state")
+        self.provider.get_user_info("code")
+
+        self.assertEqual(recorder.phases(), [
+            ("authorization_url", "github", None),
+            ("token_exchange", "github", 200),
+            ("profile_fetch", "github", 200),
+        ])
+        profile_fetch = recorder.events[-1]
+        self.assertEqual(profile_fetch.bytes, len(b'{"id": 1, "login": "octocat"}'))
+        self.assertGreater(profile_fetch.duration, 0)
+
+    def test_delegating_methods_report_one_phase(self):
+        recorder = self.instrument(RecordingInstrumentation())
+        self.provider.get_access_token("code")  # calls get_token_response
+        self.assertEqual(recorder.phases(), [("token_exchange", "github", 200)])
+
+    def test_retries_are_nested_and_counted(self):
+        recorder = self.instrument(RecordingInstrumentation())
+        self.server.fail("GET", "/user", times=2, status=503)
+        self.provider.get_user_profile("token")
+
+        retry, second_retry, profile_fetch = recorder.events
+        self.assertEqual((retry.phase, retry.status, retry.attributes["attempt"]), ("retry", 503, 1))
+        self.assertIs(retry.parent, profile_fetch)
+        self.assertEqual(second_retry.attributes["attempt"], 2)
+        self.assertEqual((profile_fetch.status, profile_fetch.retries), (200, 2))
+
+    def test_failed_phase_records_the_error(self):
+        recorder = self.instrument(RecordingInstrumentation())
+        self.server.route("GET", "/user", {"message": "Bad credentials"}, status=401)
+        with self.assertRaises(Exception) as raised:
+            self.provider.get_user_profile("token")
+
+        event = recorder.events[-1]
+        self.assertEqual(event.status, 401)
+        self.assertIs(event.error, raised.exception)
+
+    def test_async_phases(self):
+        recorder = self.instrument(RecordingInstrumentation())
+
+        async def main():
+            transport = AsyncHTTPTransport()
+            self.provider._async_transport = transport
+            try:
+                with track("callback", "github"):
+                    return await self.provider.aget_user_info("code")
+            finally:
+                await transport.aclose()
+
+        self.assertEqual(asyncio.run(main())["id"], 1)
+        callback = recorder.events[-1]
+        self.assertEqual([event.phase for event in recorder.events], ["token_exchange", "profile_fetch", "callback"])
+        self.assertTrue(all(event.parent is callback for event in recorder.events[:2]))
+
+
+class TestAdapters(InstrumentationTestCase):
+
+    def test_prometheus_histograms(self):
+        durations, sizes = FakeHistogram(), FakeHistogram()
+        self.instrument(PrometheusInstrumentation(durations, size_histogram=sizes))
+        self.provider.get_user_info("code")
+
+        labels = [labels for labels, _ in durations.observations]
+        self.assertEqual(labels, [
+            {"phase": "token_exchange", "provider": "github", "status": "200"},
+            {"phase": "profile_fetch", "provider": "github", "status": "200"},
+        ])
+        self.assertTrue(all(value > 0 for _, value in durations.observations))
+        self.assertEqual(len(sizes.observations), 2)
+
+    def test_prometheus_status_without_response(self):
+        durations = FakeHistogram()
+        self.instrument(PrometheusInstrumentation(durations))
+        with self.assertRaises(ValueError):
+            with track("callback", "github"):
+                raise ValueError("boom")
+        with track("callback", "github"):
+            pass
+        self.assertEqual([labels["status"] for labels, _ in durations.observations], ["error", "ok"])
+
+    def test_opentelemetry_spans_nest_like_phases(self):
+        tracer = FakeTracer()
+        self.instrument(OpenTelemetryInstrumentation(tracer))
+        self.server.fail("POST", "/token", times=1, status=500)
+        with track("callback", "github"):
+            with self.assertRaises(Exception):
+                self.provider.get_user_info("code")
+
+        callback, token_exchange = tracer.spans
+        self.assertEqual(callback.name, "omni_authify.callback")
+        self.assertIs(token_exchange.parent, callback)
+        self.assertEqual(token_exchange.attributes["omni_authify.provider"], "github")
+        self.assertEqual(token_exchange.attributes["http.response.status_code"], 500)
+        self.assertIsNotNone(token_exchange.exception)
+        self.assertIsNone(callback.exception)
+        self.assertTrue(all(span.ended for span in tracer.spans))
+
+    def test_opentelemetry_api_tracer(self):
+        # ==== The real API falls back to a no-op tracer when no SDK is configured ====
+        self.instrument(OpenTelemetryInstrumentation())
+        self.assertEqual(self.provider.get_user_info("code")["id"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
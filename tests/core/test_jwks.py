@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+
+from omni_authify.core.exceptions import ProviderError
+from omni_authify.core.jwks import JWKSCache, get_jwks_cache
+from omni_authify.core.transport import HTTPTransport, get_default_transport
+from tests.core.test_oidc import jwt, make_signing_key
+from tests.mock_server import MockServer
+
+
+@unittest.skipUnless(jwt, "PyJWT[crypto] is not installed")
+class TestJWKSCache(unittest.TestCase):
+    def setUp(self):
+        _, self.jwk = make_signing_key("key-1")
+        self.server = MockServer().start()
+        self.serve_keys(self.jwk, max_age=600)
+        self.transport = HTTPTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def serve_keys(self, *jwks, max_age):
+        self.server.route("GET", "/certs", {"keys": list(jwks)}, headers={"Cache-Control": f"public, max-age={max_age}"})
+
+    def make_cache(self, **kwargs):
+        kwargs.setdefault("refresh_ahead", 60)
+        return JWKSCache(f"{self.server.url}/certs", transport=self.transport, **kwargs)
+
+    def jwks_requests(self):
+        return len([path for _, path in self.server.requests if path == "/certs"])
+
+    def test_hits_after_first_fetch(self):
+        cache = self.make_cache()
+        first = cache.get_key("key-1")
+        for _ in range(10):
+            self.assertIs(cache.get_key("key-1"), first)
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["refreshes"]), (10, 1, 1))
+        self.assertGreater(stats["expires_in"], 590)
+        self.assertEqual(self.jwks_requests(), 1)
+
+    def test_unknown_kid_single_flight(self):
+        cache = self.make_cache(min_refetch_interval=0)
+        cache.get_key("key-1")
+
+        # ==== The provider rotates its keys; every worker sees the new kid at once ====
+        _, rotated = make_signing_key("key-2")
+        self.serve_keys(self.jwk, rotated, max_age=600)
+        self.server.latency = 0.1
+
+        barrier = threading.Barrier(8)
+        keys = []
+
+        def verify():
+            barrier.wait()
+            keys.append(cache.get_key("key-2"))
+
+        threads = [threading.Thread(target=verify) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(keys), 8)
+        self.assertEqual(self.jwks_requests(), 2)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        cache = self.make_cache(min_refetch_interval=60)
+        cache.get_key("key-1")
+        with self.assertRaises(ProviderError):
+            cache.get_key("forged")
+        self.assertEqual(self.jwks_requests(), 1)
+
+    def test_background_refresh_before_expiry(self):
+        self.serve_keys(self.jwk, max_age=5)
+        cache = self.make_cache(refresh_ahead=10)
+        cache.get_key("key-1")
+
+        # ==== Inside the refresh window the cached key is served and a refresh runs behind it ====
+        cache.get_key("key-1")
+        cache._background_refresh.join(timeout=5)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.refreshes, 2)
+
+    def test_expired_keys_are_refetched(self):
+        self.serve_keys(self.jwk, max_age=0)
+        cache = self.make_cache(refresh_ahead=0)
+        cache.get_key("key-1")
+        time.sleep(0.01)
+        cache.get_key("key-1")
+        self.assertEqual((cache.misses, cache.refreshes), (2, 2))
+
+    def test_shared_caches_are_per_transport(self):
+        url = f"{self.server.url}/certs"
+        other = HTTPTransport()
+        self.addCleanup(other.close)
+
+        cache = get_jwks_cache(url, self.transport)
+        self.assertIs(get_jwks_cache(url, self.transport), cache)
+        self.assertIs(get_jwks_cache(url, other).transport, other)
+        self.assertIs(get_jwks_cache(url), get_jwks_cache(url, get_default_transport()))
+
+
+if __name__ == "__main__":
+    unittest.main()
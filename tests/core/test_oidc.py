@@ -0,0 +1,116 @@
+import asyncio
+import time
+import unittest
+
+try:
+    import jwt
+    from cryptography.hazmat.primitives.asymmetric import rsa
+except ImportError:
+    jwt = None
+
+from omni_authify.core.exceptions import ProviderError
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from omni_authify.providers.google import Google
+from omni_authify.providers.linkedin import LinkedIn
+from tests.mock_server import MockServer
+
+
+def make_signing_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_key, jwk
+
+
+def make_id_token(private_key, kid, **claims):
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": "client_id",
+        "sub": "1234567890",
+        "email": "test@example.com",
+        "name": "Test User",
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@unittest.skipUnless(jwt, "PyJWT[crypto] is not installed")
+class TestOpenIDConnect(unittest.TestCase):
+    def setUp(self):
+        self.private_key, jwk = make_signing_key("key-1")
+        self.server = MockServer().start()
+        self.server.route("GET", "/certs", {"keys": [jwk]})
+        self.server.route("GET", "/userinfo", {"id": "1234567890"})
+        self.transport = HTTPTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def make_provider(self, cls=Google, **kwargs):
+        provider = cls("client_id", "client_secret", "https://example.com/callback", "openid email profile",
+                       transport=self.transport, oidc=True, **kwargs)
+        provider.TOKEN_URL = f"{self.server.url}/token"
+        provider.PROFILE_URL = f"{self.server.url}/userinfo"
+        provider.JWKI_URL = f"{self.server.url}/certs"
+        return provider
+
+    def route_token(self, id_token):
+        self.server.route("POST", "/token", {"access_token": "test_access_token", "id_token": id_token})
+
+    def test_get_user_info_skips_userinfo_request(self):
+        self.route_token(make_id_token(self.private_key, "key-1"))
+        provider = self.make_provider()
+
+        claims = provider.get_user_info("test_code")
+        self.assertEqual(claims["sub"], "1234567890")
+        self.assertEqual(claims["email"], "test@example.com")
+
+        provider.get_user_info("test_code")
+        paths = [path for _, path in self.server.requests]
+        self.assertEqual(paths, ["/token", "/certs", "/token"])
+
+    def test_linkedin_issuer(self):
+        self.route_token(make_id_token(self.private_key, "key-1", iss="https://www.linkedin.com/oauth"))
+        self.assertEqual(self.make_provider(LinkedIn).get_user_info("test_code")["sub"], "1234567890")
+
+    def test_rejects_wrong_audience(self):
+        self.route_token(make_id_token(self.private_key, "key-1", aud="someone_else"))
+        with self.assertRaises(ProviderError):
+            self.make_provider().get_user_info("test_code")
+
+    def test_rejects_foreign_signature(self):
+        foreign_key, _ = make_signing_key("key-1")
+        self.route_token(make_id_token(foreign_key, "key-1"))
+        with self.assertRaises(ProviderError):
+            self.make_provider().get_user_info("test_code")
+
+    def test_missing_id_token(self):
+        self.server.route("POST", "/token", {"access_token": "test_access_token"})
+        with self.assertRaises(ProviderError):
+            self.make_provider().get_user_info("test_code")
+
+    def test_oidc_disabled_uses_userinfo(self):
+        self.route_token(make_id_token(self.private_key, "key-1"))
+        provider = self.make_provider()
+        provider.oidc = False
+        self.assertEqual(provider.get_user_info("test_code"), {"id": "1234567890"})
+
+    def test_async_get_user_info(self):
+        self.route_token(make_id_token(self.private_key, "key-1"))
+
+        async def run():
+            transport = AsyncHTTPTransport()
+            provider = self.make_provider(async_transport=transport)
+            claims = await provider.aget_user_info("test_code")
+            await transport.aclose()
+            return claims
+
+        self.assertEqual(asyncio.run(run())["email"], "test@example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
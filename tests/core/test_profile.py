@@ -0,0 +1,91 @@
+import asyncio
+import pickle
+import unittest
+
+from omni_authify.core.profile import ProfileMapping, UserProfile
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from omni_authify.providers import Facebook, GitHub, Google, LinkedIn
+from tests.mock_oauth import PROFILES, MockOAuthServer
+
+REDIRECT_URI = "https://example.com/callback"
+
+
+class TestProfileMapping(unittest.TestCase):
+
+    def test_nested_paths_and_alternatives(self):
+        mapping = ProfileMapping(id=("id", "sub"), picture="picture.data.url")
+        self.assertEqual(mapping.extract({"sub": "1", "picture": {"data": {"url": "p.jpg"}}}),
+                         {"id": "1", "picture": "p.jpg"})
+        self.assertEqual(mapping.extract({"id": 2, "sub": "1", "picture": "not-a-dict"}), {"id": 2})
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            ProfileMapping(avatar="avatar_url")
+
+
+class TestUserProfile(unittest.TestCase):
+
+    def normalize(self, provider_class, payload):
+        provider = provider_class.__new__(provider_class)
+        return provider.normalize_profile(payload)
+
+    def test_provider_payloads_share_one_shape(self):
+        github = self.normalize(GitHub, {**PROFILES["github"], "avatar_url": "https://a/1.png"})
+        self.assertEqual((github.id, github.username, github.picture), ("1", "octocat", "https://a/1.png"))
+        self.assertIsNone(github.email_verified)
+
+        google = self.normalize(Google, PROFILES["google"])
+        self.assertEqual((google.provider, google.id, google.email_verified), ("google", "1234567890", True))
+
+        facebook = self.normalize(Facebook, PROFILES["facebook"])
+        self.assertEqual(facebook.picture, "https://example.com/picture.jpg")
+
+        linkedin = self.normalize(LinkedIn, PROFILES["linkedin"])
+        self.assertEqual((linkedin.id, linkedin.email, linkedin.email_verified), ("1234567890", "test@example.com", True))
+
+    def test_oidc_claims(self):
+        claims = {"sub": "42", "email": "a@example.com", "email_verified": "true", "given_name": "Ada"}
+        profile = self.normalize(Google, claims)
+        self.assertEqual((profile.id, profile.email_verified, profile.first_name), ("42", True, "Ada"))
+
+    def test_raw_payload_round_trips(self):
+        profile = self.normalize(Facebook, PROFILES["facebook"])
+        self.assertIsInstance(profile._raw, bytes)
+        self.assertEqual(profile.raw, PROFILES["facebook"])
+
+        self.assertIsNone(UserProfile.from_payload("github", {"id": 1}, GitHub.PROFILE_MAPPING, keep_raw=False).raw)
+
+    def test_missing_id(self):
+        with self.assertRaises(ValueError):
+            self.normalize(GitHub, {"login": "octocat"})
+
+    def test_slots_equality_and_pickle(self):
+        profile = self.normalize(GitHub, PROFILES["github"])
+        self.assertFalse(hasattr(profile, "__dict__"))
+        copy = pickle.loads(pickle.dumps(profile))
+        self.assertEqual(copy, profile)
+        self.assertEqual(copy.raw, profile.raw)
+        self.assertEqual(len({profile, copy}), 1)
+        self.assertEqual(profile.to_dict()["provider"], "github")
+
+
+class TestGetProfile(unittest.TestCase):
+
+    def test_sync_and_async(self):
+        with MockOAuthServer("linkedin") as server:
+            provider = server.attach(LinkedIn("client_id", "client_secret", REDIRECT_URI, "openid",
+                                              transport=HTTPTransport()))
+            self.assertEqual(provider.get_profile("token").name, PROFILES["linkedin"]["name"])
+
+            async def main():
+                provider._async_transport = AsyncHTTPTransport()
+                try:
+                    return await provider.aget_profile("token")
+                finally:
+                    await provider._async_transport.aclose()
+
+            self.assertEqual(asyncio.run(main()).id, "1234567890")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+import asyncio
+import gc
+import json
+import time
+import unittest
+
+from omni_authify.core.exceptions import ProviderError, RateLimitExceeded
+from omni_authify.core.ratelimit import (
+    RateLimitTracker, TokenRateLimits, discard_rate_limits, get_rate_limit_tracker, get_token_rate_limits,
+    rate_limit_stats,
+)
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.base import BaseOAuth2Provider
+from omni_authify.providers.facebook import Facebook
+from omni_authify.providers.github import GitHub
+from tests.core.test_transport import StubResponse
+from tests.mock_server import MockServer
+
+
+def response(status_code=200, **headers):
+    stub = StubResponse({}, headers={key.replace("_", "-"): str(value) for key, value in headers.items()})
+    stub.status_code = status_code
+    return stub
+
+
+def github_headers(remaining, reset_in, limit=5000):
+    return {
+        "X_RateLimit_Limit": limit,
+        "X_RateLimit_Remaining": remaining,
+        "X_RateLimit_Reset": int(time.time() + reset_in),
+    }
+
+
+class TestRateLimitTracker(unittest.TestCase):
+
+    def test_reads_github_budget(self):
+        tracker = RateLimitTracker("github:app")
+        tracker.observe(response(**github_headers(remaining=4990, reset_in=1800)))
+
+        stats = tracker.stats()
+        self.assertEqual((stats["limit"], stats["remaining"]), (5000, 4990))
+        self.assertAlmostEqual(stats["reset_in"], 1800, delta=2)
+
+        tracker.acquire()
+        self.assertEqual(tracker.remaining, 4989)
+
+    def test_exhausted_budget_is_rejected_early(self):
+        tracker = RateLimitTracker("github:app", max_delay=1.0)
+        tracker.observe(response(**github_headers(remaining=0, reset_in=600)))
+
+        with self.assertRaises(RateLimitExceeded) as raised:
+            tracker.acquire()
+        self.assertGreater(raised.exception.retry_after, 590)
+        self.assertIsInstance(raised.exception, ProviderError)
+        self.assertEqual(tracker.rejected, 1)
+
+    def test_short_wait_is_delayed(self):
+        tracker = RateLimitTracker("github:app", max_delay=1.0)
+        tracker._blocked_until = time.monotonic() + 0.1
+
+        started = time.perf_counter()
+        tracker.acquire()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+        self.assertEqual(tracker.delayed, 1)
+
+    def test_reject_policy_never_waits(self):
+        tracker = RateLimitTracker("github:app", policy="reject")
+        tracker._blocked_until = time.monotonic() + 0.1
+        with self.assertRaises(RateLimitExceeded):
+            tracker.acquire()
+
+    def test_in_flight_requests_count_against_remaining(self):
+        tracker = RateLimitTracker("github:app")
+        tracker.observe(response(**github_headers(remaining=2, reset_in=600)))
+
+        tracker.acquire()
+        tracker.acquire()
+        with self.assertRaises(RateLimitExceeded):
+            tracker.acquire()
+
+    def test_facebook_app_usage_threshold(self):
+        tracker = RateLimitTracker("facebook:app", usage_threshold=90, cooldown=30)
+        usage = {"call_count": 45, "total_time": 12, "total_cputime": 10}
+        tracker.observe(response(X_App_Usage=json.dumps(usage)))
+        tracker.acquire()
+        self.assertEqual(tracker.stats()["usage"], 45)
+
+        usage["call_count"] = 92
+        tracker.observe(response(X_App_Usage=json.dumps(usage)))
+        with self.assertRaises(RateLimitExceeded):
+            tracker.acquire()
+        self.assertAlmostEqual(tracker.stats()["blocked_for"], 30, delta=1)
+
+    def test_throttled_response_raises(self):
+        tracker = RateLimitTracker("github:app")
+        with self.assertRaises(RateLimitExceeded):
+            tracker.observe(response(status_code=403, **github_headers(remaining=0, reset_in=60)))
+
+        # ==== A 403 for any other reason is left to raise_for_status ====
+        RateLimitTracker("github:other").observe(response(status_code=403, **github_headers(10, 60)))
+
+    def test_secondary_rate_limit_403_blocks(self):
+        tracker = RateLimitTracker("github:secondary", max_delay=1.0)
+        with self.assertRaises(RateLimitExceeded) as raised:
+            tracker.observe(response(status_code=403, Retry_After=60, **github_headers(remaining=4000, reset_in=600)))
+        self.assertGreater(raised.exception.retry_after, 55)
+
+        with self.assertRaises(RateLimitExceeded):
+            tracker.acquire()
+        self.assertEqual(tracker.rejected, 1)
+
+    def test_budget_resets_after_window(self):
+        tracker = RateLimitTracker("github:app")
+        tracker.observe(response(**github_headers(remaining=0, reset_in=0)))
+        tracker._blocked_until = time.monotonic() - 1
+        tracker.acquire()
+
+    def test_local_token_bucket(self):
+        tracker = RateLimitTracker("github:app", rate=20, burst=2, max_delay=1.0)
+        started = time.perf_counter()
+        for _ in range(4):
+            tracker.acquire()
+        # ==== Two calls from the burst, two paced at 20/s ====
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+        self.assertEqual(tracker.delayed, 2)
+
+    def test_async_acquire(self):
+        tracker = RateLimitTracker("github:app", rate=20, burst=1)
+
+        async def main():
+            started = time.perf_counter()
+            await asyncio.gather(tracker.aacquire(), tracker.aacquire())
+            return time.perf_counter() - started
+
+        self.assertGreaterEqual(asyncio.run(main()), 0.04)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            RateLimitTracker("github:app", policy="drop")
+
+    def test_tracker_is_shared_per_app(self):
+        first = get_rate_limit_tracker("github", "shared-app")
+        self.assertIs(first, get_rate_limit_tracker("github", "shared-app"))
+        self.assertIsNot(first, get_rate_limit_tracker("github", "other-app"))
+        self.assertIn("github:shared-app", rate_limit_stats())
+
+    def test_token_budgets_are_separate_and_bounded(self):
+        limits = TokenRateLimits("github:app", max_tokens=2, max_delay=0)
+        limits.get("exhausted").observe(response(**github_headers(remaining=0, reset_in=600)))
+
+        with self.assertRaises(RateLimitExceeded):
+            limits.get("exhausted").acquire()
+        limits.get("other").acquire()
+
+        limits.get("third")
+        self.assertEqual((len(limits), limits.evictions), (2, 1))
+        self.assertNotIn("exhausted", repr(limits.stats()))
+        self.assertEqual(limits.stats()["rejected"], 0)
+        limits.get("exhausted").acquire()
+
+    def test_token_budgets_are_shared_per_app(self):
+        first = get_token_rate_limits("github", "shared-tokens")
+        self.assertIs(first, get_token_rate_limits("github", "shared-tokens"))
+        self.assertIn("github:shared-tokens:tokens", rate_limit_stats())
+
+
+class TestProviderThrottling(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer().start()
+        self.transport = HTTPTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def test_github_stops_calling_once_budget_is_exhausted(self):
+        reset = str(int(time.time() + 600))
+        self.server.route("GET", "/user", {"id": 1}, headers={
+            "X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset,
+        })
+        provider = GitHub("github-exhausted", "secret", "https://example.com/cb", "user", transport=self.transport)
+        provider.PROFILE_URL = f"{self.server.url}/user"
+
+        self.assertEqual(provider.get_user_profile("token"), {"id": 1})
+        with self.assertRaises(RateLimitExceeded):
+            provider.get_user_profile("token")
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(provider.rate_limit_for("token").stats()["rejected"], 1)
+
+    def test_github_exhausted_token_does_not_block_other_users(self):
+        reset = str(int(time.time() + 600))
+        self.server.route("GET", "/user", {"id": 1}, headers={
+            "X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset,
+        })
+        provider = GitHub("github-per-token", "secret", "https://example.com/cb", "user", transport=self.transport)
+        provider.PROFILE_URL = f"{self.server.url}/user"
+
+        provider.get_user_profile("exhausted")
+        with self.assertRaises(RateLimitExceeded):
+            provider.get_user_profile("exhausted")
+
+        self.server.route("GET", "/user", {"id": 2}, headers={
+            "X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": reset,
+        })
+        self.assertEqual(provider.get_user_profile("other"), {"id": 2})
+        self.assertIsNot(provider.rate_limit_for("other"), provider.rate_limit_for("exhausted"))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_budget_outlives_providers_built_per_request(self):
+        self.server.route("GET", "/me", {"error": "throttled"}, status=429, headers={"Retry-After": "600"})
+
+        def provider():
+            facebook = Facebook("facebook-per-request", "secret", "https://example.com/cb", ["id"], "email",
+                                transport=self.transport)
+            facebook.PROFILE_URL = f"{self.server.url}/me"
+            return facebook
+
+        with self.assertRaises(RateLimitExceeded):
+            provider().get_user_profile("token")
+        gc.collect()
+        with self.assertRaises(RateLimitExceeded):
+            provider().get_user_profile("token")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_providers_without_a_spec_use_the_app_budget(self):
+        class Custom(BaseOAuth2Provider):
+            AUTHORIZE_URL = "https://example.com/authorize"
+
+            def get_access_token(self, code, state=None):
+                return "token"
+
+            def get_user_profile(self, access_token, fields=None):
+                return {}
+
+        provider = Custom("custom-app", "secret", "https://example.com/cb", ["id"], "profile")
+        self.assertIs(provider.rate_limit_for("token"), provider.rate_limit)
+
+    def test_discarded_app_starts_a_new_budget(self):
+        tracker = get_rate_limit_tracker("github", "discarded-app")
+        discard_rate_limits("github", "discarded-app")
+        self.assertIsNot(get_rate_limit_tracker("github", "discarded-app"), tracker)
+
+    def test_facebook_batch_reserves_one_call_per_user(self):
+        self.server.route("POST", "/", [{"code": 200, "body": json.dumps({"id": str(i)})} for i in range(3)])
+        provider = Facebook("facebook-batch", "secret", "https://example.com/cb", ["id"], "email",
+                            transport=self.transport)
+        provider.BATCH_URL = f"{self.server.url}/"
+        provider.rate_limit.remaining, provider.rate_limit.reset_at = 2, time.time() + 600
+
+        results = list(provider.get_user_profiles(["a", "b", "c"]))
+        self.assertTrue(all(isinstance(result.error, RateLimitExceeded) for result in results))
+        self.assertEqual(self.server.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
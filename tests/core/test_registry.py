@@ -0,0 +1,60 @@
+import threading
+import unittest
+
+from omni_authify.core.registry import ProviderRegistry
+from omni_authify.providers.github import GitHub
+
+
+class TestProviderRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ProviderRegistry()
+        self.settings = {
+            'client_id': 'client_id',
+            'client_secret': 'client_secret',
+            'redirect_uri': 'https://example.com/callback',
+            'scope': 'user',
+        }
+
+    def test_reuses_provider_for_same_settings(self):
+        first = self.registry.get('github', self.settings)
+        second = self.registry.get('github', dict(self.settings))
+        self.assertIsInstance(first, GitHub)
+        self.assertIs(first, second)
+
+    def test_changed_settings_build_new_provider(self):
+        first = self.registry.get('github', self.settings)
+        second = self.registry.get('github', {**self.settings, 'scope': 'user,repo'})
+        self.assertIsNot(first, second)
+        self.assertEqual(second.scope, 'user,repo')
+        # ==== The provider built from the previous settings is dropped ====
+        self.assertEqual(len(self.registry), 1)
+        self.assertIs(self.registry.get('github', {**self.settings, 'scope': 'user,repo'}), second)
+
+    def test_invalidate(self):
+        first = self.registry.get('github', self.settings)
+        self.registry.invalidate('facebook')
+        self.assertIs(self.registry.get('github', self.settings), first)
+
+        self.registry.invalidate('github')
+        self.assertEqual(len(self.registry), 0)
+        self.assertIsNot(self.registry.get('github', self.settings), first)
+
+    def test_concurrent_get_builds_one_provider(self):
+        providers = []
+        barrier = threading.Barrier(16)
+
+        def resolve():
+            barrier.wait()
+            providers.append(self.registry.get('github', self.settings))
+
+        threads = [threading.Thread(target=resolve) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(provider) for provider in providers}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
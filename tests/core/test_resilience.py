@@ -0,0 +1,238 @@
+import asyncio
+import socket
+import time
+import unittest
+from urllib.parse import urlsplit
+
+import requests
+
+from omni_authify.core.exceptions import CircuitOpenError, DeadlineExceeded
+from omni_authify.core.resilience import CircuitBreaker, RetryPolicy
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_unsent_requests_are_always_retried(self):
+        policy = RetryPolicy(retries=2)
+        self.assertTrue(policy.retry_error("POST", 0, sent=False))
+        self.assertFalse(policy.retry_error("POST", 0, sent=True))
+        self.assertTrue(policy.retry_error("GET", 1, sent=True))
+        self.assertFalse(policy.retry_error("GET", 2, sent=False))
+
+    def test_transient_status_only_for_idempotent_methods(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.retry_status("GET", 0, 503))
+        self.assertFalse(policy.retry_status("POST", 0, 503))
+        self.assertFalse(policy.retry_status("GET", 0, 500))
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(backoff_factor=0.5, max_backoff=1.0)
+        samples = [policy.backoff(10) for _ in range(200)]
+        self.assertTrue(all(0 <= sample <= 1.0 for sample in samples))
+        self.assertGreater(len(set(samples)), 100)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_threshold_and_recovers_after_probe(self):
+        breaker = CircuitBreaker("api.github.com", failure_threshold=2, recovery_timeout=0.05)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        breaker.before_call()  # the probe
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()  # only one probe at a time
+        breaker.record_success()
+        breaker.before_call()
+        self.assertEqual(breaker.stats(), {"state": "closed", "failures": 0, "opened": 1, "rejected": 2})
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("api.github.com", failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(breaker.opened, 2)
+
+    def test_released_probe_lets_the_next_call_probe(self):
+        breaker = CircuitBreaker("api.github.com", failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.release()
+
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_lost_probe_expires_after_recovery_timeout(self):
+        breaker = CircuitBreaker("api.github.com", failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()  # a probe that never reports back
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+
+class TestResilientTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer().start()
+        self.server.route("GET", "/user", {"id": 1})
+        self.server.route("POST", "/token", {"access_token": "token"})
+        self.transport = HTTPTransport(timeout=(1, 0.3), backoff_factor=0.01, deadline=2)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def test_transient_502_is_retried(self):
+        self.server.fail("GET", "/user", times=2, status=502)
+        response = self.transport.get(f"{self.server.url}/user")
+        self.assertEqual(response.json(), {"id": 1})
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.transport.retries, 2)
+
+    def test_retry_budget_returns_last_response(self):
+        self.server.fail("GET", "/user", times=5, status=503)
+        response = self.transport.get(f"{self.server.url}/user")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_token_exchange_post_is_not_replayed(self):
+        self.server.fail("POST", "/token", times=1, status=502)
+        response = self.transport.post(f"{self.server.url}/token", data={"code": "single-use"})
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_hung_endpoint_is_retried_for_get_only(self):
+        self.server.fail("GET", "/user", times=1, delay=0.6)
+        self.assertEqual(self.transport.get(f"{self.server.url}/user").json(), {"id": 1})
+
+        self.server.fail("POST", "/token", times=1, delay=0.6)
+        with self.assertRaises(requests.ReadTimeout):
+            self.transport.post(f"{self.server.url}/token")
+
+    def test_refused_connection_is_retried_even_for_post(self):
+        transport = HTTPTransport(backoff_factor=0.01, retries=2)
+        with self.assertRaises(requests.ConnectionError):
+            transport.post(f"{closed_port_url()}/token")
+        self.assertEqual(transport.retries, 2)
+
+    def test_deadline_bounds_the_whole_call(self):
+        self.server.fail("GET", "/user", times=10, delay=0.2)
+        transport = HTTPTransport(timeout=5, retries=10, backoff_factor=0.01)
+
+        started = time.perf_counter()
+        with self.assertRaises((requests.ReadTimeout, DeadlineExceeded)):
+            transport.get(f"{self.server.url}/user", deadline=0.5)
+        self.assertLess(time.perf_counter() - started, 0.9)
+
+    def test_open_circuit_fails_fast_without_network(self):
+        transport = HTTPTransport(retries=0, circuit_breaker={"failure_threshold": 2, "recovery_timeout": 60})
+        self.server.fail("GET", "/user", times=10, status=503)
+        for _ in range(2):
+            transport.get(f"{self.server.url}/user")
+
+        with self.assertRaises(CircuitOpenError):
+            transport.get(f"{self.server.url}/user")
+        self.assertEqual(len(self.server.requests), 2)
+        host = self.server.url.split("//")[1]
+        self.assertEqual(transport.stats()["breakers"][host]["state"], "open")
+
+    def test_provider_errors_include_open_circuit(self):
+        transport = HTTPTransport(retries=0, circuit_breaker={"failure_threshold": 1, "recovery_timeout": 60})
+        provider = GitHub("client_id", "client_secret", "https://example.com/cb", "user", transport=transport)
+        provider.PROFILE_URL = f"{self.server.url}/user"
+        self.server.fail("GET", "/user", times=10, status=503)
+
+        self.assertEqual(provider.check_token_scopes("token")["authorized_scopes"], [])
+        self.assertIn("suspended", provider.check_token_scopes("token")["error"])
+
+    def test_scope_check_works_with_transports_without_errors(self):
+        class MinimalTransport:
+            def head(self, url, **kwargs):
+                raise DeadlineExceeded("HEAD did not complete within its deadline")
+
+        provider = GitHub("client_id", "client_secret", "https://example.com/cb", "user", transport=MinimalTransport())
+        scopes = provider.check_token_scopes("token")
+        self.assertEqual(scopes["authorized_scopes"], [])
+        self.assertIn("deadline", scopes["error"])
+
+
+class TestAsyncResilientTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockServer().start()
+        self.server.route("GET", "/user", {"id": 1})
+
+    def tearDown(self):
+        self.server.stop()
+
+    def run_with_transport(self, coroutine_factory, **options):
+        async def main():
+            transport = AsyncHTTPTransport(backoff_factor=0.01, **options)
+            try:
+                return await coroutine_factory(transport), transport
+            finally:
+                await transport.aclose()
+        return asyncio.run(main())
+
+    def test_transient_502_is_retried(self):
+        self.server.fail("GET", "/user", times=2, status=502)
+        response, transport = self.run_with_transport(lambda t: t.get(f"{self.server.url}/user"))
+        self.assertEqual(response.json(), {"id": 1})
+        self.assertEqual(transport.retries, 2)
+
+    def test_open_circuit_fails_fast(self):
+        self.server.fail("GET", "/user", times=10, status=503)
+
+        async def calls(transport):
+            await transport.get(f"{self.server.url}/user")
+            with self.assertRaises(CircuitOpenError):
+                await transport.get(f"{self.server.url}/user")
+
+        self.run_with_transport(calls, retries=0, circuit_breaker={"failure_threshold": 1})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_cancelled_probe_does_not_keep_the_circuit_open(self):
+        self.server.fail("GET", "/user", times=1, status=503)
+
+        async def calls(transport):
+            url = f"{self.server.url}/user"
+            await transport.get(url)
+            await asyncio.sleep(0.06)
+
+            self.server.fail("GET", "/user", times=1, status=200, delay=0.5)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(transport.get(url), 0.1)
+            return await transport.get(url)
+
+        response, transport = self.run_with_transport(
+            calls, retries=0, circuit_breaker={"failure_threshold": 1, "recovery_timeout": 0.05}
+        )
+        self.assertEqual(response.json(), {"id": 1})
+        self.assertEqual(transport.breakers.get(urlsplit(self.server.url).netloc).state, "closed")
+
+
+if __name__ == '__main__':
+    unittest.main()
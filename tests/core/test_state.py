@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from omni_authify.core.exceptions import InvalidStateError
+from omni_authify.core.state import MemoryReplayCache, RedisReplayCache, StateSigner
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = (value, ex)
+        return True
+
+
+class FakeAsyncRedis(FakeRedis):
+    async def set(self, key, value, nx=False, ex=None):
+        return FakeRedis.set(self, key, value, nx, ex)
+
+
+class TestStateSigner(unittest.TestCase):
+
+    def setUp(self):
+        self.signer = StateSigner("secret", replay_cache=MemoryReplayCache())
+
+    def test_issued_state_verifies_once(self):
+        state = self.signer.issue("github")
+        self.signer.verify(state, "github", self.signer.cookie_value(state))
+
+        with self.assertRaisesRegex(InvalidStateError, "already been used"):
+            self.signer.verify(state, "github", self.signer.cookie_value(state))
+
+    def test_states_are_unique_and_url_safe(self):
+        states = {self.signer.issue("github") for _ in range(100)}
+        self.assertEqual(len(states), 100)
+        for state in states:
+            self.assertRegex(state, r"^[0-9a-f]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$")
+
+    def test_rejects_tampered_or_foreign_states(self):
+        state = self.signer.issue("github")
+        other = StateSigner("other-secret", replay_cache=MemoryReplayCache())
+
+        for token, provider in (
+            (state[:-1] + ("A" if state[-1] != "A" else "B"), "github"),
+            (state, "google"),
+            (other.issue("github"), "github"),
+            ("not-a-state", "github"),
+        ):
+            with self.subTest(token=token, provider=provider):
+                with self.assertRaisesRegex(InvalidStateError, "signature"):
+                    self.signer.verify(token, provider)
+
+    def test_rejects_missing_state(self):
+        for token in (None, ""):
+            with self.assertRaisesRegex(InvalidStateError, "Missing"):
+                self.signer.verify(token, "github")
+
+    def test_rejects_expired_state(self):
+        signer = StateSigner("secret", max_age=60, replay_cache=MemoryReplayCache())
+        with patch("omni_authify.core.state.time.time", return_value=time.time() - 61):
+            state = signer.issue("github")
+
+        with self.assertRaisesRegex(InvalidStateError, "Expired"):
+            signer.verify(state, "github", signer.cookie_value(state))
+
+    def test_requires_secret(self):
+        with self.assertRaises(ValueError):
+            StateSigner("")
+
+    def test_from_settings(self):
+        signer = StateSigner.from_settings({"STATE_MAX_AGE": 30}, secret_key="fallback")
+        self.assertEqual(signer.max_age, 30)
+        state = signer.issue("github")
+        StateSigner("fallback").verify(state, "github", signer.cookie_value(state))
+
+    def test_rejects_state_without_its_browser_cookie(self):
+        state = self.signer.issue("github")
+        other = self.signer.issue("github")
+
+        for cookie in (None, "", self.signer.cookie_value(other), StateSigner("other").cookie_value(state)):
+            with self.subTest(cookie=cookie):
+                with self.assertRaisesRegex(InvalidStateError, "browser"):
+                    self.signer.verify(state, "github", cookie)
+        # ==== Rejected before the replay cache, so the rightful browser can still use it ====
+        self.signer.verify(state, "github", self.signer.cookie_value(state))
+
+    def test_bind_sets_a_short_lived_httponly_lax_cookie(self):
+        calls = []
+
+        class Response:
+            def set_cookie(self, *args, **kwargs):
+                calls.append((args, kwargs))
+
+        state = self.signer.issue("github")
+        response = Response()
+        self.assertIs(self.signer.bind(response, state, "github", secure=False), response)
+        self.assertEqual(calls, [(
+            ("omni_authify_state_github", self.signer.cookie_value(state)),
+            {"max_age": 600, "path": "/", "secure": False, "httponly": True, "samesite": "Lax"},
+        )])
+
+    def test_concurrent_replays_accept_exactly_one(self):
+        state = self.signer.issue("github")
+        accepted = []
+
+        def consume():
+            try:
+                self.signer.verify(state, "github", self.signer.cookie_value(state))
+                accepted.append(True)
+            except InvalidStateError:
+                pass
+
+        threads = [threading.Thread(target=consume) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(accepted, [True])
+
+
+class TestReplayCaches(unittest.TestCase):
+
+    def test_memory_cache_expires_and_bounds_entries(self):
+        cache = MemoryReplayCache(max_entries=2)
+        self.assertTrue(cache.add("a", 60))
+        self.assertFalse(cache.add("a", 60))
+        cache.add("b", 60)
+        cache.add("c", 60)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_memory_cache_forgets_expired_nonces(self):
+        cache = MemoryReplayCache()
+        cache.add("a", 60)
+        with patch("omni_authify.core.state.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertTrue(cache.add("a", 60))
+            self.assertEqual(len(cache), 1)
+
+    def test_redis_cache_uses_set_nx(self):
+        client = FakeRedis()
+        cache = RedisReplayCache(client)
+        self.assertTrue(cache.add("nonce", 600))
+        self.assertFalse(cache.add("nonce", 600))
+        self.assertEqual(client.store, {"omni_authify:state:nonce": (1, 600)})
+
+    def test_averify_uses_the_async_replay_cache(self):
+        signer = StateSigner("secret", replay_cache=RedisReplayCache(FakeAsyncRedis()))
+        state = signer.issue("github")
+
+        asyncio.run(signer.averify(state, "github", signer.cookie_value(state)))
+        with self.assertRaisesRegex(InvalidStateError, "already been used"):
+            asyncio.run(signer.averify(state, "github", signer.cookie_value(state)))
+        with self.assertRaisesRegex(InvalidStateError, "signature"):
+            asyncio.run(signer.averify("1.2.3", "github"))
+
+    def test_averify_and_verify_share_the_memory_cache(self):
+        signer = StateSigner("secret", replay_cache=MemoryReplayCache())
+        state = signer.issue("github")
+        asyncio.run(signer.averify(state, "github", signer.cookie_value(state)))
+
+        with self.assertRaisesRegex(InvalidStateError, "already been used"):
+            signer.verify(state, "github", signer.cookie_value(state))
+
+
+if __name__ == '__main__':
+    unittest.main()
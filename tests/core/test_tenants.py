@@ -0,0 +1,144 @@
+import json
+import os
+import tempfile
+import unittest
+
+from omni_authify.core.exceptions import TenantNotFoundError
+from omni_authify.core.ratelimit import get_rate_limit_tracker, rate_limit_stats
+from omni_authify.core.tenants import JSONLinesTenantSource, TenantConfigStore
+from omni_authify.providers import GitHub, Google
+
+
+def tenant_settings(tenant_id):
+    return {
+        "github": {"client_id": f"{tenant_id}-github", "client_secret": "secret",
+                   "redirect_uri": f"https://{tenant_id}.example.com/callback", "scope": "user"},
+        "google": {"client_id": f"{tenant_id}-google", "client_secret": "secret",
+                   "redirect_uri": f"https://{tenant_id}.example.com/callback"},
+    }
+
+
+class CountingSource:
+    def __init__(self, tenants):
+        self.tenants = tenants
+        self.calls = 0
+
+    def __call__(self, tenant_id):
+        self.calls += 1
+        return self.tenants.get(tenant_id)
+
+
+class TestTenantConfigStore(unittest.TestCase):
+    def setUp(self):
+        self.source = CountingSource({f"tenant-{index}": tenant_settings(f"tenant-{index}") for index in range(10)})
+        self.store = TenantConfigStore(self.source, max_tenants=4, max_providers=3,
+                                       defaults={"google": {"scope": "openid email"}})
+
+    def test_settings_are_loaded_once(self):
+        for _ in range(3):
+            settings = self.store.get_settings("tenant-1", "github")
+
+        self.assertEqual(settings["client_id"], "tenant-1-github")
+        self.assertEqual(self.source.calls, 1)
+        self.assertEqual(self.store.stats()["hits"], 2)
+
+    def test_defaults_are_overridden_by_tenant_settings(self):
+        self.assertEqual(self.store.get_settings("tenant-1", "google")["scope"], "openid email")
+
+        self.source.tenants["tenant-1"]["google"]["scope"] = "openid"
+        self.store.invalidate("tenant-1")
+        self.assertEqual(self.store.get_settings("tenant-1", "google")["scope"], "openid")
+
+    def test_providers_are_built_per_tenant_and_reused(self):
+        first = self.store.get_provider("tenant-1", "github")
+
+        self.assertIsInstance(first, GitHub)
+        self.assertEqual(first.client_id, "tenant-1-github")
+        self.assertIs(self.store.get_provider("tenant-1", "github"), first)
+        self.assertIsNot(self.store.get_provider("tenant-2", "github"), first)
+        self.assertIsInstance(self.store.get_provider("tenant-1", "google"), Google)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for index in range(6):
+            self.store.get_provider(f"tenant-{index}", "github")
+
+        stats = self.store.stats()
+        self.assertEqual(stats["tenants"], 4)
+        self.assertEqual(stats["providers"], 3)
+        self.assertEqual(stats["evictions"], 2)
+
+        self.store.get_settings("tenant-0", "github")
+        self.assertEqual(self.source.calls, 7)
+
+    def test_evicted_providers_release_their_rate_limit_budgets(self):
+        for index in range(10):
+            provider = self.store.get_provider(f"tenant-{index}", "github")
+            provider.rate_limit_for("access-token").acquire()
+            self.assertIs(provider.rate_limit, get_rate_limit_tracker("github", f"tenant-{index}-github"))
+
+        tracked = [name for name in rate_limit_stats() if name.startswith("github:tenant-")]
+        self.assertEqual(len(tracked), 2 * self.store.max_providers)
+        self.assertIn("github:tenant-9-github:tokens", tracked)
+        self.assertNotIn("github:tenant-0-github", tracked)
+
+    def test_unknown_tenants_and_providers(self):
+        with self.assertRaises(TenantNotFoundError):
+            self.store.get_provider("missing", "github")
+        with self.assertRaises(TenantNotFoundError):
+            self.store.get_settings("missing", "github")
+        with self.assertRaises(TenantNotFoundError):
+            self.store.get_settings("tenant-1", "facebook")
+
+        # ==== Unknown tenants are cached too, so they do not reach the source on every request ====
+        self.assertEqual(self.source.calls, 2)
+
+    def test_invalidate_rebuilds_the_provider(self):
+        provider = self.store.get_provider("tenant-1", "github")
+        self.source.tenants["tenant-1"]["github"]["client_id"] = "rotated"
+        self.store.invalidate("tenant-1")
+
+        rebuilt = self.store.get_provider("tenant-1", "github")
+        self.assertIsNot(rebuilt, provider)
+        self.assertEqual(rebuilt.client_id, "rotated")
+
+    def test_ttl_reloads_settings(self):
+        store = TenantConfigStore(self.source, ttl=0)
+        store.get_settings("tenant-1", "github")
+        store.get_settings("tenant-1", "github")
+
+        self.assertEqual(self.source.calls, 2)
+
+    def test_mapping_source(self):
+        store = TenantConfigStore({"acme": tenant_settings("acme")})
+
+        self.assertEqual(store.get_provider("acme", "github").client_id, "acme-github")
+
+
+class TestJSONLinesTenantSource(unittest.TestCase):
+    def setUp(self):
+        file = tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False)
+        with file:
+            for tenant_id in ("acme", "globex", "initech"):
+                file.write(json.dumps({"tenant": tenant_id, "providers": tenant_settings(tenant_id)}) + "\n")
+                file.write("\n")
+        self.path = file.name
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_reads_tenants_by_offset(self):
+        source = JSONLinesTenantSource(self.path)
+
+        self.assertEqual(source("globex")["github"]["client_id"], "globex-github")
+        self.assertEqual(source("initech")["google"]["client_id"], "initech-google")
+        self.assertIsNone(source("missing"))
+        self.assertEqual(len(source), 3)
+
+    def test_store_from_file(self):
+        store = TenantConfigStore.from_file(self.path)
+
+        self.assertEqual(store.get_provider("acme", "github").client_id, "acme-github")
+
+
+if __name__ == "__main__":
+    unittest.main()
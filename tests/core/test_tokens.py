@@ -0,0 +1,233 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from omni_authify.core.exceptions import DeadlineExceeded, ProviderError
+from omni_authify.core.tokens import TokenManager, TokenSet
+from omni_authify.providers.github import GitHub
+from omni_authify.providers.google import Google
+from tests.core.test_transport import StubTransport
+
+
+class FakeProvider:
+    """
+    Token endpoint that takes ``delay`` seconds and hands out numbered access tokens.
+    """
+
+    def __init__(self, delay=0.05, rotate=False, error=None):
+        self.delay = delay
+        self.rotate = rotate
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _response(self, refresh_token):
+        with self._lock:
+            self.calls.append(refresh_token)
+            number = len(self.calls)
+        if self.error:
+            raise self.error
+        response = {"access_token": f"access-{number}", "expires_in": 3600}
+        if self.rotate:
+            response["refresh_token"] = f"refresh-{number}"
+        return response
+
+    def get_token_response(self, code):
+        return {"access_token": "access-0", "refresh_token": "refresh-0", "expires_in": 3600}
+
+    def refresh_access_token(self, refresh_token):
+        time.sleep(self.delay)
+        return self._response(refresh_token)
+
+    async def arefresh_access_token(self, refresh_token):
+        await asyncio.sleep(self.delay)
+        return self._response(refresh_token)
+
+
+def expired_tokens(refresh_token="refresh-0"):
+    return TokenSet("access-0", refresh_token, expires_at=time.time() - 1)
+
+
+class TestTokenSet(unittest.TestCase):
+
+    def test_from_response_keeps_previous_refresh_token(self):
+        first = TokenSet.from_response({"access_token": "a", "refresh_token": "r", "expires_in": 60}, now=1000)
+        second = TokenSet.from_response({"access_token": "b", "expires_in": 60}, previous=first, now=2000)
+
+        self.assertEqual((first.expires_at, second.expires_at), (1060, 2060))
+        self.assertEqual(second.refresh_token, "r")
+        self.assertEqual(second.response, {"access_token": "b", "expires_in": 60})
+
+    def test_tokens_without_expiry_never_expire(self):
+        tokens = TokenSet.from_response({"access_token": "a"})
+        self.assertFalse(tokens.expires_within(10 ** 9))
+
+    def test_requires_access_token(self):
+        with self.assertRaises(ProviderError):
+            TokenSet.from_response({"error": "bad_verification_code"})
+
+
+class TestTokenManager(unittest.TestCase):
+
+    def test_exchange_keeps_full_response(self):
+        manager = TokenManager(FakeProvider())
+        tokens = manager.exchange("user-1", "code")
+        self.assertEqual(tokens.refresh_token, "refresh-0")
+        self.assertEqual(manager.get_access_token("user-1"), "access-0")
+        self.assertEqual(manager.refreshes, 0)
+
+    def test_refreshes_proactively_before_expiry(self):
+        provider = FakeProvider(delay=0)
+        manager = TokenManager(provider, refresh_ahead=60)
+        manager.set("user-1", TokenSet("access-0", "refresh-0", expires_at=time.time() + 30))
+
+        self.assertEqual(manager.get_access_token("user-1"), "access-1")
+        self.assertEqual(manager.get("user-1").refresh_token, "refresh-0")
+        self.assertEqual(manager.get_access_token("user-1"), "access-1")
+        self.assertEqual(provider.calls, ["refresh-0"])
+
+    def test_concurrent_threads_share_one_refresh(self):
+        provider = FakeProvider(rotate=True)
+        manager = TokenManager(provider)
+        manager.set("user-1", expired_tokens())
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(manager.get_access_token("user-1")))
+                   for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(provider.calls, ["refresh-0"])
+        self.assertEqual(results, ["access-1"] * 20)
+        self.assertEqual(manager.get("user-1").refresh_token, "refresh-1")
+        stats = manager.stats()
+        self.assertEqual((stats["refreshes"], stats["coalesced"]), (1, 19))
+        self.assertGreaterEqual(stats["latency_max"], 0.05)
+
+    def test_concurrent_tasks_share_one_refresh(self):
+        provider = FakeProvider()
+        manager = TokenManager(provider)
+        manager.set("user-1", expired_tokens())
+
+        async def main():
+            return await asyncio.gather(*(manager.aget_access_token("user-1") for _ in range(20)))
+
+        self.assertEqual(asyncio.run(main()), ["access-1"] * 20)
+        self.assertEqual(provider.calls, ["refresh-0"])
+        self.assertEqual(manager.stats()["coalesced"], 19)
+
+    def test_task_waits_for_refresh_running_in_a_thread(self):
+        provider = FakeProvider(delay=0.2)
+        manager = TokenManager(provider)
+        manager.set("user-1", expired_tokens())
+
+        thread = threading.Thread(target=manager.get_access_token, args=("user-1",))
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(asyncio.run(manager.aget_access_token("user-1")), "access-1")
+        thread.join()
+        self.assertEqual(provider.calls, ["refresh-0"])
+
+    def test_valid_token_is_served_while_refresh_is_in_flight(self):
+        provider = FakeProvider(delay=0.2)
+        manager = TokenManager(provider, refresh_ahead=60)
+        manager.set("user-1", TokenSet("access-0", "refresh-0", expires_at=time.time() + 30))
+
+        thread = threading.Thread(target=manager.get_access_token, args=("user-1",))
+        thread.start()
+        time.sleep(0.05)
+        started = time.perf_counter()
+        self.assertEqual(manager.get_access_token("user-1"), "access-0")
+        self.assertLess(time.perf_counter() - started, 0.1)
+        thread.join()
+
+    def test_refresh_error_reaches_every_waiter(self):
+        provider = FakeProvider(error=ProviderError("invalid_grant"))
+        manager = TokenManager(provider)
+        manager.set("user-1", expired_tokens())
+        errors = []
+
+        def call():
+            try:
+                manager.get_access_token("user-1")
+            except ProviderError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(len(provider.calls), 1)
+        self.assertEqual(manager.refresh_errors, 1)
+
+    def test_cancelled_refresh_task_does_not_strand_thread_callers(self):
+        provider = FakeProvider()
+        manager = TokenManager(provider, wait_timeout=1)
+        manager.set("user-1", expired_tokens())
+
+        async def main():
+            caller = asyncio.ensure_future(manager.aget_access_token("user-1"))
+            await asyncio.sleep(0)
+            # ==== The refresh task is scheduled but has not started: cancel it before its first step ====
+            refresh, = manager._tasks.values()
+            refresh.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await caller
+            return await asyncio.to_thread(manager.get_access_token, "user-1")
+
+        self.assertEqual(asyncio.run(main()), "access-1")
+        self.assertEqual(manager._flights, {})
+        self.assertEqual(provider.calls, ["refresh-0"])
+
+    def test_thread_waiters_time_out(self):
+        provider = FakeProvider(delay=0.3)
+        manager = TokenManager(provider, wait_timeout=0.05)
+        manager.set("user-1", expired_tokens())
+
+        thread = threading.Thread(target=manager.get_access_token, args=("user-1",))
+        thread.start()
+        time.sleep(0.05)
+        with self.assertRaises(DeadlineExceeded):
+            manager.get_access_token("user-1")
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(manager.aget_access_token("user-1"))
+        thread.join()
+        self.assertEqual(manager.get_access_token("user-1"), "access-1")
+
+    def test_expired_grant_without_refresh_token(self):
+        manager = TokenManager(FakeProvider())
+        manager.set("user-1", expired_tokens(refresh_token=None))
+        with self.assertRaisesRegex(ProviderError, "no refresh_token"):
+            manager.get_access_token("user-1")
+
+
+class TestProviderRefresh(unittest.TestCase):
+
+    def test_google_refresh_request(self):
+        transport = StubTransport({"access_token": "new", "expires_in": 3599})
+        provider = Google("client_id", "client_secret", "https://example.com/callback", "openid", transport)
+
+        self.assertEqual(provider.refresh_access_token("refresh")["access_token"], "new")
+        method, url, kwargs = transport.calls[0]
+        self.assertEqual((method, url), ("POST", provider.TOKEN_URL))
+        self.assertEqual(kwargs["data"]["grant_type"], "refresh_token")
+        self.assertEqual(kwargs["data"]["refresh_token"], "refresh")
+
+    def test_github_token_error_body_raises(self):
+        transport = StubTransport({"error": "bad_refresh_token", "error_description": "The refresh token is invalid"})
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "user", transport)
+
+        with self.assertRaisesRegex(ProviderError, "refresh token is invalid"):
+            provider.refresh_access_token("refresh")
+        with self.assertRaises(ProviderError):
+            provider.get_access_token("code")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import time
+import unittest
+
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport, get_default_transport
+from omni_authify.providers.facebook import Facebook
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+
+class StubResponse:
+    status_code = 200
+
+    def __init__(self, payload, headers=None):
+        self.payload = payload
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+    @property
+    def content(self):
+        return json.dumps(self.payload).encode()
+
+
+class StubTransport:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return StubResponse(self.payload)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+class TestHTTPTransport(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer().start()
+        self.server.route("GET", "/user", {"id": 1, "login": "octocat"})
+        self.transport = HTTPTransport(pool_maxsize=2, timeout=2)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def test_reuses_keep_alive_connection(self):
+        for _ in range(5):
+            response = self.transport.get(f"{self.server.url}/user")
+            self.assertEqual(response.json()["login"], "octocat")
+
+        # ==== One connection served all five requests ====
+        self.assertEqual(self.server.connections, 1)
+
+    def wait_warmed(self, transport, count=1):
+        for _ in range(200):
+            if transport.warmed + transport.warm_failed >= count:
+                return
+            time.sleep(0.01)
+        self.fail("prewarm did not complete")
+
+    def test_prewarm_opens_the_connection_the_request_uses(self):
+        self.transport.prewarm(f"{self.server.url}/user", f"{self.server.url}/user")
+        self.wait_warmed(self.transport)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.requests, [])
+
+        self.transport.get(f"{self.server.url}/user")
+        # ==== The request went over the pre-opened connection, and counted as a hit ====
+        self.assertEqual(self.server.connections, 1)
+        warm = self.transport.stats()["warm"]
+        self.assertEqual((warm["warmed"], warm["hits"], warm["expired"]), (1, 1, 0))
+        self.assertEqual(warm["hit_ratio"], 1.0)
+
+    def test_unused_warm_ups_expire(self):
+        transport = HTTPTransport(warm_connections=2, warm_window=0.05)
+        try:
+            transport.prewarm(f"{self.server.url}/token")
+            transport.prewarm(f"{self.server.url}/user")
+            transport.prewarm(f"{self.server.url}/user")
+            self.wait_warmed(transport, 2)
+            time.sleep(0.1)
+            warm = transport.stats()["warm"]
+        finally:
+            transport.close()
+        self.assertEqual((warm["warmed"], warm["hits"], warm["expired"]), (2, 0, 2))
+        self.assertEqual(warm["hit_ratio"], 0.0)
+
+    def test_request_over_another_connection_is_not_a_hit(self):
+        url = f"{self.server.url}/user"
+        self.transport.prewarm(url)
+        self.wait_warmed(self.transport)
+        # ==== Drop the pre-opened connection so the request has to open its own ====
+        self.transport.session.get_adapter(url).poolmanager.clear()
+
+        self.transport.get(url)
+        self.assertEqual(self.server.connections, 2)
+        warm = self.transport.stats()["warm"]
+        self.assertEqual((warm["warmed"], warm["hits"], warm["expired"]), (1, 0, 0))
+
+    def test_prewarm_is_skipped_without_urllib3_2(self):
+        self.transport.prewarm_supported = False
+        self.transport.prewarm(f"{self.server.url}/user")
+        self.assertEqual(self.transport.stats()["warm"]["warmed"], 0)
+        self.assertEqual(self.server.connections, 0)
+
+    def test_failed_warm_up_is_not_counted_as_pending(self):
+        with self.assertLogs("omni_authify.core.transport", "WARNING") as logs:
+            self.transport.prewarm("http://127.0.0.1:9/user")
+            self.wait_warmed(self.transport)
+        self.assertIn("127.0.0.1:9", logs.output[0])
+        warm = self.transport.stats()["warm"]
+        self.assertEqual((warm["warmed"], warm["failed"], warm["hit_ratio"]), (0, 1, None))
+
+    def test_authorization_url_prewarms_token_and_profile_hosts(self):
+        transport = StubTransport({})
+        transport.prewarm = lambda *urls: transport.calls.append(("PREWARM", urls, {}))
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "user", transport=transport)
+
+        provider.get_authorization_url(state="state")
+        self.assertEqual(transport.calls, [])
+
+        provider.prewarm = True
+        provider.get_authorization_url(state="state")
+        self.assertEqual(transport.calls, [("PREWARM", (GitHub.TOKEN_URL, GitHub.PROFILE_URL), {})])
+
+    def test_default_transport_is_shared(self):
+        first = GitHub("client_id", "client_secret", "https://example.com/callback", "user")
+        second = GitHub("client_id", "client_secret", "https://example.com/callback", "user")
+        self.assertIs(first.transport, get_default_transport())
+        self.assertIs(first.transport, second.transport)
+
+    def test_injected_transport(self):
+        transport = StubTransport({"access_token": "test_access_token"})
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "user", transport=transport)
+
+        self.assertEqual(provider.get_access_token("test_code"), "test_access_token")
+        method, url, kwargs = transport.calls[0]
+        self.assertEqual((method, url), ("POST", GitHub.TOKEN_URL))
+        self.assertEqual(kwargs["data"]["code"], "test_code")
+
+
+class TestAsyncHTTPTransport(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(latency=0.05).start()
+        self.server.route("POST", "/login/oauth/access_token", {"access_token": "test_access_token"})
+        self.server.route("GET", "/user", {"id": 1, "login": "octocat"}, headers={"X-OAuth-Scopes": "user, repo"})
+        self.server.route("GET", "/me", {"id": "1", "name": "Test User"})
+
+    def tearDown(self):
+        self.server.stop()
+
+    def make_github(self, transport):
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "user", async_transport=transport)
+        provider.TOKEN_URL = f"{self.server.url}/login/oauth/access_token"
+        provider.PROFILE_URL = f"{self.server.url}/user"
+        return provider
+
+    def test_github_async_flow(self):
+        async def run():
+            transport = AsyncHTTPTransport()
+            provider = self.make_github(transport)
+            access_token = await provider.aget_access_token("test_code")
+            profile = await provider.aget_user_profile(access_token)
+            scopes = await provider.acheck_token_scopes(access_token)
+            await transport.aclose()
+            return access_token, profile, scopes
+
+        access_token, profile, scopes = asyncio.run(run())
+        self.assertEqual(access_token, "test_access_token")
+        self.assertEqual(profile["login"], "octocat")
+        self.assertEqual(scopes["authorized_scopes"], ["user", "repo"])
+
+    def test_concurrent_calls_do_not_serialize(self):
+        async def run():
+            transport = AsyncHTTPTransport()
+            provider = Facebook("client_id", "client_secret", "https://example.com/callback", "id", "email",
+                                async_transport=transport)
+            provider.PROFILE_URL = f"{self.server.url}/me"
+            started = loop.time()
+            profiles = await asyncio.gather(*(provider.aget_user_profile("token") for _ in range(10)))
+            elapsed = loop.time() - started
+            await transport.aclose()
+            return profiles, elapsed
+
+        loop = asyncio.new_event_loop()
+        profiles, elapsed = loop.run_until_complete(run())
+        loop.close()
+        self.assertEqual(len(profiles), 10)
+        # ==== Ten 50ms responses served concurrently, well under the 500ms a serial path would need ====
+        self.assertLess(elapsed, 0.3)
+
+    def test_connections_are_split_over_pool_shards(self):
+        async def run():
+            transport = AsyncHTTPTransport(max_connections=10, max_keepalive_connections=4, pool_shards=4)
+            await asyncio.gather(*(transport.get(f"{self.server.url}/me") for _ in range(8)))
+            await transport.aclose()
+            return transport
+
+        transport = asyncio.run(run())
+        self.assertEqual(len(transport.clients), 4)
+        self.assertTrue(all(client.is_closed for client in transport.clients))
+        # ==== Eight requests used in turn: every shard opened connections of its own ====
+        self.assertGreaterEqual(self.server.connections, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
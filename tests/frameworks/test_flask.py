@@ -0,0 +1,120 @@
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from tests.mock_oauth import PROFILES, MockOAuthServer
+
+PROVIDERS = {
+    'github': {
+        'client_id': 'client_id',
+        'client_secret': 'client_secret',
+        'redirect_uri': 'https://example.com/callback',
+        'scope': 'read:user user:email',
+    },
+}
+
+
+def make_app():
+    from flask import Flask
+    from omni_authify.frameworks.flask import OmniAuthifyFlask
+
+    app = Flask(__name__)
+    app.config['OMNI_AUTHIFY'] = {'SECRET_KEY': 'flask-secret', 'PROVIDERS': PROVIDERS, 'TRANSPORT': {'retries': 0}}
+    auth = OmniAuthifyFlask(app)
+
+    @app.get('/<provider_name>/login')
+    def login(provider_name):
+        return auth.login(provider_name)
+
+    @app.get('/<provider_name>/callback')
+    def callback(provider_name):
+        return auth.callback(provider_name)
+
+    return app, auth
+
+
+class TestFlaskExtension(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import flask  # noqa: F401
+        except ImportError:
+            raise unittest.SkipTest("Flask is not installed")
+
+    def setUp(self):
+        self.app, self.auth = make_app()
+        self.client = self.app.test_client()
+        self.server = MockOAuthServer('github', strict=True).start()
+        self.addCleanup(self.server.stop)
+        with self.app.app_context():
+            self.provider = self.server.attach(self.auth.provider('github'))
+        self.addCleanup(self.provider.transport.close)
+
+    def test_login_and_callback(self):
+        location = self.client.get('/github/login').headers['Location']
+        query = self.server.consent(location)
+
+        response = self.client.get('/github/callback', query_string=query)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['email'], PROFILES['github']['email'])
+
+        replay = self.client.get('/github/callback', query_string=query)
+        self.assertEqual(replay.status_code, 400)
+
+    def test_callback_from_another_browser_is_rejected(self):
+        location = self.client.get('/github/login').headers['Location']
+        query = self.server.consent(location)
+
+        victim = self.app.test_client()
+        response = victim.get('/github/callback', query_string=query)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('browser', response.get_json()['message'])
+
+    def test_providers_and_transport_are_bound_to_the_app(self):
+        with self.app.app_context():
+            provider = self.auth.provider('github')
+        self.assertIs(provider, self.provider)
+        self.assertIs(provider.transport, self.app.extensions['omni_authify'].transport)
+
+        other, other_auth = make_app()
+        with other.app_context():
+            other_provider = other_auth.provider('github')
+        self.addCleanup(other_provider.transport.close)
+        self.assertIsNot(other_provider, provider)
+        self.assertIsNot(other_provider.transport, provider.transport)
+
+    def test_callback_errors(self):
+        self.assertEqual(self.client.get('/github/callback', query_string={'error': 'access_denied'}).status_code, 400)
+        self.assertEqual(self.client.get('/github/callback', query_string={'state': '1.2.3'}).status_code, 400)
+
+        location = self.client.get('/github/login').headers['Location']
+        state = parse_qs(urlparse(location).query)['state'][0]
+        response = self.client.get('/github/callback', query_string={'state': state, 'code': 'forged'})
+        self.assertEqual(response.status_code, 500)
+
+    def test_app_factory(self):
+        from flask import Flask
+        from omni_authify.frameworks.flask import OmniAuthifyFlask
+
+        auth = OmniAuthifyFlask()
+        app = Flask(__name__)
+        app.config['OMNI_AUTHIFY'] = {'SECRET_KEY': 'flask-secret', 'PROVIDERS': PROVIDERS}
+        auth.init_app(app)
+
+        with app.test_request_context():
+            self.assertEqual(auth.login('github').status_code, 302)
+            self.addCleanup(auth.provider('github').transport.close)
+
+    def test_missing_secret_key_is_an_integration_error(self):
+        from flask import Flask
+        from omni_authify.core.exceptions import IntegrationError
+        from omni_authify.frameworks.flask import OmniAuthifyFlask
+
+        app = Flask(__name__)
+        app.config['OMNI_AUTHIFY'] = {'PROVIDERS': PROVIDERS}
+        with self.assertRaises(IntegrationError):
+            OmniAuthifyFlask(app)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,240 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from omni_authify.core.exceptions import IntegrationError
+
+PROVIDERS = {
+    'github': {
+        'client_id': 'client_id',
+        'client_secret': 'client_secret',
+        'redirect_uri': 'https://example.com/callback',
+        'scope': 'read:user',
+    },
+}
+
+# ==== Empty URLconf for django.shortcuts.redirect ====
+urlpatterns = []
+
+
+def state_of(url):
+    return parse_qs(urlparse(url).query)['state'][0]
+
+
+class TestDjangoState(unittest.TestCase):
+    OK = ({'id': 1}, 200)
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import django
+            from django.conf import settings
+        except ImportError:
+            raise unittest.SkipTest("Django is not installed")
+        if not settings.configured:
+            settings.configure(
+                SECRET_KEY='django-secret',
+                INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes'],
+                ROOT_URLCONF=__name__,
+                OMNI_AUTHIFY={'PROVIDERS': PROVIDERS},
+            )
+            django.setup()
+
+    def setUp(self):
+        from django.test import RequestFactory
+        from omni_authify.frameworks.django import OmniAuthifyDjango
+
+        self.factory = RequestFactory()
+        self.auth = OmniAuthifyDjango('github')
+
+    def login(self):
+        response = self.auth.login()
+        return state_of(response['Location']), response.cookies[self.auth.states.cookie_name('github')]
+
+    def alogin(self):
+        response = asyncio.run(self.auth.alogin())
+        return state_of(response['Location']), response.cookies[self.auth.states.cookie_name('github')]
+
+    def request(self, state, cookie):
+        request = self.factory.get('/callback', {'code': 'code', 'state': state})
+        if cookie is not None:
+            request.COOKIES[cookie.key] = cookie.value
+        return request
+
+    def callback(self, state, cookie=None):
+        request = self.request(state, cookie)
+        with patch.object(self.auth.provider, 'get_user_info', return_value={'id': 1}):
+            return self.auth.callback(request)
+
+    def test_login_state_is_accepted_once(self):
+        state, cookie = self.login()
+
+        self.assertEqual(self.callback(state, cookie), self.OK)
+        replay = self.callback(state, cookie)
+        self.assertEqual(replay['status'], 400)
+
+    def test_state_cookie_is_httponly_and_lax(self):
+        state, cookie = self.login()
+
+        self.assertTrue(cookie['httponly'])
+        self.assertEqual(cookie['samesite'], 'Lax')
+        self.assertTrue(cookie['secure'])
+        self.assertEqual(cookie['max-age'], self.auth.states.max_age)
+
+    def test_state_without_its_cookie_is_rejected(self):
+        # ==== Login CSRF: the attacker's state and code, replayed in a browser that never started that login ====
+        attacker_state, attacker_cookie = self.login()
+        victim_state, victim_cookie = self.login()
+
+        self.assertEqual(self.callback(attacker_state)['status'], 400)
+        mixed = self.callback(attacker_state, victim_cookie)
+        self.assertEqual(mixed['status'], 400)
+        self.assertIn('browser', mixed['message'])
+
+        # ==== The rejected attempts did not consume the state ====
+        self.assertEqual(self.callback(attacker_state, attacker_cookie), self.OK)
+
+    def test_forged_state_is_rejected(self):
+        result = self.callback('1.2.3')
+        self.assertEqual(result['status'], 400)
+        self.assertIn('signature', result['message'])
+
+    def acallback(self, state, cookie=None):
+        request = self.request(state, cookie)
+
+        async def aget_user_info(code, fields, state=None):
+            return {'id': 1}
+
+        with patch.object(self.auth.provider, 'aget_user_info', aget_user_info):
+            return asyncio.run(self.auth.acallback(request))
+
+    def test_async_login_state_is_accepted_once(self):
+        state, cookie = self.alogin()
+
+        self.assertEqual(self.acallback(state)['status'], 400)
+        self.assertEqual(self.acallback(state, cookie), self.OK)
+        self.assertEqual(self.acallback(state, cookie)['status'], 400)
+        self.assertEqual(self.callback(state, cookie)['status'], 400)
+
+
+class TestDRFState(TestDjangoState):
+    OK = {'id': 1}
+
+    def setUp(self):
+        try:
+            import rest_framework  # noqa: F401
+        except ImportError:
+            raise unittest.SkipTest("Django REST framework is not installed")
+        from django.test import RequestFactory
+        from omni_authify.frameworks.drf import OmniAuthifyDRF
+
+        self.factory = RequestFactory()
+        self.auth = OmniAuthifyDRF('github')
+
+    def login(self):
+        response = self.auth.login()
+        return state_of(response.data['auth_url']), response.cookies[self.auth.states.cookie_name('github')]
+
+    def alogin(self):
+        response = asyncio.run(self.auth.alogin())
+        return state_of(response.data['auth_url']), response.cookies[self.auth.states.cookie_name('github')]
+
+    def callback(self, state, cookie=None):
+        request = self.request(state, cookie)
+        with patch.object(self.auth.provider, 'get_user_info', return_value={'id': 1}):
+            return self.auth.get_user_info(request, 'code')
+
+    def acallback(self, state, cookie=None):
+        request = self.request(state, cookie)
+
+        async def aget_user_info(code, fields, state=None):
+            return {'id': 1}
+
+        with patch.object(self.auth.provider, 'aget_user_info', aget_user_info):
+            return asyncio.run(self.auth.aget_user_info(request, 'code'))
+
+    def test_auth_url_binds_the_given_response(self):
+        from rest_framework.response import Response
+
+        response = Response()
+        state = state_of(self.auth.get_auth_url(response=response))
+        cookie = response.cookies[self.auth.states.cookie_name('github')]
+
+        self.assertEqual(self.callback(state, cookie), self.OK)
+        with self.assertRaises(IntegrationError):
+            self.auth.get_auth_url()
+
+
+class TestFastAPIState(unittest.TestCase):
+
+    def setUp(self):
+        try:
+            import fastapi  # noqa: F401
+        except ImportError:
+            raise unittest.SkipTest("FastAPI is not installed")
+        from omni_authify.core.utils import get_settings
+
+        settings = get_settings()
+        patcher = patch.dict(settings, {'SECRET_KEY': 'fastapi-secret', 'PROVIDERS': PROVIDERS})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        from omni_authify.frameworks.fastapi import OmniAuthifyFastAPI
+        self.auth = OmniAuthifyFastAPI('github')
+
+    def get_user_info(self, state, cookie=None):
+        cookies = {self.auth.states.cookie_name('github'): cookie} if cookie else {}
+        request = SimpleNamespace(query_params={'code': 'code', 'state': state}, cookies=cookies)
+
+        async def aget_user_info(code, fields, state=None):
+            return {'id': 1}
+
+        with patch.object(self.auth.provider, 'aget_user_info', aget_user_info):
+            return asyncio.run(self.auth.get_user_info(request, 'code'))
+
+    def cookie_of(self, response):
+        name = self.auth.states.cookie_name('github')
+        header = next(value for value in response.headers.getlist('set-cookie') if value.startswith(name + '='))
+        self.assertIn('httponly', header.lower())
+        self.assertIn('samesite=lax', header.lower())
+        return header.split(';')[0].split('=', 1)[1]
+
+    def test_auth_url_state_is_accepted_once(self):
+        from fastapi import Response
+
+        response = Response()
+        state = state_of(self.auth.get_auth_url(response=response))
+        cookie = self.cookie_of(response)
+
+        self.assertEqual(self.get_user_info(state, cookie), {'id': 1})
+        self.assertEqual(self.get_user_info(state, cookie)['status'], 400)
+
+    def test_login_redirect_sets_the_state_cookie(self):
+        response = self.auth.login()
+        state = state_of(response.headers['location'])
+
+        self.assertEqual(self.get_user_info(state)['status'], 400)
+        self.assertEqual(self.get_user_info(state, self.cookie_of(response)), {'id': 1})
+
+    def test_auth_url_without_response_is_an_integration_error(self):
+        with self.assertRaises(IntegrationError):
+            self.auth.get_auth_url()
+
+    def test_missing_secret_key_falls_back_to_a_process_key_with_a_warning(self):
+        from omni_authify.core.utils import get_settings
+        from omni_authify.frameworks import fastapi
+
+        with patch.dict(get_settings(), {'SECRET_KEY': None}), patch.object(fastapi, '_process_secret_key', None):
+            with self.assertWarnsRegex(RuntimeWarning, 'OMNI_AUTHIFY_SECRET_KEY'):
+                first = fastapi.OmniAuthifyFastAPI('github')
+            second = fastapi.OmniAuthifyFastAPI('github')
+
+        response = second.login()
+        state = state_of(response.headers['location'])
+        first.states.verify(state, 'github', second.states.cookie_value(state))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+import json
+import secrets
+import time
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from omni_authify.providers import Facebook, GitHub, Google, LinkedIn
+from tests.mock_server import MockServer
+
+PROFILES = {
+    "github": {"id": 1, "login": "octocat", "name": "The Octocat", "email": "octocat@github.com"},
+    "google": {"id": "1234567890", "email": "test@example.com", "verified_email": True, "name": "Test User"},
+    "facebook": {"id": "1234567890", "name": "Test User", "email": "test@example.com",
+                 "picture": {"data": {"url": "https://example.com/picture.jpg"}}},
+    "linkedin": {"sub": "1234567890", "name": "Test User", "email": "test@example.com", "email_verified": True},
+}
+
+PROVIDER_CLASSES = {"github": GitHub, "google": Google, "facebook": Facebook, "linkedin": LinkedIn}
+
+
+class MockOAuthServer(MockServer):
+    """
+    Local OAuth2/OpenID Connect provider serving the authorize, token, userinfo and JWKS endpoints of GitHub,
+    Google, Facebook or LinkedIn on the paths of the real ones; ``attach`` points a provider instance at it.
+
+    The authorize endpoint redirects back with a code, the token endpoint answers the provider's token response,
+    with an id_token signed by the JWKS key for Google and LinkedIn, and the userinfo endpoint answers the profile.
+    Google and LinkedIn also serve their discovery document, pointing at this server.
+    In ``strict`` mode codes must come from the authorize endpoint and are single use, and access tokens must come
+    from the token endpoint; otherwise any code and token are accepted, so benchmarks can skip the authorize step.
+
+    ``latency`` delays every response and ``fail_endpoint`` injects errors or hangs, as in ``MockServer``.
+    """
+
+    def __init__(self, provider_name, latency=0.0, strict=False, profile=None):
+        super().__init__(latency=latency)
+        self.provider_name = provider_name
+        self.provider_class = PROVIDER_CLASSES[provider_name]
+        self.strict = strict
+        self.profile = dict(profile or PROFILES[provider_name])
+        self.codes = {}
+        self.access_tokens = set()
+        self.refresh_tokens = set()
+
+        self.paths = {
+            "authorize": urlsplit(self.provider_class.AUTHORIZE_URL).path,
+            "token": urlsplit(self.provider_class.TOKEN_URL).path,
+            "userinfo": urlsplit(self.provider_class.PROFILE_URL).path,
+        }
+        self.methods = {"authorize": "GET", "token": "GET" if provider_name == "facebook" else "POST",
+                        "userinfo": "GET", "jwks": "GET", "emails": "GET", "discovery": "GET"}
+
+        self.routes[("GET", self.paths["authorize"])] = self._authorize
+        self.routes[(self.methods["token"], self.paths["token"])] = self._token
+        self.routes[("GET", self.paths["userinfo"])] = self._userinfo
+
+        self.issuer = None
+        self._signing_key = None
+        self._id_tokens = {}
+        if hasattr(self.provider_class, "JWKI_URL"):
+            self.issuer = self.provider_class.ISSUERS[0]
+            self.paths["jwks"] = urlsplit(self.provider_class.JWKI_URL).path
+            self.routes[("GET", self.paths["jwks"])] = self._jwks
+            self.paths["discovery"] = urlsplit(self.provider_class.DISCOVERY_URL).path
+            self.routes[("GET", self.paths["discovery"])] = self._discovery
+        if provider_name == "github":
+            self.paths["emails"] = urlsplit(GitHub.EMAILS_URL).path
+            self.route("GET", self.paths["emails"], [{"email": self.profile["email"], "primary": True,
+                                                      "verified": True}])
+
+    def url_for(self, endpoint):
+        return f"{self.url}{self.paths[endpoint]}"
+
+    def attach(self, provider):
+        """
+        Point ``provider`` at this server instead of the real provider, and return it.
+        """
+        provider.AUTHORIZE_URL = self.url_for("authorize")
+        provider.TOKEN_URL = self.url_for("token")
+        provider.PROFILE_URL = self.url_for("userinfo")
+        if "jwks" in self.paths:
+            provider.JWKI_URL = self.url_for("jwks")
+        if "emails" in self.paths:
+            provider.EMAILS_URL = self.url_for("emails")
+        return provider
+
+    def fail_endpoint(self, endpoint, times=1, status=502, delay=0.0):
+        """
+        Inject failures in front of ``endpoint`` (``authorize``, ``token``, ``userinfo``, ``jwks``, ``emails`` or
+        ``discovery``).
+        """
+        self.fail(self.methods[endpoint], self.paths[endpoint], times=times, status=status, delay=delay)
+
+    def consent(self, authorization_url):
+        """
+        Play the user approving the consent screen: follow ``authorization_url`` and return the query of the
+        redirect back to the application (``code`` and ``state``).
+        """
+        import requests
+
+        response = requests.get(authorization_url, allow_redirects=False, timeout=5)
+        location = response.headers["Location"]
+        return {key: values[0] for key, values in parse_qs(urlsplit(location).query).items()}
+
+    # ======== Endpoints ========
+    def _authorize(self, request):
+        query = _query(request)
+        if "client_id" not in query or "redirect_uri" not in query:
+            return 400, {}, {"error": "invalid_request"}
+
+        code = secrets.token_urlsafe(16)
+        with self._lock:
+            self.codes[code] = query
+        callback = {"code": code, **({"state": query["state"]} if "state" in query else {})}
+        return 302, {"Location": f"{query['redirect_uri']}?{urlencode(callback)}"}, b""
+
+    def _token(self, request):
+        params = _query(request) if request.command == "GET" else _form(request)
+        client_id = params.get("client_id", "client_id")
+
+        if params.get("grant_type") == "refresh_token":
+            with self._lock:
+                known = params.get("refresh_token") in self.refresh_tokens
+            if self.strict and not known:
+                return 400, {}, {"error": "invalid_grant"}
+            scope = ""
+        else:
+            with self._lock:
+                grant = self.codes.pop(params.get("code"), None)
+            if self.strict and grant is None:
+                return 400, {}, {"error": "invalid_grant", "error_description": "Unknown or reused code"}
+            scope = (grant or {}).get("scope", "openid email profile")
+
+        access_token, refresh_token = secrets.token_urlsafe(24), secrets.token_urlsafe(24)
+        if self.strict:
+            with self._lock:
+                self.access_tokens.add(access_token)
+                self.refresh_tokens.add(refresh_token)
+
+        body = {"access_token": access_token, "token_type": "bearer", "expires_in": 3600}
+        if self.provider_name != "facebook":
+            body.update(refresh_token=refresh_token, scope=scope)
+        if self.issuer and "openid" in scope.replace(",", " ").split():
+            body["id_token"] = self._id_token(client_id)
+        return 200, {}, body
+
+    def _userinfo(self, request):
+        authorization = request.headers.get("Authorization", "")
+        access_token = authorization[7:] if authorization.startswith("Bearer ") else _query(request).get("access_token")
+        if self.strict:
+            with self._lock:
+                known = access_token in self.access_tokens
+            if not known:
+                return 401, {}, {"error": "invalid_token"}
+
+        profile = self.profile
+        fields = _query(request).get("fields")
+        if fields:
+            profile = {key: value for key, value in profile.items() if key in fields.split(",")}
+        headers = {"X-OAuth-Scopes": "read:user, user:email"} if self.provider_name == "github" else {}
+        return 200, headers, profile
+
+    def _discovery(self, request):
+        """
+        The provider's discovery document, naming this server as the issuer and for every endpoint.
+        """
+        issuer = self.url_for("discovery")[:-len("/.well-known/openid-configuration")]
+        return 200, {"Cache-Control": "public, max-age=3600"}, {
+            "issuer": issuer,
+            "authorization_endpoint": self.url_for("authorize"),
+            "token_endpoint": self.url_for("token"),
+            "userinfo_endpoint": self.url_for("userinfo"),
+            "jwks_uri": self.url_for("jwks"),
+        }
+
+    def _jwks(self, request):
+        _, jwk = self._key()
+        return 200, {"Cache-Control": "public, max-age=3600"}, {"keys": [jwk]}
+
+    # ======== id_token signing ========
+    def _key(self):
+        if self._signing_key is not None:
+            return self._signing_key
+        with self._lock:
+            if self._signing_key is None:
+                self._signing_key = self._generate_key()
+        return self._signing_key
+
+    def _generate_key(self):
+        import jwt
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+        jwk.update({"kid": f"{self.provider_name}-key", "use": "sig", "alg": "RS256"})
+        return private_key, jwk
+
+    def _id_token(self, audience):
+        if self.strict:
+            return self.make_id_token(audience)
+        # ==== Outside strict mode one token per client is reused, so RSA signing stays out of the benchmarks ====
+        id_token = self._id_tokens.get(audience)
+        if id_token is None:
+            id_token = self._id_tokens[audience] = self.make_id_token(audience)
+        return id_token
+
+    def make_id_token(self, audience="client_id", **claims):
+        import jwt
+
+        private_key, jwk = self._key()
+        now = int(time.time())
+        subject = self.profile.get("sub") or str(self.profile.get("id"))
+        payload = {
+            "iss": self.issuer, "aud": audience, "sub": subject, "iat": now, "exp": now + 3600,
+            "email": self.profile.get("email"), "name": self.profile.get("name"), **claims,
+        }
+        return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": jwk["kid"]})
+
+
+def _query(request):
+    return {key: values[0] for key, values in parse_qs(urlsplit(request.path).query).items()}
+
+
+def _form(request):
+    if request.headers.get("Content-Type", "").startswith("application/json"):
+        return json.loads(request.body or b"{}")
+    return {key: values[0] for key, values in parse_qs(request.body.decode()).items()}
@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class MockServer:
+    """
+    Local HTTP/1.1 keep-alive server used by tests and benchmarks in place of real provider endpoints.
+
+    Routes map ``(method, path)`` to a handler ``handler(request) -> (status, headers, body)``, where ``body`` is a
+    ``dict`` (sent as JSON), ``str`` or ``bytes``. ``latency`` delays every response by that many seconds,
+    ``handshake`` delays the first response of every connection (standing in for DNS and TLS set-up), and ``fail``
+    injects errors or hangs in front of a route.
+    """
+
+    def __init__(self, routes=None, latency=0.0, handshake=0.0):
+        self.routes = dict(routes or {})
+        self.latency = latency
+        self.handshake = handshake
+        self.connections = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def route(self, method, path, body=None, status=200, headers=None):
+        """
+        Register a static JSON response for ``method`` and ``path``.
+        """
+        self.routes[(method, path)] = lambda request: (status, headers or {}, body if body is not None else {})
+
+    def fail(self, method, path, times=1, status=502, delay=0.0):
+        """
+        Inject failures in front of the route for ``method`` and ``path``: its next ``times`` requests answer
+        ``status`` after ``delay`` seconds (a hung endpoint when ``delay`` exceeds the client timeout), later ones
+        reach the route as usual.
+        """
+        handler = self.routes.get((method, path))
+        remaining = [times]
+
+        def failing(request):
+            with self._lock:
+                failing_now = remaining[0] > 0
+                remaining[0] -= 1
+            if not failing_now:
+                return handler(request) if handler else (404, {}, {"error": "not_found"})
+            if delay:
+                time.sleep(delay)
+            return status, {}, {"error": "injected_failure"}
+
+        self.routes[(method, path)] = failing
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # ==== Headers and body go out in one segment, otherwise delayed ACKs stall keep-alive clients ====
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+                if server.handshake:
+                    time.sleep(server.handshake)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.body = self.rfile.read(length) if length else b""
+                self.path_only = urlsplit(self.path).path
+                with server._lock:
+                    server.requests.append((self.command, self.path))
+
+                handler = server.routes.get((self.command, self.path_only))
+                if handler is None and self.command == "HEAD":
+                    handler = server.routes.get(("GET", self.path_only))
+                if handler is None:
+                    status, headers, body = 404, {}, {"error": "not_found"}
+                else:
+                    status, headers, body = handler(self)
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode()
+                    headers = {"Content-Type": "application/json", **headers}
+                elif isinstance(body, str):
+                    body = body.encode()
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            do_GET = do_POST = do_HEAD = _handle
+
+        return Handler
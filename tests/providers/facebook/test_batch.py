@@ -0,0 +1,65 @@
+import json
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+from omni_authify.core.exceptions import ProviderError
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.facebook import Facebook
+from tests.mock_server import MockServer
+
+
+def graph_batch(request):
+    form = parse_qs(request.body.decode())
+    assert form["access_token"] == ["client_id|client_secret"]
+
+    results = []
+    for item in json.loads(form["batch"][0]):
+        query = parse_qs(urlsplit(item["relative_url"]).query)
+        access_token = query["access_token"][0]
+        if access_token == "revoked":
+            error = {"error": {"message": "Error validating access token", "code": 190}}
+            results.append({"code": 400, "body": json.dumps(error)})
+        elif access_token == "slow":
+            results.append(None)
+        else:
+            results.append({"code": 200, "body": json.dumps({"id": access_token, "fields": query["fields"][0]})})
+    return 200, {}, results
+
+
+class TestFacebookBatch(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(routes={("POST", "/"): graph_batch}).start()
+        self.transport = HTTPTransport()
+        self.provider = Facebook("client_id", "client_secret", "https://example.com/callback", "id,name", "email",
+                                 transport=self.transport)
+        self.provider.BATCH_URL = f"{self.server.url}/"
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def test_batches_of_fifty(self):
+        tokens = (f"token-{index}" for index in range(120))
+        results = list(self.provider.get_user_profiles(tokens, fields="id,name"))
+
+        self.assertEqual(len(results), 120)
+        self.assertEqual(results[119].profile, {"id": "token-119", "fields": "id,name"})
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_per_item_errors(self):
+        results = list(self.provider.get_user_profiles(["first", "revoked", "slow", "last"]))
+
+        self.assertEqual(results[0].profile["id"], "first")
+        self.assertIsInstance(results[1].error, ProviderError)
+        self.assertIn("Error validating access token", str(results[1].error))
+        self.assertIsInstance(results[2].error, ProviderError)
+        self.assertEqual(results[3].profile["id"], "last")
+
+    def test_failed_batch_request_fails_its_items_only(self):
+        self.provider.BATCH_URL = f"{self.server.url}/missing"
+        results = list(self.provider.get_user_profiles(["first", "second"]))
+        self.assertTrue(all(result.error is not None for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
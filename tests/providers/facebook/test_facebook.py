@@ -34,7 +34,7 @@ class TestFacebook(unittest.TestCase):
         expected_url = f"{self.provider.AUTHORIZE_URL}?{urlencode(expected_params)}"
         self.assertEqual(auth_url,expected_url)
 
-    @patch('requests.get')
+    @patch('omni_authify.core.transport.HTTPTransport.get')
     def test_get_access_token(self, mock_get):
         code = "test_code"
 
@@ -58,7 +58,7 @@ class TestFacebook(unittest.TestCase):
             }
         )
 
-    @patch('requests.get')
+    @patch('omni_authify.core.transport.HTTPTransport.get')
     def test_get_user_profile(self, mock_get):
         access_token = "test_access_token"
 
@@ -0,0 +1,90 @@
+import json
+import unittest
+from urllib.parse import parse_qs
+
+from omni_authify.core.transport import HTTPTransport
+from omni_authify.providers.facebook import Facebook
+from omni_authify.providers.instagram import Instagram
+from tests.mock_server import MockServer
+
+
+def graph_me(request):
+    query = parse_qs(request.path.partition("?")[2])
+    profile = {"id": "1", "name": "Jane"}
+    if "friends" in query["fields"][0]:
+        profile["friends"] = {"data": [{"name": f"friend-{index}"} for index in range(50)]}
+    return 200, {}, profile
+
+
+class TestFacebookFields(unittest.TestCase):
+    provider_class = Facebook
+
+    def setUp(self):
+        self.server = MockServer(routes={("GET", "/me"): graph_me}).start()
+        self.transport = HTTPTransport()
+        self.provider = self.provider_class("client_id", "client_secret", "https://example.com/callback",
+                                            "id,name", "email", transport=self.transport)
+        self.provider.PROFILE_URL = f"{self.server.url}/me"
+        self.provider.field_costs.reset()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+        self.provider.field_costs.reset()
+
+    def sent_fields(self):
+        return parse_qs(self.server.requests[-1][1].partition("?")[2])["fields"][0]
+
+    def test_fields_are_normalized_before_sending(self):
+        self.provider.get_user_profile("token", " name,id,name ")
+
+        self.assertEqual(self.sent_fields(), "id,name")
+
+    def test_configured_fields_are_used_without_explicit_fields(self):
+        self.provider.get_user_profile("token", None)
+
+        self.assertEqual(self.sent_fields(), "id,name")
+
+    def test_costs_are_recorded_per_field_set(self):
+        self.provider.get_user_profile("token", "id,name")
+        self.provider.get_user_profile("token", "id,name,friends.limit(50){name}")
+
+        stats = self.provider.field_costs.stats()
+        cheap, expensive = stats["field_sets"]["id,name"], stats["field_sets"]["friends.limit(50){name},id,name"]
+        self.assertEqual(cheap["requests"], 1)
+        self.assertGreater(expensive["avg_bytes"], cheap["avg_bytes"])
+        self.assertEqual(next(iter(stats["fields"])), "friends")
+
+
+class TestInstagramFields(TestFacebookFields):
+    provider_class = Instagram
+
+
+class TestFacebookBatchFields(unittest.TestCase):
+    def test_batch_costs_are_recorded_per_profile(self):
+        batches = []
+
+        def graph_batch(request):
+            batch = json.loads(parse_qs(request.body.decode())["batch"][0])
+            batches.append(batch)
+            return 200, {}, [{"code": 200, "body": json.dumps({"id": "1", "name": "Jane"})} for _ in batch]
+
+        with MockServer(routes={("POST", "/"): graph_batch}) as server:
+            transport = HTTPTransport()
+            provider = Facebook("client_id", "client_secret", "https://example.com/callback", "id", "email",
+                                transport=transport)
+            provider.BATCH_URL = f"{server.url}/"
+            provider.field_costs.reset()
+            try:
+                results = list(provider.get_user_profiles(["a", "b", "c"], fields="name,id"))
+            finally:
+                transport.close()
+
+        self.assertEqual(len(results), 3)
+        self.assertIn("fields=id%2Cname&access_token=a", batches[0][0]["relative_url"])
+        self.assertEqual(provider.field_costs.stats()["field_sets"]["id,name"]["requests"], 1)
+        provider.field_costs.reset()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from omni_authify.providers.github import GitHub
+from tests.mock_server import MockServer
+
+
+class TestGitHubIdentity(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(latency=0.1).start()
+        self.server.route("GET", "/user", {"id": 1, "login": "octocat", "email": None},
+                          headers={"X-OAuth-Scopes": "read:user, user:email", "X-Accepted-OAuth-Scopes": ""})
+        self.server.route("GET", "/user/emails", [
+            {"email": "octocat@users.noreply.github.com", "primary": False, "verified": True},
+            {"email": "octocat@github.com", "primary": True, "verified": True},
+        ])
+        self.transport = HTTPTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def make_provider(self, **kwargs):
+        provider = GitHub("client_id", "client_secret", "https://example.com/callback", "read:user,user:email",
+                          transport=self.transport, **kwargs)
+        provider.PROFILE_URL = f"{self.server.url}/user"
+        provider.EMAILS_URL = f"{self.server.url}/user/emails"
+        return provider
+
+    def assert_identity(self, identity):
+        self.assertEqual(identity["login"], "octocat")
+        self.assertEqual(identity["email"], "octocat@github.com")
+        self.assertEqual(len(identity["emails"]), 2)
+        self.assertEqual(identity["authorized_scopes"], ["read:user", "user:email"])
+
+    def test_fetch_identity(self):
+        self.assert_identity(self.make_provider().fetch_identity("token"))
+
+        # ==== Two GETs and no HEAD, issued concurrently ====
+        self.assertEqual(sorted(method for method, _ in self.server.requests), ["GET", "GET"])
+
+    def test_fetch_identity_without_email_scope(self):
+        self.server.route("GET", "/user/emails", {"message": "Not Found"}, status=404)
+        identity = self.make_provider().fetch_identity("token")
+        self.assertIsNone(identity["email"])
+        self.assertEqual(identity["emails"], [])
+
+    def test_afetch_identity(self):
+        async def run():
+            transport = AsyncHTTPTransport()
+            identity = await self.make_provider(async_transport=transport).afetch_identity("token")
+            await transport.aclose()
+            return identity
+
+        self.assert_identity(asyncio.run(run()))
+
+    def test_get_user_profile_accepts_deprecated_scope(self):
+        provider = self.make_provider()
+        with self.assertWarns(DeprecationWarning):
+            profile = provider.get_user_profile("token", scope="user,repo")
+        self.assertEqual(profile, provider.get_user_profile("token", fields="user,repo"))
+        self.assertEqual(profile["login"], "octocat")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,7 +23,7 @@ class TestGoogle(unittest.TestCase):
         self.assertEqual(self.provider.redirect_uri, self.redirect_uri)
         self.assertEqual(self.provider.scope, self.scope)
 
-    @patch('requests.get')
+    @patch('omni_authify.core.transport.HTTPTransport.get')
     def test_get_access_token(self, mock_get):
 
         # Mock response
@@ -38,7 +38,7 @@ class TestGoogle(unittest.TestCase):
 
         mock_get.assert_called_with(self.provider.TOKEN_URL.format(client_id=self.client_id, redirect_uri=self.redirect_uri, scope=self.scope))
 
-    @patch('requests.get')
+    @patch('omni_authify.core.transport.HTTPTransport.get')
     def test_get_user_profile(self, mock_get):
         access_token = "test_access_token"
 
@@ -0,0 +1,73 @@
+import unittest
+from urllib.parse import urlencode
+
+from omni_authify.providers import Facebook, GitHub, Google, LinkedIn
+from tests.core.test_transport import StubTransport
+
+REDIRECT_URI = "https://example.com/callback"
+
+
+def build_providers():
+    transport = StubTransport({})
+    return (
+        Facebook("client_id", "client_secret", REDIRECT_URI, ["id"], "email,public_profile", transport),
+        GitHub("client_id", "client_secret", REDIRECT_URI, "read:user", transport),
+        Google("client_id", "client_secret", REDIRECT_URI, "openid email", transport),
+        LinkedIn("client_id", "client_secret", REDIRECT_URI, "openid profile", transport),
+    )
+
+
+class TestAuthorizationUrl(unittest.TestCase):
+
+    def test_matches_full_encoding(self):
+        for provider in build_providers():
+            with self.subTest(provider=type(provider).__name__):
+                for state, scope in (("st ate/1", None), (None, None), ("abc", "other scope"), (42, None)):
+                    params = provider._authorization_params(scope or provider.scope)
+                    if state:
+                        params["state"] = state
+                    expected = f"{provider.AUTHORIZE_URL}?{urlencode(params)}"
+                    self.assertEqual(provider.get_authorization_url(state=state, scope=scope), expected)
+
+    def test_linkedin_keeps_parameter_order(self):
+        provider = build_providers()[3]
+        url = provider.get_authorization_url(state="s")
+        self.assertEqual(
+            url.split("?")[1],
+            "response_type=code&client_id=client_id&scope=openid+profile&redirect_uri=https%3A%2F%2Fexample.com%2F"
+            "callback&state=s",
+        )
+
+    def test_prefix_is_built_at_construction_and_reused(self):
+        provider = build_providers()[1]
+        prefix = provider._authorization_prefixes["read:user"]
+        self.assertTrue(provider.get_authorization_url("s1").startswith(prefix))
+        self.assertIs(provider.get_authorization_url(), prefix)
+
+    def test_override_scope_is_cached_separately(self):
+        provider = build_providers()[1]
+        provider.get_authorization_url(scope="repo")
+        self.assertEqual(set(provider._authorization_prefixes), {"read:user", "repo"})
+
+    def test_reassigning_static_fields_invalidates(self):
+        provider = build_providers()[0]
+        provider.get_authorization_url("s")
+
+        provider.scope = "email"
+        self.assertIn("scope=email&state=s", provider.get_authorization_url("s"))
+
+        provider.redirect_uri = "https://other.example.com/cb"
+        self.assertIn("redirect_uri=https%3A%2F%2Fother.example.com%2Fcb", provider.get_authorization_url("s"))
+
+        provider.AUTHORIZE_URL = "https://idp.example.com/authorize"
+        self.assertTrue(provider.get_authorization_url("s").startswith("https://idp.example.com/authorize?"))
+
+    def test_override_cache_is_bounded(self):
+        provider = build_providers()[1]
+        for i in range(provider._AUTHORIZATION_CACHE_SIZE * 3):
+            provider.get_authorization_url(scope=f"scope{i}")
+        self.assertLessEqual(len(provider._authorization_prefixes), provider._AUTHORIZATION_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
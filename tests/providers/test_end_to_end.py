@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+import requests
+
+try:
+    import jwt
+except ImportError:
+    jwt = None
+
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from tests.mock_oauth import PROFILES, PROVIDER_CLASSES, MockOAuthServer
+
+SCOPES = {
+    "github": "read:user user:email",
+    "google": "openid email profile",
+    "facebook": "email,public_profile",
+    "linkedin": "openid profile email",
+}
+
+
+def make_provider(name, server, **kwargs):
+    args = ["client_id", "client_secret", "https://example.com/callback"]
+    if name == "facebook":
+        args.append("id,name,email,picture")
+    provider = PROVIDER_CLASSES[name](*args, SCOPES[name], transport=HTTPTransport(backoff_factor=0.01), **kwargs)
+    return server.attach(provider)
+
+
+class TestEndToEndLogin(unittest.TestCase):
+    """
+    Full authorization code flows against the local mock of every provider.
+    """
+
+    def login(self, provider, server):
+        callback = server.consent(provider.get_authorization_url(state="state-1"))
+        self.assertEqual(callback["state"], "state-1")
+        return provider.get_user_info(callback["code"])
+
+    def test_every_provider_logs_in(self):
+        for name in PROVIDER_CLASSES:
+            with self.subTest(provider=name), MockOAuthServer(name, strict=True) as server:
+                provider = make_provider(name, server)
+                profile = self.login(provider, server)
+                self.assertEqual(profile["email"], PROFILES[name]["email"])
+                self.assertEqual([method for method, _ in server.requests], [
+                    "GET", server.methods["token"], "GET",
+                ])
+
+    def test_codes_are_single_use(self):
+        with MockOAuthServer("github", strict=True) as server:
+            provider = make_provider("github", server)
+            callback = server.consent(provider.get_authorization_url(state="state-1"))
+            provider.get_access_token(callback["code"])
+            with self.assertRaises(requests.HTTPError):
+                provider.get_access_token(callback["code"])
+
+    def test_unknown_access_token_is_rejected(self):
+        with MockOAuthServer("google", strict=True) as server:
+            provider = make_provider("google", server)
+            with self.assertRaises(requests.HTTPError):
+                provider.get_user_profile("forged")
+
+    @unittest.skipUnless(jwt, "PyJWT[crypto] is not installed")
+    def test_oidc_providers_verify_the_id_token(self):
+        for name in ("google", "linkedin"):
+            with self.subTest(provider=name), MockOAuthServer(name, strict=True) as server:
+                provider = make_provider(name, server, oidc=True)
+                claims = self.login(provider, server)
+                self.assertEqual(claims["aud"], "client_id")
+                self.assertEqual(claims["iss"], server.issuer)
+                self.assertNotIn(("GET", server.paths["userinfo"]), server.requests)
+
+    def test_injected_failures_are_retried(self):
+        with MockOAuthServer("facebook", strict=True) as server:
+            provider = make_provider("facebook", server)
+            callback = server.consent(provider.get_authorization_url(state="state-1"))
+            server.fail_endpoint("userinfo", times=1, status=503)
+            self.assertEqual(provider.get_user_info(callback["code"])["id"], PROFILES["facebook"]["id"])
+            self.assertEqual(provider.transport.retries, 1)
+
+    def test_async_login(self):
+        async def main(provider, code):
+            provider._async_transport = AsyncHTTPTransport()
+            try:
+                return await provider.aget_user_info(code)
+            finally:
+                await provider._async_transport.aclose()
+
+        with MockOAuthServer("linkedin", strict=True) as server:
+            provider = make_provider("linkedin", server)
+            callback = server.consent(provider.get_authorization_url(state="state-1"))
+            self.assertEqual(asyncio.run(main(provider, callback["code"]))["sub"], PROFILES["linkedin"]["sub"])
+
+
+if __name__ == '__main__':
+    unittest.main()
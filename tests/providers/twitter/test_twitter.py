@@ -0,0 +1,116 @@
+import asyncio
+import base64
+import hashlib
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+from omni_authify.core.exceptions import IntegrationError
+from omni_authify.core.oauth import get_provider
+from omni_authify.core.spec import ProviderSpec
+from omni_authify.core.transport import AsyncHTTPTransport, HTTPTransport
+from omni_authify.providers import OAuth2Provider, Twitter
+from tests.mock_server import MockServer
+
+PROFILE = {"id": "2244994945", "name": "Test User", "username": "testuser",
+           "profile_image_url": "https://example.com/picture.jpg"}
+
+
+class TestTwitter(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer().start()
+        self.token_requests = []
+        self.server.routes[("POST", "/2/oauth2/token")] = self._token
+        self.server.route("GET", "/2/users/me", {"data": PROFILE})
+        self.transport = HTTPTransport(backoff_factor=0.01)
+        self.provider = Twitter("client_id", "client_secret", "https://example.com/callback",
+                                "tweet.read users.read offline.access", transport=self.transport)
+        self.provider.TOKEN_URL = f"{self.server.url}/2/oauth2/token"
+        self.provider.PROFILE_URL = f"{self.server.url}/2/users/me"
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.stop()
+
+    def _token(self, request):
+        form = {key: values[0] for key, values in parse_qs(request.body.decode()).items()}
+        self.token_requests.append((request.headers.get("Authorization"), form))
+        return 200, {}, {"access_token": "access", "refresh_token": "refresh", "token_type": "bearer"}
+
+    def test_authorization_url_carries_the_pkce_challenge(self):
+        query = parse_qs(urlsplit(self.provider.get_authorization_url(state="s")).query)
+        self.assertEqual(query["code_challenge_method"], ["S256"])
+        self.assertEqual(query["scope"], ["tweet.read users.read offline.access"])
+
+        verifier = self.provider._code_verifier("s")
+        challenge = base64.urlsafe_b64encode(hashlib.sha256(verifier.encode()).digest()).rstrip(b"=").decode()
+        self.assertEqual(query["code_challenge"], [challenge])
+        self.assertRegex(verifier, r"^[A-Za-z0-9_-]{43}$")
+
+    def test_pkce_challenge_differs_for_every_login(self):
+        challenges = {
+            parse_qs(urlsplit(self.provider.get_authorization_url(state=state)).query)["code_challenge"][0]
+            for state in ("first", "second", "third")
+        }
+        self.assertEqual(len(challenges), 3)
+
+    def test_pkce_requires_the_state(self):
+        with self.assertRaises(IntegrationError):
+            self.provider.get_authorization_url()
+        with self.assertRaises(IntegrationError):
+            self.provider.get_access_token("code")
+        self.assertEqual(self.token_requests, [])
+
+    def test_code_exchange_uses_basic_auth_and_the_verifier(self):
+        self.assertEqual(self.provider.get_access_token("code", "s"), "access")
+
+        authorization, form = self.token_requests[-1]
+        self.assertEqual(authorization, f"Basic {base64.b64encode(b'client_id:client_secret').decode()}")
+        self.assertEqual(form["grant_type"], "authorization_code")
+        self.assertEqual(form["code_verifier"], self.provider._code_verifier("s"))
+        self.assertNotIn("client_secret", form)
+
+    def test_refresh(self):
+        self.assertEqual(self.provider.refresh_access_token("refresh")["access_token"], "access")
+        self.assertEqual(self.token_requests[-1][1]["grant_type"], "refresh_token")
+
+    def test_profile_is_unwrapped_and_normalized(self):
+        self.assertEqual(self.provider.get_user_info("code", state="s"), PROFILE)
+        self.assertIn("user.fields=", self.server.requests[-1][1])
+
+        profile = self.provider.get_profile("access")
+        self.assertEqual((profile.provider, profile.username, profile.picture),
+                         ("twitter", "testuser", PROFILE["profile_image_url"]))
+
+    def test_async_login(self):
+        async def main():
+            self.provider._async_transport = AsyncHTTPTransport()
+            try:
+                return await self.provider.aget_user_info("code", state="s")
+            finally:
+                await self.provider._async_transport.aclose()
+
+        self.assertEqual(asyncio.run(main()), PROFILE)
+
+    def test_built_from_settings(self):
+        provider = get_provider("twitter", {"client_id": "id", "client_secret": "secret",
+                                            "redirect_uri": "https://example.com/callback", "scope": "users.read"})
+        self.assertIsInstance(provider, Twitter)
+
+
+class TestProviderSpec(unittest.TestCase):
+    def test_rejects_unknown_styles(self):
+        with self.assertRaises(ValueError):
+            ProviderSpec("https://a/authorize", "https://a/token", "https://a/me", token_auth="header")
+
+    def test_spec_sets_the_class_endpoints(self):
+        class Example(OAuth2Provider):
+            SPEC = ProviderSpec("https://a/authorize", "https://a/token", "https://a/me", profile_auth="query")
+
+        self.assertEqual((Example.AUTHORIZE_URL, Example.TOKEN_URL, Example.PROFILE_URL),
+                         ("https://a/authorize", "https://a/token", "https://a/me"))
+        provider = Example("client_id", "client_secret", "https://example.com/callback", ["id"], "profile")
+        self.assertEqual(provider._profile_kwargs("token"), {"params": {"access_token": "token"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+import unittest
+
+
+def run_python(code):
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode:
+        raise AssertionError(result.stderr)
+    return result.stdout.strip()
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_import_has_no_heavy_dependencies_or_output(self):
+        output = run_python(
+            "import sys, omni_authify, omni_authify.providers\n"
+            "print(sorted(m for m in ('requests', 'dotenv', 'httpx', 'jwt', 'asyncio', 'orjson', 'msgspec',"
+            " 'omni_authify.providers.github') if m in sys.modules))"
+        )
+        self.assertEqual(output, "[]")
+
+    def test_provider_import_does_not_load_settings_or_requests(self):
+        output = run_python(
+            "import sys\n"
+            "from omni_authify.providers.github import GitHub\n"
+            "print(sorted(m for m in ('requests', 'dotenv') if m in sys.modules))"
+        )
+        self.assertEqual(output, "[]")
+
+    def test_providers_resolve_on_attribute_access(self):
+        output = run_python(
+            "import omni_authify, omni_authify.providers as providers\n"
+            "from omni_authify import GitHub\n"
+            "print(GitHub.__module__, providers.Google.__module__, 'Facebook' in dir(omni_authify))"
+        )
+        self.assertEqual(output, "omni_authify.providers.github omni_authify.providers.google True")
+
+    def test_unknown_attribute_raises(self):
+        import omni_authify
+
+        with self.assertRaises(AttributeError):
+            omni_authify.Apple
+
+    def test_settings_load_on_first_access(self):
+        output = run_python(
+            "import os, sys\n"
+            "os.environ['GITHUB_CLIENT_ID'] = 'lazy-id'\n"
+            "import omni_authify.core.utils as utils\n"
+            "loaded_before = 'dotenv' in sys.modules\n"
+            "from omni_authify.core.utils import OMNI_AUTHIFY\n"
+            "print(loaded_before, OMNI_AUTHIFY['PROVIDERS']['github']['client_id'], OMNI_AUTHIFY is utils.get_settings())"
+        )
+        self.assertEqual(output, "False lazy-id True")
+
+
+if __name__ == '__main__':
+    unittest.main()